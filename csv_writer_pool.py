@@ -0,0 +1,220 @@
+"""
+Buffered CSV Writer Pool
+로컬 CSV 로그 파일 핸들 풀 (기록 유형 + 날짜별 장기 유지 버퍼 파일)
+
+행마다 파일을 열고 닫는 대신 (task_name, 날짜)별 파일 핸들을 유지하고
+버퍼에 모아 flush / fsync 정책에 따라 디스크에 기록
+- 헤더 여부는 파일을 처음 열 때 한 번만 확인
+- 날짜가 바뀌면 이전 날짜 파일을 닫고 새 파일로 전환 (자정 롤오버)
+- 프로세스 종료 시 모든 파일 flush 후 닫기
+"""
+
+import atexit
+import csv
+import io
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# flush 정책: "row" (행마다 flush), "interval" (flush_interval마다), "exit" (종료/명시적 flush 시에만)
+FLUSH_POLICY = "interval"
+FLUSH_INTERVAL = 1.0
+
+# fsync 정책: "never" (OS에 맡김), "flush" (flush할 때마다 fsync)
+FSYNC_POLICY = "never"
+
+# 파일별 쓰기 버퍼 크기 (바이트)
+BUFFER_SIZE = 64 * 1024
+
+
+class _Handle:
+    """열린 로그 파일 정보"""
+
+    __slots__ = ("path", "file", "position", "dirty")
+
+    def __init__(self, path: str, file, position: int):
+        self.path = path
+        self.file = file
+        self.position = position  # 다음 행이 기록될 바이트 오프셋
+        self.dirty = False
+
+
+class CSVWriterPool:
+    """
+    (task_name, 날짜)별 버퍼 CSV 파일 핸들 풀 (스레드 안전)
+
+    Args:
+        path_func: (task_name, date) → 파일 경로 (예: logging_utils.get_log_file_path)
+        on_open: 파일을 연 직후 호출 (filename, 새 파일 여부) - 기록 전에 호출됨
+        on_flush: 파일 버퍼를 flush한 뒤 호출 (연관 인덱스 등 함께 flush)
+        flush_policy: "row" / "interval" / "exit"
+        flush_interval: interval 정책의 flush 주기 (초)
+        fsync_policy: "never" / "flush"
+        buffer_size: 파일별 쓰기 버퍼 크기 (바이트)
+    """
+
+    def __init__(
+        self,
+        path_func: Callable[[str, str], str],
+        on_open: Optional[Callable[[str, bool], None]] = None,
+        on_flush: Optional[Callable[[], None]] = None,
+        flush_policy: str = FLUSH_POLICY,
+        flush_interval: float = FLUSH_INTERVAL,
+        fsync_policy: str = FSYNC_POLICY,
+        buffer_size: int = BUFFER_SIZE
+    ):
+        if flush_policy not in ("row", "interval", "exit"):
+            raise ValueError(f"Invalid flush policy: {flush_policy}")
+        if fsync_policy not in ("never", "flush"):
+            raise ValueError(f"Invalid fsync policy: {fsync_policy}")
+
+        self.path_func = path_func
+        self.on_open = on_open
+        self.on_flush = on_flush
+        self.flush_policy = flush_policy
+        self.flush_interval = flush_interval
+        self.fsync_policy = fsync_policy
+        self.buffer_size = buffer_size
+
+        self._lock = threading.RLock()
+        self._handles: Dict[Tuple[str, str], _Handle] = {}
+
+        # 행 포맷용 (csv 모듈 규칙 그대로 사용)
+        self._line = io.StringIO()
+        self._csv = csv.writer(self._line)
+
+        self._flusher: Optional[threading.Thread] = None
+        self._closed = False
+
+    def _encode(self, row: List[Any]) -> bytes:
+        self._line.seek(0)
+        self._line.truncate()
+        self._csv.writerow(row)
+        return self._line.getvalue().encode("utf-8")
+
+    def _open(self, task_name: str, date: str, columns: List[str]) -> _Handle:
+        """파일 열기 (같은 기록 유형의 이전 날짜 파일은 닫음)"""
+        for key in [k for k in self._handles if k[0] == task_name and k[1] != date]:
+            self._close_handle(self._handles.pop(key))
+
+        path = self.path_func(task_name, date)
+        position = os.path.getsize(path) if os.path.exists(path) else 0
+        is_new = position == 0
+
+        if self.on_open is not None:
+            self.on_open(os.path.basename(path), is_new)
+
+        handle = _Handle(path, open(path, "ab", buffering=self.buffer_size), position)
+        if is_new:
+            header = self._encode(columns)
+            handle.file.write(header)
+            handle.position += len(header)
+            handle.dirty = True
+        return handle
+
+    def write(self, task_name: str, columns: List[str], row: List[Any]) -> Tuple[str, int]:
+        """
+        행 기록
+
+        Args:
+            task_name: 기록 유형 (파일 이름 접두어)
+            columns: 컬럼 이름 (새 파일 헤더)
+            row: 컬럼 순서의 값 목록
+
+        Returns:
+            (파일 이름, 행 시작 바이트 오프셋)
+        """
+        date = datetime.now().strftime("%Y%m%d")
+        with self._lock:
+            if self._closed:
+                raise ValueError("CSV writer pool is closed")
+            key = (task_name, date)
+            handle = self._handles.get(key)
+            if handle is None:
+                handle = self._handles[key] = self._open(task_name, date, columns)
+
+            data = self._encode(row)
+            offset = handle.position
+            handle.file.write(data)
+            handle.position += len(data)
+            handle.dirty = True
+
+            if self.flush_policy == "row":
+                self._flush_handle(handle)
+            elif self.flush_policy == "interval":
+                self._ensure_flusher()
+
+            return os.path.basename(handle.path), offset
+
+    def _flush_handle(self, handle: _Handle):
+        if not handle.dirty:
+            return
+        handle.file.flush()
+        if self.fsync_policy == "flush":
+            os.fsync(handle.file.fileno())
+        handle.dirty = False
+        if self.on_flush is not None:
+            self.on_flush()
+
+    def _close_handle(self, handle: _Handle):
+        self._flush_handle(handle)
+        handle.file.close()
+
+    def flush(self):
+        """모든 파일 버퍼를 디스크에 기록"""
+        with self._lock:
+            for handle in self._handles.values():
+                self._flush_handle(handle)
+
+    def _ensure_flusher(self):
+        if self._flusher is None or not self._flusher.is_alive():
+            self._flusher = threading.Thread(
+                target=self._run_flusher, name="csv-log-flusher", daemon=True
+            )
+            self._flusher.start()
+
+    def _run_flusher(self):
+        """주기적 flush + 날짜가 지난 파일 닫기"""
+        while True:
+            time.sleep(self.flush_interval)
+            today = datetime.now().strftime("%Y%m%d")
+            with self._lock:
+                if self._closed:
+                    return
+                for key in list(self._handles):
+                    if key[1] != today:
+                        self._close_handle(self._handles.pop(key))
+                    else:
+                        self._flush_handle(self._handles[key])
+
+    def close(self):
+        """모든 파일 flush 후 닫기"""
+        with self._lock:
+            for handle in self._handles.values():
+                self._close_handle(handle)
+            self._handles.clear()
+            self._closed = True
+
+    def open_files(self) -> List[str]:
+        """현재 열린 파일 경로 목록"""
+        with self._lock:
+            return [handle.path for handle in self._handles.values()]
+
+
+_pools: List[CSVWriterPool] = []
+
+
+def create_pool(*args, **kwargs) -> CSVWriterPool:
+    """풀 생성 (프로세스 종료 시 자동으로 닫힘)"""
+    pool = CSVWriterPool(*args, **kwargs)
+    _pools.append(pool)
+    return pool
+
+
+@atexit.register
+def _close_on_exit():
+    """프로세스 종료 시 모든 풀 닫기"""
+    for pool in _pools:
+        pool.close()
@@ -0,0 +1,355 @@
+"""
+Fake Google Sheets Backend
+Google Spreadsheet 로컬 대체 서버 (오프라인 부하 테스트용)
+
+프로젝트에서 사용하는 gspread 인터페이스만 구현
+(authorize, open_by_url, sheet1, append_row, append_rows, row_values, row_count)
+지연시간 / 오류율 / 할당량(429) 주입 지원
+
+사용법:
+    GSHEET_BACKEND=fake 환경변수 설정 시 gsheet_client가 이 모듈을 사용
+    python fake_gsheet.py --sessions 60 --latency 0.3 --error-rate 0.05
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+# 환경변수 기본 설정 (configure()로 변경 가능)
+CONFIG = {
+    "latency": float(os.environ.get("GSHEET_FAKE_LATENCY", "0.2")),            # API 호출당 평균 지연 (초)
+    "jitter": float(os.environ.get("GSHEET_FAKE_JITTER", "0.1")),              # 지연 편차 (초)
+    "error_rate": float(os.environ.get("GSHEET_FAKE_ERROR_RATE", "0.0")),      # 5xx 오류 확률
+    "quota_per_minute": int(os.environ.get("GSHEET_FAKE_QUOTA_PER_MINUTE", "60")),  # 사용자별 분당 쓰기 한도 (0 = 무제한)
+    "auth_latency": float(os.environ.get("GSHEET_FAKE_AUTH_LATENCY", "0.5")),  # 인증 + 메타데이터 조회 지연 (초)
+}
+
+
+def configure(**kwargs):
+    """대체 서버 설정 변경 (latency, jitter, error_rate, quota_per_minute, auth_latency)"""
+    for key, value in kwargs.items():
+        if key not in CONFIG:
+            raise ValueError(f"Unknown fake gsheet option: {key}")
+        CONFIG[key] = value
+
+
+class _FakeResponse:
+    def __init__(self, status_code: int):
+        self.status_code = status_code
+
+
+class FakeAPIError(Exception):
+    """gspread.exceptions.APIError 대체 (code, response.status_code 제공)"""
+
+    def __init__(self, code: int, message: str):
+        super().__init__(f"[{code}] {message}")
+        self.code = code
+        self.response = _FakeResponse(code)
+
+
+# 서버 상태 (프로세스 전역)
+_lock = threading.Lock()
+_spreadsheets: Dict[str, "FakeSpreadsheet"] = {}
+_write_times: Dict[str, deque] = {}
+_stats = {"auth": 0, "reads": 0, "writes": 0, "rows": 0, "errors": 0, "throttled": 0}
+
+
+def _simulate_latency(seconds: float):
+    delay = max(0.0, random.gauss(seconds, CONFIG["jitter"])) if seconds > 0 else 0.0
+    if delay > 0:
+        time.sleep(delay)
+
+
+def _check_request(user: str, write: bool):
+    """지연 + 오류 + 할당량 주입"""
+    _simulate_latency(CONFIG["latency"])
+
+    if random.random() < CONFIG["error_rate"]:
+        with _lock:
+            _stats["errors"] += 1
+        raise FakeAPIError(503, "The service is currently unavailable.")
+
+    quota = CONFIG["quota_per_minute"]
+    if write and quota > 0:
+        now = time.monotonic()
+        with _lock:
+            window = _write_times.setdefault(user, deque())
+            while window and now - window[0] >= 60.0:
+                window.popleft()
+            if len(window) >= quota:
+                _stats["throttled"] += 1
+                raise FakeAPIError(429, "Quota exceeded for 'Write requests per minute per user'.")
+            window.append(now)
+
+
+class FakeWorksheet:
+    """gspread Worksheet 대체 (같은 스프레드시트의 행을 공유, 할당량은 사용자별)"""
+
+    def __init__(self, spreadsheet: "FakeSpreadsheet", user: str = "default"):
+        self.spreadsheet = spreadsheet
+        self.user = user
+
+    @property
+    def row_count(self) -> int:
+        return len(self.spreadsheet.rows)
+
+    def row_values(self, row: int) -> List:
+        _check_request(self.user, write=False)
+        with _lock:
+            _stats["reads"] += 1
+            rows = self.spreadsheet.rows
+            if 1 <= row <= len(rows):
+                return [str(value) for value in rows[row - 1]]
+            return []
+
+    def append_row(self, values: List):
+        self.append_rows([values])
+
+    def append_rows(self, values: List[List]):
+        _check_request(self.user, write=True)
+        with _lock:
+            _stats["writes"] += 1
+            _stats["rows"] += len(values)
+            self.spreadsheet.rows.extend(list(row) for row in values)
+
+
+class FakeSpreadsheet:
+    """gspread Spreadsheet 대체 (sheet1만 제공)"""
+
+    def __init__(self, url: str, rows: Optional[List[List]] = None, user: str = "default"):
+        self.url = url
+        self.rows: List[List] = rows if rows is not None else []
+        self.sheet1 = FakeWorksheet(self, user)
+
+
+class FakeClient:
+    """gspread Client 대체"""
+
+    def __init__(self, user: str):
+        self.user = user
+
+    def open_by_url(self, url: str) -> FakeSpreadsheet:
+        _simulate_latency(CONFIG["auth_latency"] / 2)
+        with _lock:
+            spreadsheet = _spreadsheets.get(url)
+            if spreadsheet is None:
+                spreadsheet = _spreadsheets[url] = FakeSpreadsheet(url)
+        # 행은 공유하고 할당량은 이 클라이언트 사용자 기준으로 적용
+        return FakeSpreadsheet(url, rows=spreadsheet.rows, user=self.user)
+
+
+def authorize(credentials=None, user: str = "default") -> FakeClient:
+    """gspread.authorize 대체 (인증 지연만 흉내)"""
+    _simulate_latency(CONFIG["auth_latency"] / 2)
+    with _lock:
+        _stats["auth"] += 1
+    return FakeClient(user)
+
+
+def get_rows(url: str) -> List[List]:
+    """대체 서버에 기록된 행 (검증용)"""
+    with _lock:
+        spreadsheet = _spreadsheets.get(url)
+        return [list(row) for row in spreadsheet.rows] if spreadsheet else []
+
+
+def count_rows(urls: List[str], header: Optional[List[str]] = None) -> Dict:
+    """
+    대상 시트별 데이터 행 수 / 고유 기록 수 (검증용)
+
+    기록은 첫 열(기록 시각)을 제외한 값으로 구분 (재시도로 같은 행이 다시 기록되면 중복)
+
+    Args:
+        urls: 대상 시트 URL (메인 + 백업)
+        header: 빈 시트에 자동 추가되는 헤더 행 (데이터 행에서 제외)
+
+    Returns:
+        - targets: {url: {"rows": 데이터 행 수, "duplicates": 같은 시트 안에서 중복된 행 수}}
+        - unique_rows: 모든 대상에 걸친 서로 다른 기록 수
+    """
+    header_row = [str(v) for v in header] if header else None
+    targets = {}
+    unique = set()
+    for url in urls:
+        seen = set()
+        data_rows = 0
+        duplicates = 0
+        for row in get_rows(url):
+            values = [str(v) for v in row]
+            if values == header_row:
+                continue
+            data_rows += 1
+            key = tuple(values[1:])
+            if key in seen:
+                duplicates += 1
+            seen.add(key)
+        targets[url] = {"rows": data_rows, "duplicates": duplicates}
+        unique |= seen
+    return {"targets": targets, "unique_rows": len(unique)}
+
+
+def server_stats() -> Dict:
+    """대체 서버 요청 통계"""
+    with _lock:
+        return dict(_stats)
+
+
+def reset():
+    """모든 시트 및 통계 초기화"""
+    with _lock:
+        _spreadsheets.clear()
+        _write_times.clear()
+        for key in _stats:
+            _stats[key] = 0
+
+
+# ============================================================
+# 부하 테스트
+# ============================================================
+
+def run_benchmark(
+    sessions: int = 60,
+    trials: int = 100,
+    batch_size: int = 100,
+    ramp_seconds: float = 5.0,
+    drain_timeout: float = 600.0,
+    spool_dir: Optional[str] = None
+) -> Dict:
+    """
+    IGT 참가자 세션을 동시에 흉내내어 igt_logging_utils 처리량 / 장애 전환 측정
+
+    Args:
+        sessions: 동시 참가자 수
+        trials: 참가자당 시행 수
+        batch_size: 배치 로깅 간격 (BATCH_LOG_INTERVAL)
+        ramp_seconds: 참가자 시작 시점이 분산되는 구간 (초)
+        drain_timeout: 모든 기록 전송을 기다리는 최대 시간 (초)
+        spool_dir: 스풀 디렉토리 (없으면 임시 디렉토리)
+
+    Returns:
+        요청 경로 지연 / 전송 완료 시간 / 기록 행 수 등 결과
+    """
+    # igt_logging_utils는 import 시 스풀 디렉토리의 미전송 기록을 복구 / 재전송하므로
+    # 이미 import된 상태면 실제 스풀이 대체 서버로 재생될 수 있음 → 실행 거부
+    if "igt_logging_utils" in sys.modules:
+        raise RuntimeError(
+            "run_benchmark must run before igt_logging_utils is imported "
+            "(its spools would point at the real spool directory)"
+        )
+
+    os.environ["GSHEET_BACKEND"] = "fake"
+    spool_dir = spool_dir or tempfile.mkdtemp(prefix="igt_spool_")
+    trial_spool_dir = os.path.join(spool_dir, "trials")
+    event_spool_dir = os.path.join(spool_dir, "events")
+    os.environ["IGT_SPOOL_DIR"] = trial_spool_dir
+    os.environ["IGT_EVENT_SPOOL_DIR"] = event_spool_dir
+
+    import gsheet_client
+    gsheet_client.GSHEET_BACKEND = "fake"
+    import igt_logging_utils
+    igt_logging_utils.SPOOL_DIR = trial_spool_dir
+    igt_logging_utils.EVENT_SPOOL_DIR = event_spool_dir
+    from gsheet_writer import get_writer
+
+    call_latencies: List[float] = []
+    latency_lock = threading.Lock()
+
+    def timed(fn, *args, **kwargs):
+        started = time.perf_counter()
+        fn(*args, **kwargs)
+        elapsed = time.perf_counter() - started
+        with latency_lock:
+            call_latencies.append(elapsed)
+
+    def participant(index: int):
+        time.sleep(random.uniform(0, ramp_seconds))
+        session_id = f"BENCH_{index:04d}"
+        participant_id = f"P{index:03d}"
+        timed(igt_logging_utils.log_session_start, session_id, participant_id)
+
+        pending = []
+        for trial in range(1, trials + 1):
+            pending.append([
+                time.strftime("%Y-%m-%d %H:%M:%S"), session_id, participant_id,
+                trial, "A", 100, 0, 100, 2000 + trial * 100
+            ])
+            if trial % batch_size == 0:
+                timed(igt_logging_utils.log_batch_trials, pending)
+                pending = []
+        if pending:
+            timed(igt_logging_utils.log_batch_trials, pending)
+
+        timed(
+            igt_logging_utils.log_session_end,
+            session_id, participant_id, 2000, 0,
+            {"A": trials, "B": 0, "C": 0, "D": 0}
+        )
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=participant, args=(i,)) for i in range(sessions)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    submitted = time.perf_counter() - started
+
+    drained = get_writer().flush(timeout=drain_timeout)
+    total = time.perf_counter() - started
+
+    call_latencies.sort()
+    # 대상별 데이터 행 (헤더 제외): 헤지 쓰기면 대상마다 전체, 페일오버면 대상 합집합이 전체
+    counts = count_rows(
+        [url for _, url in igt_logging_utils.SHEET_INFO], header=igt_logging_utils.TRIAL_HEADER
+    )
+    expected_rows = sessions * (trials + 2)
+
+    return {
+        "sessions": sessions,
+        "expected_rows": expected_rows,
+        "main_rows": counts["targets"][igt_logging_utils.SHEET_INFO[0][1]]["rows"],
+        "backup_rows": counts["targets"][igt_logging_utils.SHEET_INFO[1][1]]["rows"],
+        "unique_rows": counts["unique_rows"],
+        "missing_rows": expected_rows - counts["unique_rows"],
+        "duplicate_rows": sum(target["duplicates"] for target in counts["targets"].values()),
+        "drained": drained,
+        "submit_seconds": submitted,
+        "total_seconds": total,
+        "call_p50_ms": call_latencies[len(call_latencies) // 2] * 1000,
+        "call_max_ms": call_latencies[-1] * 1000,
+        "writer": get_writer().stats(),
+        "sheets": gsheet_client.sheets_health(),
+        "pool": gsheet_client.pool_stats(),
+        "server": server_stats(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline Google Sheets logging benchmark")
+    parser.add_argument("--sessions", type=int, default=60)
+    parser.add_argument("--trials", type=int, default=100)
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--ramp", type=float, default=5.0)
+    parser.add_argument("--latency", type=float, default=CONFIG["latency"])
+    parser.add_argument("--error-rate", type=float, default=CONFIG["error_rate"])
+    parser.add_argument("--quota", type=int, default=CONFIG["quota_per_minute"])
+    args = parser.parse_args()
+
+    configure(latency=args.latency, error_rate=args.error_rate, quota_per_minute=args.quota)
+    result = run_benchmark(
+        sessions=args.sessions,
+        trials=args.trials,
+        batch_size=args.batch_size,
+        ramp_seconds=args.ramp,
+    )
+    for key, value in result.items():
+        print(f"{key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,11 +8,13 @@ Streamlit 기반 심리학 실험 과제
 import streamlit as st
 from datetime import datetime, timezone, timedelta
 import time
+import random
 from free_recall_utils import (
     FreeRecallSession,
     generate_session_id,
     get_fixed_word_list,
 )
+from session_seed import derive_seed, get_master_seed
 
 KST = timezone(timedelta(hours=9))
 
@@ -107,9 +109,13 @@ def main():
                 if participant_id.strip() == "":
                     st.warning("참가자 ID를 입력해주세요.")
                 else:
-                    word_list = get_fixed_word_list(randomize=True)
+                    # 세션별 시드로 단어 순서 무선화 (로그의 시드로 재생성 가능)
+                    session_id = generate_session_id()
+                    master_seed = get_master_seed()
+                    seed = derive_seed(session_id, "word_order", master_seed)
+                    word_list = get_fixed_word_list(randomize=True, rng=random.Random(seed))
                     st.session_state.session = FreeRecallSession(
-                        session_id=generate_session_id(),
+                        session_id=session_id,
                         participant_id=participant_id,
                         condition="mixed",
                         processing_type="none",
@@ -119,6 +125,7 @@ def main():
                         distractor_duration=0,
                         recall_duration=0,
                         presented_words=word_list,
+                        seed=seed,
                     )
                     st.session_state.participant_id = participant_id
                     st.session_state.phase = 'encoding'
@@ -128,7 +135,10 @@ def main():
 
                     if LOGGING_AVAILABLE:
                         gsheet_log_event(
-                            text="Encoding session started - 15 words, 2s each, mixed",
+                            text=(
+                                f"Encoding session started - 15 words, 2s each, mixed, "
+                                f"Session: {session_id}, Seed: {seed}, Master seed: {master_seed}"
+                            ),
                             user_id=participant_id,
                             event_type="EncodingStart"
                         )
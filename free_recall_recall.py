@@ -137,7 +137,7 @@ def recall_setup():
                 )
                 st.session_state.participant_id = participant_id
                 st.session_state.phase = 'recall'
-                st.session_state.recall_start_time = time.time()
+                st.session_state.recall_start_time = time.monotonic()
                 st.session_state.recalled_words_input = []
 
                 if LOGGING_AVAILABLE:
@@ -161,7 +161,7 @@ def recall_phase():
 
         # 경과 시간
         if st.session_state.recall_start_time:
-            elapsed = int(time.time() - st.session_state.recall_start_time)
+            elapsed = int(time.monotonic() - st.session_state.recall_start_time)
 
         st.markdown("---")
         st.markdown("### 기억나는 단어를 입력하세요")
@@ -209,7 +209,7 @@ def finish_recall():
     # 소요시간 계산
     duration_seconds = None
     if st.session_state.recall_start_time:
-        duration_seconds = time.time() - st.session_state.recall_start_time
+        duration_seconds = time.monotonic() - st.session_state.recall_start_time
 
     # 제시된 단어 집합
     presented_words = {w.word: w for w in session.presented_words}
@@ -7,10 +7,10 @@ Free Recall Task Utilities
 
 import random
 import json
-from dataclasses import dataclass, field, asdict
+from dataclasses import dataclass, field
 from typing import List, Dict, Optional
-from datetime import datetime
-import uuid
+
+from session_ids import new_session_id
 
 
 # 한국어 정서단어 목록 (홍영지 등, 2016 기반)
@@ -117,11 +117,15 @@ FIXED_WORD_LIST = [
 FIXED_WORD_SET = {w["word"] for w in FIXED_WORD_LIST}
 
 
-def get_fixed_word_list(randomize: bool = True) -> 'List[WordStimulus]':
+def get_fixed_word_list(
+    randomize: bool = True,
+    rng: Optional[random.Random] = None
+) -> 'List[WordStimulus]':
     """고정 단어 목록을 WordStimulus 리스트로 반환
 
     Args:
         randomize: True면 무선화된 순서, False면 고정 순서
+        rng: 무선화에 사용할 난수 생성기 (session_seed.session_rng, 없으면 새 생성기)
     """
     words = [
         WordStimulus(
@@ -135,7 +139,7 @@ def get_fixed_word_list(randomize: bool = True) -> 'List[WordStimulus]':
     ]
 
     if randomize:
-        random.shuffle(words)
+        (rng or random.Random()).shuffle(words)
 
     for i, w in enumerate(words):
         w.presentation_order = i + 1
@@ -144,13 +148,13 @@ def get_fixed_word_list(randomize: bool = True) -> 'List[WordStimulus]':
 
 
 def generate_session_id() -> str:
-    """고유한 세션 ID 생성"""
-    return f"FR_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
+    """고유한 세션 ID 생성 ("FR_" + 시간순 정렬 가능 ID, session_ids.new_session_id)"""
+    return new_session_id(prefix="FR_")
 
 
-@dataclass
+@dataclass(slots=True)
 class WordStimulus:
-    """단어 자극 정보"""
+    """단어 자극 정보 (presentation_order는 목록 생성 후 지정되므로 가변)"""
     word: str
     valence: float
     arousal: float
@@ -158,10 +162,21 @@ class WordStimulus:
     category: str  # positive, negative, neutral
     presentation_order: int = 0
 
+    def to_dict(self) -> dict:
+        """딕셔너리로 변환"""
+        return {
+            "word": self.word,
+            "valence": self.valence,
+            "arousal": self.arousal,
+            "concreteness": self.concreteness,
+            "category": self.category,
+            "presentation_order": self.presentation_order,
+        }
+
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class RecallResponse:
-    """회상 응답 기록"""
+    """회상 응답 기록 (불변)"""
     recalled_word: str
     recall_order: int
     response_time: float  # 입력까지 걸린 시간 (초)
@@ -169,6 +184,17 @@ class RecallResponse:
     is_intrusion: bool  # 침입 오류 (제시되지 않은 단어)
     original_position: Optional[int] = None  # 원래 제시 순서
 
+    def to_dict(self) -> dict:
+        """딕셔너리로 변환"""
+        return {
+            "recalled_word": self.recalled_word,
+            "recall_order": self.recall_order,
+            "response_time": self.response_time,
+            "is_correct": self.is_correct,
+            "is_intrusion": self.is_intrusion,
+            "original_position": self.original_position,
+        }
+
 
 @dataclass
 class FreeRecallSession:
@@ -185,6 +211,7 @@ class FreeRecallSession:
     presentation_duration: float = 2.0  # 단어당 제시 시간 (초)
     distractor_duration: int = 30  # 방해과제 시간 (초)
     recall_duration: int = 90  # 회상 시간 (초)
+    seed: Optional[int] = None  # 단어 순서 무선화 시드 (session_seed.derive_seed)
 
     # 제시된 단어 목록
     presented_words: List[WordStimulus] = field(default_factory=list)
@@ -209,8 +236,9 @@ class FreeRecallSession:
             "presentation_duration": self.presentation_duration,
             "distractor_duration": self.distractor_duration,
             "recall_duration": self.recall_duration,
-            "presented_words": [asdict(w) for w in self.presented_words],
-            "recalled_words": [asdict(r) for r in self.recalled_words],
+            "seed": self.seed,
+            "presented_words": [w.to_dict() for w in self.presented_words],
+            "recalled_words": [r.to_dict() for r in self.recalled_words],
             "distractor_correct": self.distractor_correct,
             "distractor_total": self.distractor_total
         }
@@ -230,7 +258,8 @@ class WordListManager:
         self,
         condition: str = "mixed",
         num_words: int = 15,
-        match_arousal: bool = True
+        match_arousal: bool = True,
+        rng: Optional[random.Random] = None
     ) -> List[WordStimulus]:
         """
         실험 조건에 맞는 단어 목록 생성
@@ -239,14 +268,16 @@ class WordListManager:
             condition: "emotional" (정서단어만), "neutral" (중립단어만), "mixed" (혼합)
             num_words: 단어 개수
             match_arousal: 각성가 매칭 여부
+            rng: 단어 선택 / 무선화에 사용할 난수 생성기 (없으면 새 생성기)
         """
+        rng = rng or random.Random()
         words = []
 
         if condition == "emotional":
             # 긍정/부정 단어 동일 비율
             n_each = num_words // 2
-            pos_words = random.sample(self.word_db["positive"], min(n_each, len(self.word_db["positive"])))
-            neg_words = random.sample(self.word_db["negative"], min(num_words - n_each, len(self.word_db["negative"])))
+            pos_words = rng.sample(self.word_db["positive"], min(n_each, len(self.word_db["positive"])))
+            neg_words = rng.sample(self.word_db["negative"], min(num_words - n_each, len(self.word_db["negative"])))
 
             for w in pos_words:
                 words.append(WordStimulus(
@@ -266,7 +297,7 @@ class WordListManager:
                 ))
 
         elif condition == "neutral":
-            neutral_words = random.sample(self.word_db["neutral"], min(num_words, len(self.word_db["neutral"])))
+            neutral_words = rng.sample(self.word_db["neutral"], min(num_words, len(self.word_db["neutral"])))
             for w in neutral_words:
                 words.append(WordStimulus(
                     word=w["word"],
@@ -281,9 +312,9 @@ class WordListManager:
             n_each = num_words // 3
             remainder = num_words % 3
 
-            pos_words = random.sample(self.word_db["positive"], min(n_each, len(self.word_db["positive"])))
-            neg_words = random.sample(self.word_db["negative"], min(n_each, len(self.word_db["negative"])))
-            neu_words = random.sample(self.word_db["neutral"], min(n_each + remainder, len(self.word_db["neutral"])))
+            pos_words = rng.sample(self.word_db["positive"], min(n_each, len(self.word_db["positive"])))
+            neg_words = rng.sample(self.word_db["negative"], min(n_each, len(self.word_db["negative"])))
+            neu_words = rng.sample(self.word_db["neutral"], min(n_each + remainder, len(self.word_db["neutral"])))
 
             for w in pos_words:
                 words.append(WordStimulus(
@@ -311,7 +342,7 @@ class WordListManager:
                 ))
 
         # 무선화
-        random.shuffle(words)
+        rng.shuffle(words)
 
         # 제시 순서 부여
         for i, w in enumerate(words):
@@ -416,12 +447,17 @@ def prepare_for_spreadsheet(session: FreeRecallSession) -> List[List]:
 
 
 # 방해과제용 산수 문제 생성
-def generate_math_problem() -> tuple:
-    """간단한 산수 문제 생성 (덧셈/뺄셈)"""
-    a = random.randint(10, 99)
-    b = random.randint(1, 50)
+def generate_math_problem(rng: Optional[random.Random] = None) -> tuple:
+    """간단한 산수 문제 생성 (덧셈/뺄셈)
+
+    Args:
+        rng: 난수 생성기 (session_seed.session_rng, 없으면 새 생성기)
+    """
+    rng = rng or random.Random()
+    a = rng.randint(10, 99)
+    b = rng.randint(1, 50)
 
-    if random.choice([True, False]):
+    if rng.choice([True, False]):
         # 덧셈
         answer = a + b
         problem = f"{a} + {b} = ?"
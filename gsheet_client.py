@@ -0,0 +1,692 @@
+"""
+Google Spreadsheet Client Pool
+Google Spreadsheet worksheet 연결 풀
+
+프로세스 전역 캐시로 Streamlit 세션 간에 worksheet 연결을 공유하여
+매 기록마다 OAuth 인증 + 스프레드시트 메타데이터 조회를 반복하지 않음
+쓰기 할당량 제한(토큰 버킷), 지수 백오프, 대상별 서킷 브레이커 포함
+"""
+
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, Iterable, List, Optional, Tuple
+
+SCOPE = ["https://www.googleapis.com/auth/drive"]
+
+# 연결 백엔드: "gspread" (실제 Google Sheets) 또는 "fake" (fake_gsheet 로컬 대체 서버)
+# 부하 테스트 시 환경변수 GSHEET_BACKEND=fake 로 st.secrets 없이 사용
+GSHEET_BACKEND = os.environ.get("GSHEET_BACKEND", "gspread")
+
+# 토큰 만료 전 선제적으로 재연결하는 주기 (초)
+# 서비스 계정 access token 유효기간은 1시간
+TOKEN_REFRESH_SECONDS = 50 * 60
+
+# Sheets API 쓰기 할당량 (서비스 계정당 분당 60회) 및 순간 허용량
+WRITE_QUOTA_PER_MINUTE = 60
+WRITE_BURST = 10
+
+# 429/5xx 응답 시 같은 대상 재시도 (지수 백오프 + full jitter)
+MAX_RETRIES = 3
+BACKOFF_BASE_SECONDS = 1.0
+BACKOFF_MAX_SECONDS = 32.0
+
+# 연속 실패 시 해당 대상으로의 전송을 중단하는 서킷 브레이커
+BREAKER_FAILURE_THRESHOLD = 3
+BREAKER_COOLDOWN_SECONDS = 60.0
+
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# 캐시된 연결을 폐기하고 재인증할 상태 코드 (그 외 오류는 연결 유지)
+AUTH_ERROR_STATUS_CODES = {401, 403}
+
+# True면 메인/백업에 동시 기록 (가장 먼저 성공한 응답에서 반환)
+HEDGED_WRITES = False
+HEDGE_MAX_WORKERS = 8
+HEDGE_ACKED_KEYS_SIZE = 10000
+
+# 병렬 기록에서 실패한 대상 재전송 간격 (초) 및 최대 시도 횟수
+RECONCILE_RETRY_SECONDS = 30.0
+RECONCILE_MAX_ATTEMPTS = 10
+
+
+class _PooledWorksheet:
+    """풀에 저장되는 worksheet 연결 정보"""
+
+    def __init__(self, credentials, client, worksheet):
+        self.credentials = credentials
+        self.client = client
+        self.worksheet = worksheet
+        self.connected_at = time.monotonic()
+
+    def is_stale(self) -> bool:
+        """토큰 만료 또는 재연결 주기 경과 여부"""
+        if time.monotonic() - self.connected_at >= TOKEN_REFRESH_SECONDS:
+            return True
+        return bool(getattr(self.credentials, "access_token_expired", False))
+
+
+# (secret_key_name, sheet_url) -> _PooledWorksheet
+_pool: Dict[Tuple[str, str], _PooledWorksheet] = {}
+_pool_lock = threading.Lock()
+_key_locks: Dict[Tuple[str, str], threading.Lock] = {}
+
+_stats = {"connects": 0, "reuses": 0, "refreshes": 0, "invalidations": 0}
+
+
+def _connect(secret_key_name: str, sheet_url: str) -> _PooledWorksheet:
+    """새 인증 + worksheet 연결 생성"""
+    if GSHEET_BACKEND == "fake":
+        import fake_gsheet
+        client = fake_gsheet.authorize(user=secret_key_name)
+        return _PooledWorksheet(None, client, client.open_by_url(sheet_url).sheet1)
+
+    import streamlit as st
+    import gspread
+    from oauth2client.service_account import ServiceAccountCredentials
+
+    creds = ServiceAccountCredentials.from_json_keyfile_dict(
+        st.secrets[secret_key_name], SCOPE
+    )
+    client = gspread.authorize(creds)
+    worksheet = client.open_by_url(sheet_url).sheet1
+    return _PooledWorksheet(creds, client, worksheet)
+
+
+def _key_lock(key: Tuple[str, str]) -> threading.Lock:
+    with _pool_lock:
+        lock = _key_locks.get(key)
+        if lock is None:
+            lock = _key_locks[key] = threading.Lock()
+        return lock
+
+
+def get_worksheet(secret_key_name: str, sheet_url: str):
+    """
+    풀에서 worksheet 반환 (없거나 만료되었으면 새로 연결)
+
+    Args:
+        secret_key_name: Streamlit secrets에 저장된 서비스 계정 키 이름
+        sheet_url: Google Spreadsheet URL
+
+    Returns:
+        gspread worksheet 객체
+    """
+    key = (secret_key_name, sheet_url)
+
+    entry = _pool.get(key)
+    if entry is not None and not entry.is_stale():
+        _stats["reuses"] += 1
+        return entry.worksheet
+
+    # 같은 대상에 대한 동시 연결을 하나로 합침
+    with _key_lock(key):
+        entry = _pool.get(key)
+        if entry is not None and not entry.is_stale():
+            _stats["reuses"] += 1
+            return entry.worksheet
+
+        if entry is not None:
+            _stats["refreshes"] += 1
+        entry = _connect(secret_key_name, sheet_url)
+        _stats["connects"] += 1
+        with _pool_lock:
+            _pool[key] = entry
+        return entry.worksheet
+
+
+def invalidate_worksheet(secret_key_name: str, sheet_url: str):
+    """
+    풀에서 연결 제거 (API 오류 발생 시 호출 → 다음 요청에서 재연결)
+    """
+    with _pool_lock:
+        if _pool.pop((secret_key_name, sheet_url), None) is not None:
+            _stats["invalidations"] += 1
+
+
+def clear_pool():
+    """모든 연결 제거"""
+    with _pool_lock:
+        _pool.clear()
+
+
+def pool_stats() -> Dict:
+    """풀 상태 (모니터링용)"""
+    with _pool_lock:
+        connected = len(_pool)
+    return {"connected": connected, **_stats}
+
+
+# ============================================================
+# 할당량 제한 / 서킷 브레이커
+# ============================================================
+
+class CircuitOpenError(Exception):
+    """모든 대상의 서킷 브레이커가 열려 전송하지 않음"""
+
+
+class TokenBucket:
+    """
+    토큰 버킷 기반 전송 속도 제한 (스레드 안전)
+
+    rate_per_second 속도로 토큰이 채워지며 최대 burst개까지 누적
+    """
+
+    def __init__(self, rate_per_second: float, burst: int):
+        self.rate = rate_per_second
+        self.capacity = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self.waits = 0
+        self.wait_seconds = 0.0
+
+    def _reserve(self) -> float:
+        """토큰 하나 예약 후 기다려야 할 시간 반환"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            wait = -self._tokens / self.rate
+            self.waits += 1
+            self.wait_seconds += wait
+            return wait
+
+    def acquire(self):
+        """토큰 하나 획득 (부족하면 채워질 때까지 대기)"""
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+
+class CircuitBreaker:
+    """
+    대상별 서킷 브레이커
+
+    - closed: 정상 전송
+    - open: 연속 실패가 임계값에 도달 → cooldown 동안 전송 중단
+    - half_open: cooldown 후 한 번 시험 전송 (성공 시 closed, 실패 시 다시 open)
+                 시험 전송이 끝날 때까지 다른 호출은 거부
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+        cooldown_seconds: float = BREAKER_COOLDOWN_SECONDS
+    ):
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.open_count = 0
+        self.rejected = 0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """전송 허용 여부 (half_open에서는 시험 전송 하나만 허용)"""
+        with self._lock:
+            if self.state == "open":
+                if time.monotonic() - self.opened_at < self.cooldown_seconds:
+                    self.rejected += 1
+                    return False
+                self.state = "half_open"
+            if self.state == "half_open":
+                if self._probe_in_flight:
+                    self.rejected += 1
+                    return False
+                self._probe_in_flight = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self.consecutive_failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._probe_in_flight = False
+            self.consecutive_failures += 1
+            if self.state == "half_open" or self.consecutive_failures >= self.failure_threshold:
+                self.state = "open"
+                self.opened_at = time.monotonic()
+                self.open_count += 1
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            remaining = 0.0
+            if self.state == "open":
+                remaining = max(0.0, self.cooldown_seconds - (time.monotonic() - self.opened_at))
+            return {
+                "state": self.state,
+                "consecutive_failures": self.consecutive_failures,
+                "open_count": self.open_count,
+                "rejected": self.rejected,
+                "cooldown_remaining_seconds": remaining,
+            }
+
+
+# 서비스 계정(secret_key_name)별 토큰 버킷, 대상별 서킷 브레이커
+_limiters: Dict[str, TokenBucket] = {}
+_breakers: Dict[Tuple[str, str], CircuitBreaker] = {}
+_throttle_stats = {"throttled": 0, "retries": 0, "backoff_seconds": 0.0}
+
+
+def _limiter(secret_key_name: str) -> TokenBucket:
+    with _pool_lock:
+        limiter = _limiters.get(secret_key_name)
+        if limiter is None:
+            limiter = _limiters[secret_key_name] = TokenBucket(
+                WRITE_QUOTA_PER_MINUTE / 60.0, WRITE_BURST
+            )
+        return limiter
+
+
+def _breaker(secret_key_name: str, sheet_url: str) -> CircuitBreaker:
+    key = (secret_key_name, sheet_url)
+    with _pool_lock:
+        breaker = _breakers.get(key)
+        if breaker is None:
+            breaker = _breakers[key] = CircuitBreaker()
+        return breaker
+
+
+def _status_code(error: Exception) -> Optional[int]:
+    """gspread APIError 등에서 HTTP 상태 코드 추출"""
+    code = getattr(error, "code", None)
+    if isinstance(code, int):
+        return code
+    response = getattr(error, "response", None)
+    code = getattr(response, "status_code", None)
+    return code if isinstance(code, int) else None
+
+
+def _should_invalidate(error: Exception) -> bool:
+    """
+    캐시된 worksheet 폐기 여부
+
+    인증 오류(401/403) 또는 상태 코드 없는 전송 계층 오류(연결 끊김 등, OSError)만 폐기
+    429/5xx는 같은 연결로 재시도 (폐기하면 재시도마다 재인증 호출이 추가됨)
+    """
+    status = _status_code(error)
+    if status is not None:
+        return status in AUTH_ERROR_STATUS_CODES
+    return isinstance(error, OSError)
+
+
+def _backoff_seconds(attempt: int) -> float:
+    """지수 백오프 (full jitter)"""
+    return random.uniform(0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * (2 ** attempt)))
+
+
+def sheets_health() -> Dict:
+    """서킷 브레이커 상태 및 속도 제한/재시도 지표 (모니터링용)"""
+    with _pool_lock:
+        breakers = dict(_breakers)
+        limiters = dict(_limiters)
+    return {
+        "breakers": {
+            f"{key[0]} {key[1]}": breaker.snapshot() for key, breaker in breakers.items()
+        },
+        "limiters": {
+            name: {"waits": limiter.waits, "wait_seconds": limiter.wait_seconds}
+            for name, limiter in limiters.items()
+        },
+        **_throttle_stats,
+        "header_cache": {"cached": len(_header_cache), **_header_stats},
+        "hedge": {
+            **_hedge_stats,
+            "first_ack": dict(_hedge_stats["first_ack"]),
+            "reconcile_pending": len(_reconcile_tasks),
+        },
+    }
+
+
+# ============================================================
+# 헤더 상태 캐시
+# ============================================================
+
+# 대상별로 헤더 여부를 확인한 스키마 (헤더 컬럼 구성)
+_header_cache: Dict[Tuple[str, str], Tuple[str, ...]] = {}
+_header_stats = {"checks": 0, "hits": 0, "schema_mismatches": 0}
+
+
+def _header_verified(target: Tuple[str, str], header: List[str]) -> bool:
+    """
+    대상 시트의 헤더 상태를 이 스키마로 이미 확인했는지 여부
+
+    캐시된 스키마와 다르면(스키마 버전 불일치) 캐시를 무효화하고 다시 확인
+    """
+    schema = tuple(header)
+    with _pool_lock:
+        cached = _header_cache.get(target)
+        if cached == schema:
+            _header_stats["hits"] += 1
+            return True
+        if cached is not None:
+            _header_stats["schema_mismatches"] += 1
+            del _header_cache[target]
+        _header_stats["checks"] += 1
+        return False
+
+
+def _mark_header_verified(target: Tuple[str, str], header: List[str]):
+    with _pool_lock:
+        _header_cache[target] = tuple(header)
+
+
+def invalidate_header_cache(secret_key_name: Optional[str] = None, sheet_url: Optional[str] = None):
+    """헤더 상태 캐시 제거 (인자가 없으면 전체)"""
+    with _pool_lock:
+        if secret_key_name is None:
+            _header_cache.clear()
+        else:
+            _header_cache.pop((secret_key_name, sheet_url), None)
+
+
+def _append_to_target(
+    secret_key: str,
+    sheet_url: str,
+    rows: List[List],
+    header: Optional[List[str]] = None
+):
+    """
+    대상 시트 하나에 행 추가 (속도 제한 + 429/5xx 재시도 + 서킷 브레이커)
+
+    header가 주어지면 대상/스키마별 최초 1회만 첫 행을 조회하고,
+    빈 시트면 헤더를 데이터 앞에 붙여 append_rows 한 번으로 기록
+
+    Raises:
+        실패 시 마지막 예외, 서킷 브레이커가 열려 있으면 CircuitOpenError
+    """
+    breaker = _breaker(secret_key, sheet_url)
+    if not breaker.allow():
+        raise CircuitOpenError(f"Google Sheets target is cooling down: {secret_key}")
+    limiter = _limiter(secret_key)
+
+    target = (secret_key, sheet_url)
+    for attempt in range(MAX_RETRIES + 1):
+        try:
+            sheet = get_worksheet(secret_key, sheet_url)
+            # 헤더 확인은 대상/스키마별 최초 1회만 (빈 시트면 헤더를 같은 호출에 포함)
+            payload = rows
+            if header is not None and not _header_verified(target, header):
+                limiter.acquire()
+                if sheet.row_count == 0 or not sheet.row_values(1):
+                    payload = [header] + rows
+
+            # 한 번의 API 호출로 모든 행 추가
+            limiter.acquire()
+            sheet.append_rows(payload)
+            if header is not None:
+                _mark_header_verified(target, header)
+        except Exception as e:
+            if _should_invalidate(e):
+                invalidate_worksheet(secret_key, sheet_url)
+            status = _status_code(e)
+            if status == 429:
+                _throttle_stats["throttled"] += 1
+            if status in RETRYABLE_STATUS_CODES and attempt < MAX_RETRIES:
+                delay = _backoff_seconds(attempt)
+                _throttle_stats["retries"] += 1
+                _throttle_stats["backoff_seconds"] += delay
+                time.sleep(delay)
+                continue
+            breaker.record_failure()
+            raise
+        else:
+            breaker.record_success()
+            return
+
+
+def append_rows_with_failover(
+    sheet_info: List[Tuple[str, str]],
+    rows: List[List],
+    header: Optional[List[str]] = None,
+    idempotency_key: Optional[str] = None
+):
+    """
+    SHEET_INFO 순서대로 행 추가 시도 (실패 시 다음 백업으로 전환)
+
+    - 모든 API 호출은 서비스 계정별 토큰 버킷을 통과
+    - 429/5xx 응답은 같은 대상에 지수 백오프(jitter) 후 재시도
+    - 서킷 브레이커가 열린 대상은 cooldown 동안 건너뜀
+    - HEDGED_WRITES면 모든 대상에 동시 기록 (append_rows_hedged)
+
+    Args:
+        sheet_info: (secret_key_name, sheet_url) 목록 (메인 + 백업)
+        rows: 2D 리스트 형태의 데이터
+        header: 시트가 비어 있을 때 먼저 추가할 헤더 (없으면 생략, 대상별로 캐시)
+        idempotency_key: 묶음 식별자 (hedged 기록에서만 사용, make_idempotency_key 참고)
+
+    Raises:
+        모든 대상이 실패하면 마지막 예외, 모두 차단 상태면 CircuitOpenError
+    """
+    if HEDGED_WRITES and len(sheet_info) > 1:
+        append_rows_hedged(sheet_info, rows, header, idempotency_key)
+        return
+
+    last_error: Optional[Exception] = None
+    for secret_key, sheet_url in sheet_info:
+        try:
+            _append_to_target(secret_key, sheet_url, rows, header)
+            return
+        except CircuitOpenError as e:
+            if last_error is None:
+                last_error = e
+        except Exception as e:
+            last_error = e
+
+    if last_error is None:
+        raise CircuitOpenError("No Google Sheets targets configured")
+    raise last_error
+
+
+# ============================================================
+# 병렬(hedged) 기록: 메인 + 백업 동시 전송
+# ============================================================
+
+class _Reconcile:
+    """늦거나 실패한 대상에 대한 재전송 작업"""
+
+    __slots__ = ("key", "target", "rows", "header", "attempts", "due")
+
+    def __init__(self, key, target, rows, header):
+        self.key = key
+        self.target = target
+        self.rows = rows
+        self.header = header
+        self.attempts = 0
+        self.due = time.monotonic()
+
+
+_hedge_executor: Optional[ThreadPoolExecutor] = None
+_hedge_lock = threading.Lock()
+_hedge_cond = threading.Condition(_hedge_lock)
+_reconcile_tasks: List[_Reconcile] = []
+_reconcile_worker: Optional[threading.Thread] = None
+
+# 대상별 전송 완료된 idempotency key (최근 것만 보관)
+_acked_keys: "OrderedDict[Tuple[str, Tuple[str, str]], bool]" = OrderedDict()
+_hedge_stats = {
+    "hedged_writes": 0,
+    "first_ack": {},
+    "reconcile_scheduled": 0,
+    "reconciled": 0,
+    "reconcile_skipped": 0,
+    "reconcile_cancelled": 0,
+    "reconcile_failed": 0,
+}
+
+
+def make_idempotency_key(record_ids: Iterable[str]) -> str:
+    """
+    묶음에 포함된 레코드 식별자 기반 idempotency key
+
+    행 내용이 아닌 레코드 식별자(스풀 seq 범위, 큐 기록 UUID)로 만들어야
+    같은 초에 기록된 동일한 내용의 행이 중복으로 취급되지 않음
+
+    Args:
+        record_ids: 묶음의 레코드 식별자 (순서대로)
+    """
+    payload = json.dumps(list(record_ids))
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def _is_acked(key: str, target: Tuple[str, str]) -> bool:
+    with _hedge_lock:
+        return (key, target) in _acked_keys
+
+
+def _mark_acked(key: str, target: Tuple[str, str]):
+    with _hedge_lock:
+        _acked_keys[(key, target)] = True
+        _acked_keys.move_to_end((key, target))
+        while len(_acked_keys) > HEDGE_ACKED_KEYS_SIZE:
+            _acked_keys.popitem(last=False)
+
+
+def _executor() -> ThreadPoolExecutor:
+    global _hedge_executor
+    with _hedge_lock:
+        if _hedge_executor is None:
+            _hedge_executor = ThreadPoolExecutor(
+                max_workers=HEDGE_MAX_WORKERS, thread_name_prefix="gsheet-hedge"
+            )
+        return _hedge_executor
+
+
+def _hedged_target_write(key, target, rows, header):
+    if _is_acked(key, target):
+        return
+    _append_to_target(target[0], target[1], rows, header)
+    _mark_acked(key, target)
+
+
+def _schedule_reconcile(task: _Reconcile):
+    """늦은 대상 재전송 예약 (RECONCILE_RETRY_SECONDS 후)"""
+    global _reconcile_worker
+    with _hedge_cond:
+        task.due = time.monotonic() + RECONCILE_RETRY_SECONDS
+        _reconcile_tasks.append(task)
+        _hedge_stats["reconcile_scheduled"] += 1
+        if _reconcile_worker is None or not _reconcile_worker.is_alive():
+            _reconcile_worker = threading.Thread(
+                target=_run_reconcile, name="gsheet-reconcile", daemon=True
+            )
+            _reconcile_worker.start()
+        _hedge_cond.notify()
+
+
+def _cancel_reconciles(tasks: List[_Reconcile]):
+    """예약된 재전송 작업 취소 (아직 실행되지 않은 것만)"""
+    with _hedge_cond:
+        for task in tasks:
+            if task in _reconcile_tasks:
+                _reconcile_tasks.remove(task)
+                _hedge_stats["reconcile_cancelled"] += 1
+
+
+def _run_reconcile():
+    """재전송 워커: 예약 시각이 된 작업을 처리 (이미 ack된 key는 건너뜀)"""
+    while True:
+        with _hedge_cond:
+            while not _reconcile_tasks:
+                _hedge_cond.wait()
+            task = min(_reconcile_tasks, key=lambda t: t.due)
+            wait = task.due - time.monotonic()
+            if wait > 0:
+                _hedge_cond.wait(wait)
+                continue
+            _reconcile_tasks.remove(task)
+
+        if _is_acked(task.key, task.target):
+            _hedge_stats["reconcile_skipped"] += 1
+            continue
+
+        task.attempts += 1
+        try:
+            _hedged_target_write(task.key, task.target, task.rows, task.header)
+        except Exception:
+            if task.attempts < RECONCILE_MAX_ATTEMPTS:
+                _schedule_reconcile(task)
+            else:
+                _hedge_stats["reconcile_failed"] += 1
+        else:
+            _hedge_stats["reconciled"] += 1
+
+
+def append_rows_hedged(
+    sheet_info: List[Tuple[str, str]],
+    rows: List[List],
+    header: Optional[List[str]] = None,
+    idempotency_key: Optional[str] = None
+):
+    """
+    메인 + 백업에 동시에 기록하고 가장 먼저 성공한 응답에서 반환
+
+    늦게 끝나는 대상은 백그라운드에서 계속 진행하며, 실패하면 같은
+    idempotency key로 재전송 예약 (이미 성공한 대상에는 다시 쓰지 않음)
+    모든 대상이 실패하면 예약한 재전송을 취소하고 예외 발생
+    → 재전송은 호출자(스풀 / 기록 큐)가 담당하므로 같은 행이 두 번 기록되지 않음
+
+    Args:
+        sheet_info: (secret_key_name, sheet_url) 목록
+        rows: 2D 리스트 형태의 데이터
+        header: 시트가 비어 있을 때 먼저 추가할 헤더
+        idempotency_key: 같은 묶음 식별자 (없으면 호출마다 새 UUID)
+
+    Raises:
+        모든 대상이 실패하면 마지막 예외
+    """
+    key = idempotency_key or uuid.uuid4().hex
+    targets = [tuple(info) for info in sheet_info]
+    _hedge_stats["hedged_writes"] += 1
+
+    executor = _executor()
+    futures = {
+        executor.submit(_hedged_target_write, key, target, rows, header): target
+        for target in targets
+    }
+
+    def reconcile_on_failure(future):
+        if future.exception() is not None:
+            _schedule_reconcile(_Reconcile(key, futures[future], rows, header))
+
+    winner = None
+    last_error: Optional[BaseException] = None
+    scheduled: List[_Reconcile] = []
+    remaining = set(futures)
+    while remaining and winner is None:
+        done, remaining = wait(remaining, return_when=FIRST_COMPLETED)
+        for future in done:
+            error = future.exception()
+            if error is None and winner is None:
+                winner = futures[future]
+            elif error is not None:
+                last_error = error
+                task = _Reconcile(key, futures[future], rows, header)
+                scheduled.append(task)
+                _schedule_reconcile(task)
+
+    # 아직 진행 중인 대상은 완료 후 실패 시 재전송 예약
+    for future in remaining:
+        future.add_done_callback(reconcile_on_failure)
+
+    if winner is None:
+        _cancel_reconciles(scheduled)
+        raise last_error
+
+    first_ack = _hedge_stats["first_ack"]
+    first_ack[winner[0]] = first_ack.get(winner[0], 0) + 1
@@ -0,0 +1,454 @@
+"""
+Google Spreadsheet Write-Behind Queue
+Google Spreadsheet 백그라운드 기록 큐
+
+참가자 요청 경로(덱 클릭, 세션 시작/종료)에서 Sheets API 호출을 분리하여
+네트워크 상태와 무관하게 화면 갱신이 지연되지 않도록 함
+"""
+
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from typing import Dict, List, Optional, Tuple
+
+from gsheet_client import append_rows_with_failover, make_idempotency_key
+
+logger = logging.getLogger(__name__)
+
+# 큐 최대 길이 (초과 시 기록을 버리고 dropped로 집계)
+QUEUE_MAXSIZE = 10000
+
+# 프로세스 종료 시 남은 기록을 비우기 위해 기다리는 최대 시간 (초)
+SHUTDOWN_FLUSH_TIMEOUT = 10.0
+
+# 스풀 전송 실패 시 재시도 간격 (초)
+SPOOL_RETRY_INTERVAL = 5.0
+
+# 전송 실패한 큐 기록 재시도 간격 (지수 백오프, 버리지 않고 성공할 때까지 재시도)
+RETRY_BASE_SECONDS = 5.0
+RETRY_MAX_SECONDS = 300.0
+
+# 첫 기록 도착 후 다른 세션의 기록을 더 모으는 시간 (초, 시간 트리거)
+COALESCE_LINGER_SECONDS = 0.5
+
+# 한 번의 append_rows 호출에 담을 최대 행 수 (크기 트리거)
+COALESCE_MAX_ROWS = 5000
+
+# 최근 전송 기록 보관 개수 (flush_history)
+FLUSH_HISTORY_SIZE = 100
+
+
+class _WriteRecord:
+    """큐에 저장되는 기록 단위"""
+
+    __slots__ = (
+        "record_id", "sheet_info", "rows", "header", "error_message", "enqueued_at", "attempts", "retry_at"
+    )
+
+    def __init__(self, sheet_info, rows, header, error_message):
+        self.record_id = uuid.uuid4().hex  # 재시도해도 유지되는 기록 식별자 (idempotency key용)
+        self.sheet_info = sheet_info
+        self.rows = rows
+        self.header = header
+        self.error_message = error_message
+        self.enqueued_at = time.monotonic()
+        self.attempts = 0
+        self.retry_at: Optional[float] = None  # 재시도 예정 시각 (실패 후 대기 중일 때만)
+
+
+class _FlushGroup:
+    """같은 대상 시트로 한 번에 전송할 행 묶음"""
+
+    def __init__(self, sheet_info: Tuple):
+        self.sheet_info = sheet_info
+        self.header: Optional[List[str]] = None
+        self.rows: List[List] = []
+        self.records: List[_WriteRecord] = []
+        self.spool_acks: List[Tuple] = []  # (spool, seq, 레코드 수)
+        self.spool_rows = 0
+        self.record_ids: List[str] = []  # 포함된 레코드 식별자 (idempotency key용)
+
+    def add_rows(self, rows: List[List], header: Optional[List[str]]):
+        self.rows.extend(rows)
+        if self.header is None:
+            self.header = header
+
+    def idempotency_key(self) -> str:
+        return make_idempotency_key(self.record_ids)
+
+
+class SheetWriteQueue:
+    """
+    크기 제한 큐 + 워커 스레드 기반 Sheets 기록기
+
+    submit()은 즉시 반환하고, 워커 스레드가 모든 세션의 기록을 모아
+    대상 시트별로 append_rows 한 번씩 호출 (세션 간 배치 병합)
+    """
+
+    def __init__(self, maxsize: int = QUEUE_MAXSIZE):
+        self._queue: "queue.Queue[_WriteRecord]" = queue.Queue(maxsize=maxsize)
+        self._pending = 0
+        self._pending_cond = threading.Condition()
+        self._worker: Optional[threading.Thread] = None
+        self._worker_lock = threading.Lock()
+        self._spools: List = []
+        self._spool_wakeup = threading.Event()
+        self._drain_lock = threading.Lock()
+        self._retry: List[_WriteRecord] = []  # 전송 실패 후 재시도 대기 중인 기록 (워커 전용)
+
+        # 모니터링 지표
+        self._stats = {
+            "submitted": 0,
+            "written": 0,
+            "written_rows": 0,
+            "failed": 0,
+            "requeued": 0,
+            "dropped": 0,
+            "last_lag_seconds": 0.0,
+            "max_lag_seconds": 0.0,
+            "last_error": "",
+            "spool_written_rows": 0,
+            "spool_failed": 0,
+            "flushes": 0,
+            "last_flush_rows": 0,
+            "last_flush_seconds": 0.0,
+        }
+        self._flush_history: "deque[Dict]" = deque(maxlen=FLUSH_HISTORY_SIZE)
+
+    def _ensure_worker(self):
+        """워커 스레드 지연 시작"""
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._worker_lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(
+                    target=self._run, name="gsheet-writer", daemon=True
+                )
+                self._worker.start()
+
+    def submit(
+        self,
+        sheet_info: List[Tuple[str, str]],
+        rows: List[List],
+        header: Optional[List[str]] = None,
+        error_message: str = "Failed to log to Google Sheets"
+    ) -> bool:
+        """
+        기록 요청을 큐에 추가 (블로킹 없음)
+
+        Args:
+            sheet_info: (secret_key_name, sheet_url) 목록 (메인 + 백업)
+            rows: 2D 리스트 형태의 데이터
+            header: 시트가 비어 있을 때 먼저 추가할 헤더
+            error_message: 기록 실패 시 로그 메시지
+
+        Returns:
+            큐 추가 성공 여부 (큐가 가득 차면 False)
+        """
+        if not rows:
+            return True
+
+        self._ensure_worker()
+        record = _WriteRecord(tuple(sheet_info), rows, header, error_message)
+
+        with self._pending_cond:
+            self._pending += 1
+            self._stats["submitted"] += 1
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            with self._pending_cond:
+                self._stats["dropped"] += 1
+            self._done()
+            logger.error("%s: write queue full, dropped %d rows", error_message, len(rows))
+            return False
+
+        return True
+
+    def _done(self):
+        with self._pending_cond:
+            self._pending -= 1
+            if self._pending <= 0:
+                self._pending_cond.notify_all()
+
+    def attach_spool(self, spool, background: bool = True):
+        """
+        로컬 스풀 등록 (워커가 미전송 레코드를 주기적으로 Sheets에 전송)
+
+        Args:
+            spool: log_spool.LogSpool 객체
+            background: False면 등록만 하고 워커를 깨우지 않음 (drain_spools()로 직접 전송)
+        """
+        with self._worker_lock:
+            if spool not in self._spools:
+                self._spools.append(spool)
+        if background:
+            self.wake_spool()
+
+    def wake_spool(self):
+        """스풀에 새 레코드가 추가되었음을 워커에 알림"""
+        self._ensure_worker()
+        self._spool_wakeup.set()
+        self._wake_worker()
+
+    def _wake_worker(self):
+        # 큐 대기 중인 워커를 깨우기 위한 빈 항목 (큐가 가득 찼으면 곧 깨어나므로 생략)
+        try:
+            self._queue.put_nowait(None)
+        except queue.Full:
+            pass
+
+    def _run(self):
+        """워커 루프: 여러 세션의 기록을 모아 대상 시트별로 한 번에 전송"""
+        next_spool_retry = 0.0
+        while True:
+            records = self._collect() + self._due_retries()
+
+            include_spool = bool(self._spools) and (
+                self._spool_wakeup.is_set() or time.monotonic() >= next_spool_retry
+            )
+            if include_spool:
+                self._spool_wakeup.clear()
+
+            try:
+                with self._drain_lock:
+                    self._flush_records(records, include_spool)
+            finally:
+                # 재시도 대기로 돌린 기록은 계속 pending (flush()가 기다림)
+                for record in records:
+                    if record.retry_at is None:
+                        self._done()
+                with self._pending_cond:
+                    self._pending_cond.notify_all()
+
+            if include_spool:
+                next_spool_retry = time.monotonic() + SPOOL_RETRY_INTERVAL
+
+    def _collect(self) -> List[_WriteRecord]:
+        """
+        큐에서 기록 수집
+
+        첫 기록이 도착하면 COALESCE_LINGER_SECONDS 동안 다른 세션의 기록을 더 모으고,
+        행 수가 COALESCE_MAX_ROWS에 도달하면 즉시 반환 (크기/시간 트리거)
+        """
+        timeout = SPOOL_RETRY_INTERVAL
+        if self._retry:
+            next_retry = min(record.retry_at for record in self._retry)
+            timeout = min(timeout, max(0.0, next_retry - time.monotonic()))
+        try:
+            first = self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return []
+
+        records = [first] if first is not None else []
+        total_rows = len(first.rows) if first is not None else 0
+        deadline = time.monotonic() + COALESCE_LINGER_SECONDS
+        while total_rows < COALESCE_MAX_ROWS:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                record = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if record is None:
+                continue
+            records.append(record)
+            total_rows += len(record.rows)
+        return records
+
+    def _due_retries(self) -> List[_WriteRecord]:
+        """재시도 시각이 된 기록을 대기 목록에서 꺼냄"""
+        now = time.monotonic()
+        due = [record for record in self._retry if record.retry_at <= now]
+        if due:
+            self._retry = [record for record in self._retry if record.retry_at > now]
+            for record in due:
+                record.retry_at = None
+        return due
+
+    def _requeue(self, record: _WriteRecord):
+        """전송 실패한 기록을 지수 백오프 후 재시도 대기 목록에 추가"""
+        record.attempts += 1
+        delay = min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * (2 ** (record.attempts - 1)))
+        record.retry_at = time.monotonic() + delay
+        self._retry.append(record)
+        self._stats["requeued"] += 1
+
+    def drain_spools(self) -> Optional[Exception]:
+        """
+        스풀의 미전송 레코드를 호출한 스레드에서 즉시 전송 (동기 기록 모드용)
+
+        Returns:
+            전송 실패 시 마지막 예외, 모두 전송되었으면 None
+        """
+        try:
+            with self._drain_lock:
+                return self._flush_records([], include_spool=True)
+        finally:
+            with self._pending_cond:
+                self._pending_cond.notify_all()
+
+    def _flush_records(
+        self,
+        records: List[_WriteRecord],
+        include_spool: bool
+    ) -> Optional[Exception]:
+        """
+        큐 기록 + 스풀 미전송 레코드를 대상 시트별로 묶어 append_rows 한 번씩 호출
+
+        스풀 레코드는 먼저 기록된 것이므로 같은 시트 묶음의 앞쪽에 배치
+
+        Returns:
+            전송 실패 시 마지막 예외, 모두 성공했으면 None
+        """
+        groups: "OrderedDict[Tuple, _FlushGroup]" = OrderedDict()
+
+        def group_for(sheet_info) -> _FlushGroup:
+            key = tuple(tuple(info) for info in sheet_info)
+            if key not in groups:
+                groups[key] = _FlushGroup(key)
+            return groups[key]
+
+        if include_spool:
+            for spool in list(self._spools):
+                pending = spool.pending(max_rows=COALESCE_MAX_ROWS)
+                if not pending:
+                    continue
+                # ack는 seq 이하 전체에 적용되므로 같은 대상의 연속 레코드만 포함
+                batch = [pending[0]]
+                for record in pending[1:]:
+                    if record["sheet_info"] != pending[0]["sheet_info"]:
+                        break
+                    batch.append(record)
+                group = group_for(pending[0]["sheet_info"])
+                for record in batch:
+                    group.add_rows(record["rows"], record["header"])
+                    group.spool_rows += len(record["rows"])
+                group.spool_acks.append((spool, batch[-1]["seq"], len(batch)))
+                group.record_ids.append(
+                    f"spool:{os.path.abspath(spool.directory)}:{batch[0]['seq']}-{batch[-1]['seq']}"
+                )
+
+        now = time.monotonic()
+        for record in records:
+            lag = now - record.enqueued_at
+            self._stats["last_lag_seconds"] = lag
+            self._stats["max_lag_seconds"] = max(self._stats["max_lag_seconds"], lag)
+            group = group_for(record.sheet_info)
+            group.add_rows(record.rows, record.header)
+            group.records.append(record)
+            group.record_ids.append(record.record_id)
+
+        error = None
+        for group in groups.values():
+            group_error = self._flush_group(group)
+            if group_error is not None:
+                error = group_error
+        return error
+
+    def _flush_group(self, group: "_FlushGroup") -> Optional[Exception]:
+        """묶음 하나를 append_rows 한 번으로 전송하고 지표 기록"""
+        started = time.monotonic()
+        error = None
+        try:
+            append_rows_with_failover(
+                list(group.sheet_info), group.rows, group.header, group.idempotency_key()
+            )
+        except Exception as e:
+            error = e
+            self._stats["failed"] += len(group.records)
+            if group.spool_acks:
+                self._stats["spool_failed"] += 1
+            messages = {record.error_message for record in group.records}
+            if group.spool_acks:
+                messages.add("Failed to drain log spool")
+            self._stats["last_error"] = f"{'; '.join(sorted(messages))}. Error: {e}"
+            logger.error("%s (%d rows, will retry). Error: %s", "; ".join(sorted(messages)), len(group.rows), e)
+            # 큐 기록은 버리지 않고 재시도 (스풀 레코드는 ack되지 않았으므로 스풀에서 재전송)
+            for record in group.records:
+                self._requeue(record)
+        else:
+            for spool, seq, _ in group.spool_acks:
+                spool.ack(seq)
+            self._stats["written"] += len(group.records)
+            self._stats["written_rows"] += len(group.rows)
+            self._stats["spool_written_rows"] += group.spool_rows
+
+        elapsed = time.monotonic() - started
+        self._stats["flushes"] += 1
+        self._stats["last_flush_rows"] = len(group.rows)
+        self._stats["last_flush_seconds"] = elapsed
+        self._flush_history.append({
+            "rows": len(group.rows),
+            "records": len(group.records) + sum(n for _, _, n in group.spool_acks),
+            "seconds": elapsed,
+            "ok": error is None,
+        })
+        return error
+
+    def _spool_pending(self) -> int:
+        return sum(spool.pending_count() for spool in self._spools)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        큐에 쌓인 기록과 스풀의 미전송 레코드가 모두 처리될 때까지 대기
+
+        Returns:
+            timeout 안에 모두 처리되었으면 True
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._pending_cond:
+            while self._pending > 0 or self._spool_pending() > 0:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._pending_cond.wait(remaining)
+        return True
+
+    def stats(self) -> Dict:
+        """큐 깊이 및 지연 지표 (모니터링용)"""
+        with self._pending_cond:
+            pending = self._pending
+        return {
+            "depth": self._queue.qsize(),
+            "pending": pending,
+            "retry_pending": len(self._retry),
+            "spool_pending": self._spool_pending(),
+            **self._stats,
+        }
+
+    def flush_history(self) -> List[Dict]:
+        """최근 전송별 행 수 / 소요시간 / 성공 여부 (오래된 순)"""
+        return list(self._flush_history)
+
+
+_writer: Optional[SheetWriteQueue] = None
+_writer_lock = threading.Lock()
+
+
+def get_writer() -> SheetWriteQueue:
+    """프로세스 전역 기록 큐 반환 (Streamlit 세션 간 공유)"""
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = SheetWriteQueue()
+    return _writer
+
+
+def writer_stats() -> Dict:
+    """프로세스 전역 기록 큐 지표"""
+    return get_writer().stats()
+
+
+@atexit.register
+def _flush_on_exit():
+    """프로세스 종료 시 남은 기록 비우기"""
+    if _writer is not None:
+        _writer.flush(timeout=SHUTDOWN_FLUSH_TIMEOUT)
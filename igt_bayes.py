@@ -0,0 +1,384 @@
+"""
+Iowa Gambling Task - Hierarchical Bayesian Sampler
+IGT 모델 계층 베이지안 추정 (NumPy만 사용하는 MCMC)
+
+모형 (igt_models 모델의 비유계 파라미터 공간):
+    z[i, k] ~ Normal(mu[k], sigma[k])         참가자 i, 파라미터 k
+    mu[k] ~ Normal(0, MU_PRIOR_SD)
+    sigma[k]^2 ~ InvGamma(SIGMA_PRIOR_SHAPE, SIGMA_PRIOR_SCALE)
+    선택 ~ softmax(모델 효용)
+
+샘플러: Metropolis-within-Gibbs
+- 참가자 파라미터: 참가자별 블록 random-walk Metropolis (모든 참가자를 우도 호출 한 번으로
+  동시에 제안 / 수락), warmup 동안 참가자별 표본 공분산 × 2.38² / k로 제안 분포를 맞추고
+  제안 크기를 수락률 0.234 목표로 미세 조정
+- 집단 파라미터 mu / sigma: 켤레 사전분포로 Gibbs 샘플링
+
+체인은 프로세스별로 병렬 실행하고 draw는 output_dir의 memmap(.npy)에 바로 기록
+요약 시 split R-hat / ESS / 체인별 수락률 계산 (수락률이 목표에서 벗어나면 경고)
+
+사용법:
+    result = sample("pvl_delta", ChoiceData.from_sessions(sessions), output_dir="draws_pvl")
+    print(result["summary"]["group"])
+"""
+
+import json
+import os
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional
+
+import numpy as np
+
+from igt_models import ChoiceData, get_model, log_likelihood
+
+# 집단 사전분포
+MU_PRIOR_SD = 1.5
+SIGMA_PRIOR_SHAPE = 1.0
+SIGMA_PRIOR_SCALE = 1.0
+
+# 적응형 Metropolis 설정
+TARGET_ACCEPT = 0.234
+ADAPT_START = 100       # 이 반복 이후부터 파라미터별 scale을 표본 표준편차로 갱신
+ADAPT_DECAY = 0.6       # Robbins-Monro 적응 감쇠 지수
+INITIAL_PROPOSAL_SD = 0.3
+
+# 수락률이 이 범위를 벗어난 체인이 있으면 경고 (요약에도 기록)
+ACCEPT_WARN_RANGE = (0.15, 0.35)
+
+# memmap flush 간격 (draw 수)
+FLUSH_EVERY = 100
+
+META_FILE = "meta.json"
+
+
+def _draw_path(output_dir: str, chain: int, name: str) -> str:
+    return os.path.join(output_dir, f"chain{chain}_{name}.npy")
+
+
+def _run_chain(task: Dict) -> Dict:
+    """
+    체인 하나 실행 (작업 프로세스에서 실행, draw는 memmap에 기록)
+
+    Args:
+        task: model, data, chain, seed, n_warmup, n_draws, thin, output_dir
+    """
+    model = get_model(task["model"])
+    data: ChoiceData = task["data"]
+    rng = np.random.default_rng(task["seed"])
+    n, k = data.n_participants, len(model.param_names)
+    n_warmup, n_draws, thin = task["n_warmup"], task["n_draws"], task["thin"]
+
+    draws = {
+        "z": np.lib.format.open_memmap(
+            _draw_path(task["output_dir"], task["chain"], "z"), mode="w+", dtype=np.float64,
+            shape=(n_draws, n, k)),
+        "mu": np.lib.format.open_memmap(
+            _draw_path(task["output_dir"], task["chain"], "mu"), mode="w+", dtype=np.float64,
+            shape=(n_draws, k)),
+        "sigma": np.lib.format.open_memmap(
+            _draw_path(task["output_dir"], task["chain"], "sigma"), mode="w+", dtype=np.float64,
+            shape=(n_draws, k)),
+        "log_lik": np.lib.format.open_memmap(
+            _draw_path(task["output_dir"], task["chain"], "log_lik"), mode="w+", dtype=np.float64,
+            shape=(n_draws, n)),
+    }
+
+    # 초기값 (체인마다 다르게 분산)
+    z = rng.normal(0.0, 1.0, size=(n, k))
+    mu = rng.normal(0.0, 0.5, size=k)
+    sigma = np.ones(k)
+    ll = log_likelihood(model, model.to_params(z), data)
+
+    # 제안 분포: N(z, (2.38² / k) × exp(2 log_scale) × Σ) (Haario et al., 2001)
+    # Σ는 참가자별 표본 공분산 (ADAPT_START 전에는 INITIAL_PROPOSAL_SD² I),
+    # 2.38 / sqrt(k)는 k차원 random-walk 최적 scale, log_scale은 수락률로 미세 조정
+    base_scale = 2.38 / np.sqrt(k)
+    log_scale = np.zeros(n)
+    proposal_chol = np.broadcast_to(INITIAL_PROPOSAL_SD * np.eye(k), (n, k, k)).copy()
+    # 표본 공분산은 초기값에서 멀어지는 구간을 제외하고 ADAPT_START // 2부터 누적
+    stats_start = ADAPT_START // 2
+    mean = np.zeros((n, k))
+    m2 = np.zeros((n, k, k))
+    accepted = 0.0
+
+    written = 0
+    for iteration in range(n_warmup + n_draws * thin):
+        # 1. 참가자 파라미터: 블록 Metropolis (참가자별 독립 수락)
+        noise = np.einsum("nij,nj->ni", proposal_chol, rng.standard_normal((n, k)))
+        proposal = z + (np.exp(log_scale) * base_scale)[:, np.newaxis] * noise
+        ll_new = log_likelihood(model, model.to_params(proposal), data)
+        prior_old = -0.5 * (((z - mu) / sigma) ** 2).sum(axis=1)
+        prior_new = -0.5 * (((proposal - mu) / sigma) ** 2).sum(axis=1)
+        log_ratio = ll_new + prior_new - ll - prior_old
+        accept = np.log(rng.random(n)) < log_ratio
+        z = np.where(accept[:, np.newaxis], proposal, z)
+        ll = np.where(accept, ll_new, ll)
+
+        if iteration < n_warmup:
+            # 제안 크기 적응 (수락률 → TARGET_ACCEPT)
+            # 공분산으로 바뀌는 ADAPT_START에서 log_scale / 감쇠를 다시 시작
+            restart = ADAPT_START if iteration >= ADAPT_START else 0
+            gain = (iteration - restart + 1) ** -ADAPT_DECAY
+            log_scale += gain * (accept - TARGET_ACCEPT)
+            # 참가자별 표본 공분산 (Welford)
+            if iteration >= stats_start:
+                count = iteration - stats_start + 1
+                delta = z - mean
+                mean += delta / count
+                m2 += delta[:, :, np.newaxis] * (z - mean)[:, np.newaxis, :]
+            if iteration == ADAPT_START:
+                log_scale[:] = 0.0
+            if iteration >= ADAPT_START:
+                proposal_chol = np.linalg.cholesky(m2 / count + 1e-6 * np.eye(k))
+        else:
+            accepted += accept.mean()
+
+        # 2. 집단 평균 (정규 켤레)
+        precision = 1.0 / MU_PRIOR_SD ** 2 + n / sigma ** 2
+        mu = (z.sum(axis=0) / sigma ** 2) / precision + rng.standard_normal(k) / np.sqrt(precision)
+
+        # 3. 집단 표준편차 (역감마 켤레)
+        shape = SIGMA_PRIOR_SHAPE + n / 2.0
+        rate = SIGMA_PRIOR_SCALE + 0.5 * ((z - mu) ** 2).sum(axis=0)
+        sigma = np.sqrt(rate / rng.gamma(shape, 1.0, size=k))
+
+        if iteration >= n_warmup and (iteration - n_warmup) % thin == 0:
+            draws["z"][written] = z
+            draws["mu"][written] = mu
+            draws["sigma"][written] = sigma
+            draws["log_lik"][written] = ll
+            written += 1
+            if written % FLUSH_EVERY == 0:
+                for array in draws.values():
+                    array.flush()
+
+    for array in draws.values():
+        array.flush()
+
+    sampling_iterations = max(n_draws * thin, 1)
+    return {"chain": task["chain"], "accept_rate": accepted / sampling_iterations}
+
+
+# ============================================================
+# 진단
+# ============================================================
+
+def _split_chains(draws: np.ndarray) -> np.ndarray:
+    """(C, S, ...) → (2C, S // 2, ...) (각 체인을 앞 / 뒤 절반으로 나눔)"""
+    half = draws.shape[1] // 2
+    return np.concatenate([draws[:, :half], draws[:, -half:]], axis=0)
+
+
+def split_rhat(draws: np.ndarray) -> np.ndarray:
+    """
+    split R-hat (Gelman et al., 2013)
+
+    Args:
+        draws: (체인, draw, ...) 배열
+
+    Returns:
+        (...) 배열 (1.01 이하면 수렴으로 판단)
+    """
+    split = _split_chains(np.asarray(draws, dtype=float))
+    s = split.shape[1]
+    chain_means = split.mean(axis=1)
+    between = s * chain_means.var(axis=0, ddof=1)
+    within = split.var(axis=1, ddof=1).mean(axis=0)
+    var_plus = (s - 1) / s * within + between / s
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.sqrt(var_plus / within)
+
+
+def effective_sample_size(draws: np.ndarray) -> np.ndarray:
+    """
+    유효 표본 크기 (split 체인, Geyer initial monotone sequence)
+
+    Args:
+        draws: (체인, draw, ...) 배열
+
+    Returns:
+        (...) 배열
+    """
+    split = _split_chains(np.asarray(draws, dtype=float))
+    c, s = split.shape[:2]
+    centered = split - split.mean(axis=1, keepdims=True)
+
+    # FFT 자기공분산 (draw 축)
+    size = 1 << (2 * s - 1).bit_length()
+    spectrum = np.fft.rfft(centered, n=size, axis=1)
+    acov = np.fft.irfft(spectrum * np.conj(spectrum), n=size, axis=1)[:, :s] / s
+
+    chain_means = split.mean(axis=1)
+    within = split.var(axis=1, ddof=1).mean(axis=0)
+    var_plus = (s - 1) / s * within + (chain_means.var(axis=0, ddof=1) if c > 1 else 0.0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rho = 1.0 - (within - acov.mean(axis=0)) / var_plus
+    rho[0] = 1.0
+
+    # 인접 쌍 합이 양수인 구간만, 단조 감소로 보정
+    n_pairs = s // 2
+    pairs = rho[0:2 * n_pairs:2] + rho[1:2 * n_pairs:2]
+    positive = np.cumprod(pairs > 0, axis=0).astype(bool)
+    pairs = np.minimum.accumulate(np.where(positive, pairs, 0.0), axis=0)
+    tau = -1.0 + 2.0 * pairs.sum(axis=0)
+    tau = np.maximum(tau, 1.0 / np.log10(c * s))
+    return c * s / tau
+
+
+# ============================================================
+# 실행 / 불러오기
+# ============================================================
+
+def load_draws(output_dir: str) -> Dict:
+    """
+    저장된 draw 불러오기 (memmap, 체인 축이 첫 번째)
+
+    Returns:
+        meta, z (C, S, N, K), mu (C, S, K), sigma (C, S, K), log_lik (C, S, N)
+    """
+    with open(os.path.join(output_dir, META_FILE), "r", encoding="utf-8") as f:
+        meta = json.load(f)
+    result = {"meta": meta}
+    for name in ("z", "mu", "sigma", "log_lik"):
+        result[name] = np.stack([
+            np.load(_draw_path(output_dir, chain, name), mmap_mode="r")
+            for chain in range(meta["n_chains"])
+        ])
+    return result
+
+
+def summarize(output_dir: str) -> Dict:
+    """
+    사후분포 요약 (파라미터 원래 범위 기준)
+
+    Returns:
+        - group: 파라미터별 집단 평균(mu 변환값)의 mean / sd / 2.5% / 97.5% / rhat / ess
+        - individual: 파라미터별 참가자 (N,) 사후 평균 / rhat / ess
+        - max_rhat / min_ess: 전체 파라미터(z, mu, sigma) 기준
+        - accept_rates: 체인별 참가자 블록 평균 수락률 (sample 완료 후 기록된 경우)
+        - accept_warning: 수락률이 ACCEPT_WARN_RANGE를 벗어난 체인이 있으면 True
+    """
+    draws = load_draws(output_dir)
+    meta = draws["meta"]
+    model = get_model(meta["model"])
+
+    group_params = model.to_params(np.asarray(draws["mu"]))
+    individual_params = model.to_params(np.asarray(draws["z"]))
+
+    group = {}
+    individual = {}
+    for name in model.param_names:
+        values = group_params[name]
+        group[name] = {
+            "mean": float(values.mean()),
+            "sd": float(values.std()),
+            "q2.5": float(np.percentile(values, 2.5)),
+            "q97.5": float(np.percentile(values, 97.5)),
+            "rhat": float(split_rhat(values)),
+            "ess": float(effective_sample_size(values)),
+        }
+        values = individual_params[name]
+        individual[name] = {
+            "mean": values.mean(axis=(0, 1)),
+            "rhat": split_rhat(values),
+            "ess": effective_sample_size(values),
+        }
+
+    rhats = [split_rhat(np.asarray(draws[name])) for name in ("z", "mu", "sigma")]
+    esss = [effective_sample_size(np.asarray(draws[name])) for name in ("z", "mu", "sigma")]
+    accept_rates = meta.get("accept_rates", [])
+    low, high = ACCEPT_WARN_RANGE
+    return {
+        "model": model.name,
+        "participant_ids": meta["participant_ids"],
+        "group": group,
+        "individual": individual,
+        "max_rhat": float(max(np.nanmax(r) for r in rhats)),
+        "min_ess": float(min(np.nanmin(e) for e in esss)),
+        "accept_rates": accept_rates,
+        "accept_warning": any(not low <= rate <= high for rate in accept_rates),
+    }
+
+
+def sample(
+    model,
+    data: ChoiceData,
+    output_dir: str,
+    n_chains: int = 4,
+    n_warmup: int = 1000,
+    n_draws: int = 1000,
+    thin: int = 1,
+    seed: int = 0,
+    workers: Optional[int] = None
+) -> Dict:
+    """
+    계층 모델 MCMC 실행
+
+    Args:
+        model: 모델 이름 또는 IGTModel
+        data: 선택 데이터 (ChoiceData.from_sessions 등)
+        output_dir: draw 저장 디렉토리 (체인별 .npy memmap + meta.json)
+        n_chains: 체인 수
+        n_warmup: 적응 / 버림 반복 수
+        n_draws: 체인당 저장할 draw 수
+        thin: draw 간격
+        seed: 기준 시드 (체인별 시드는 SeedSequence로 파생)
+        workers: 프로세스 수 (None이면 n_chains, 1이면 현재 프로세스에서 순차 실행)
+
+    Returns:
+        output_dir, accept_rates, summary (summarize 결과)
+    """
+    model = get_model(model)
+    os.makedirs(output_dir, exist_ok=True)
+    meta = {
+        "model": model.name,
+        "param_names": list(model.param_names),
+        "participant_ids": list(data.participant_ids),
+        "n_chains": n_chains,
+        "n_warmup": n_warmup,
+        "n_draws": n_draws,
+        "thin": thin,
+        "seed": seed,
+    }
+    meta_path = os.path.join(output_dir, META_FILE)
+    with open(meta_path, "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+
+    seeds = np.random.SeedSequence(seed).spawn(n_chains)
+    tasks = [{
+        "model": model.name,
+        "data": data,
+        "chain": chain,
+        "seed": seeds[chain],
+        "n_warmup": n_warmup,
+        "n_draws": n_draws,
+        "thin": thin,
+        "output_dir": output_dir,
+    } for chain in range(n_chains)]
+
+    if workers == 1 or n_chains == 1:
+        outputs = [_run_chain(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers or n_chains) as executor:
+            outputs = list(executor.map(_run_chain, tasks))
+
+    accept_rates = [float(output["accept_rate"]) for output in sorted(outputs, key=lambda o: o["chain"])]
+    meta["accept_rates"] = accept_rates
+    with open(meta_path, "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+
+    low, high = ACCEPT_WARN_RANGE
+    off_target = [f"chain {c}: {rate:.3f}" for c, rate in enumerate(accept_rates) if not low <= rate <= high]
+    if off_target:
+        warnings.warn(
+            f"Metropolis acceptance outside {low}-{high} (target {TARGET_ACCEPT}): "
+            f"{', '.join(off_target)}; consider a longer warmup",
+            RuntimeWarning
+        )
+
+    return {
+        "output_dir": output_dir,
+        "accept_rates": accept_rates,
+        "summary": summarize(output_dir),
+    }
@@ -0,0 +1,304 @@
+"""
+Iowa Gambling Task - Choice Sequence Codec
+IGT 선택 순서 압축 인코딩 (덱당 2비트 + CRC32)
+
+보상 / 손실 / 잔액은 선택 순서와 DeckManager 스케줄로 다시 계산할 수 있으므로
+덱 선택만 2비트씩 묶어 저장 (100시행 = 25바이트)
+디코더는 헤더의 스케줄 이름 / 시드로 참가자 스케줄을 재생성하고 (igt_schedules.replay_schedule)
+DeckManager.draw_card로 TrialResult 행을 재구성
+
+형식 (big-endian):
+    version   uint8    (2, 버전 1은 스케줄 / 시드 없음 → 기본 스케줄로 디코딩)
+    flags     uint8    (bit 0: 시각 포함, bit 1: 시드 포함)
+    n_trials  uint16
+    initial   int32    시작 잔액
+    name_len  uint8    스케줄 이름 길이 (0: 기본 스케줄)
+    name      name_len bytes  스케줄 이름 (UTF-8)
+    [시드]     uint64   참가자별 스케줄 시드
+    choices   ceil(n_trials / 4) bytes  (첫 선택이 상위 비트, A=0 B=1 C=2 D=3)
+    [시각]     int64 첫 시행 epoch ns + 이후 시행 간격(µs) zigzag varint (µs 단위로 절사)
+    crc32     uint32   (앞의 모든 바이트)
+
+시트 셀 등 텍스트로 저장할 때는 encode_text / decode_text (URL-safe base64) 사용
+"""
+
+import base64
+import struct
+import zlib
+from typing import Callable, Dict, List, Optional, Sequence
+
+from igt_schedules import replay_schedule
+from igt_utils import (
+    DECK_LETTERS,
+    DeckManager,
+    GameSession,
+    TrialColumns,
+    TrialResult,
+)
+
+FORMAT_VERSION = 2
+FLAG_TIMESTAMPS = 0x01
+FLAG_SEED = 0x02
+
+# 디코딩 가능한 버전 (1: 스케줄 이름 / 시드 없음)
+_SUPPORTED_VERSIONS = (1, 2)
+
+_HEADER = struct.Struct(">BBHi")
+_NAME_LENGTH = struct.Struct(">B")
+_SEED = struct.Struct(">Q")
+_TIMESTAMP_BASE = struct.Struct(">q")
+_CRC = struct.Struct(">I")
+_DECK_CODE = {deck: code for code, deck in enumerate(DECK_LETTERS)}
+
+
+class ChoiceCodecError(ValueError):
+    """인코딩 데이터 손상 / 형식 오류"""
+
+
+def _write_varint(out: bytearray, value: int):
+    """부호 있는 정수를 zigzag varint로 추가"""
+    value = (value << 1) ^ (value >> 63)
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(data: bytes, position: int):
+    result = 0
+    shift = 0
+    while True:
+        if position >= len(data):
+            raise ChoiceCodecError("Truncated timestamp data")
+        byte = data[position]
+        position += 1
+        result |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            break
+        shift += 7
+    return (result >> 1) ^ -(result & 1), position
+
+
+def encode_choices(
+    decks: Sequence[str],
+    timestamps_ns: Optional[Sequence[int]] = None,
+    initial_balance: int = 2000,
+    schedule: str = "",
+    seed: Optional[int] = None
+) -> bytes:
+    """
+    덱 선택 순서 인코딩
+
+    Args:
+        decks: 덱 선택 순서 ('A'-'D' 목록 또는 문자열)
+        timestamps_ns: 시행별 epoch ns (없으면 시각 생략, µs 단위로 저장)
+        initial_balance: 시작 잔액
+        schedule: 스케줄 이름 (DeckSchedule.name, 빈 문자열이면 기본 스케줄)
+        seed: 참가자별 스케줄 시드 (재배치 스케줄 재생성용)
+
+    Returns:
+        인코딩된 바이트열
+    """
+    n = len(decks)
+    if n > 0xFFFF:
+        raise ValueError("Too many trials to encode")
+    if timestamps_ns is not None and len(timestamps_ns) != n:
+        raise ValueError("timestamps_ns must have one entry per trial")
+
+    name = schedule.encode("utf-8")
+    if len(name) > 0xFF:
+        raise ValueError("Schedule name too long to encode")
+
+    flags = FLAG_TIMESTAMPS if timestamps_ns is not None and n else 0
+    if seed is not None:
+        flags |= FLAG_SEED
+    out = bytearray(_HEADER.pack(FORMAT_VERSION, flags, n, initial_balance))
+    out += _NAME_LENGTH.pack(len(name)) + name
+    if seed is not None:
+        out += _SEED.pack(seed)
+
+    packed = bytearray((n + 3) // 4)
+    for i, deck in enumerate(decks):
+        try:
+            code = _DECK_CODE[deck]
+        except KeyError:
+            raise ValueError(f"Invalid deck: {deck}") from None
+        packed[i >> 2] |= code << (6 - 2 * (i & 3))
+    out += packed
+
+    if flags & FLAG_TIMESTAMPS:
+        previous = timestamps_ns[0] // 1000
+        out += _TIMESTAMP_BASE.pack(previous * 1000)
+        for timestamp in timestamps_ns[1:]:
+            micros = timestamp // 1000
+            _write_varint(out, micros - previous)
+            previous = micros
+
+    out += _CRC.pack(zlib.crc32(out))
+    return bytes(out)
+
+
+def encode_session(session: GameSession, deck_manager: Optional[DeckManager] = None) -> bytes:
+    """
+    GameSession의 선택 순서 / 시각 / 스케줄 인코딩
+
+    Args:
+        session: 인코딩할 세션 (session.seed를 함께 저장)
+        deck_manager: 세션에 사용한 DeckManager (없으면 기본 스케줄로 기록)
+    """
+    trials = session.trials
+    if isinstance(trials, TrialColumns):
+        decks = [DECK_LETTERS[code] for code in trials.deck]
+        timestamps = list(trials.timestamp_ns)
+    else:
+        decks = [trial.deck_choice for trial in trials]
+        timestamps = [trial.timestamp_ns for trial in trials]
+    if any(timestamp is None or timestamp == 0 for timestamp in timestamps):
+        timestamps = None
+    schedule = deck_manager.schedule.name if deck_manager is not None else ""
+    return encode_choices(decks, timestamps, session.initial_balance, schedule, session.seed)
+
+
+def decode(
+    data: bytes,
+    deck_manager_factory: Optional[Callable[[], DeckManager]] = None
+) -> Dict:
+    """
+    인코딩 데이터 복원 (체크섬 검증 후 DeckManager로 결과 재계산)
+
+    Args:
+        data: encode_choices / encode_session 결과
+        deck_manager_factory: 스케줄을 재생할 DeckManager 생성 함수
+                              (없으면 헤더의 스케줄 이름 / 시드로 재생성)
+
+    Returns:
+        - decks: 덱 선택 문자열
+        - timestamps_ns: 시행별 epoch ns (시각이 없으면 None)
+        - initial_balance: 시작 잔액
+        - schedule: 스케줄 이름 (기록되지 않았으면 "")
+        - seed: 참가자별 스케줄 시드 (기록되지 않았으면 None)
+        - trials: TrialResult 목록 (시각이 없으면 timestamp_ns는 None)
+    """
+    if len(data) < _HEADER.size + _CRC.size:
+        raise ChoiceCodecError("Encoded data too short")
+    body, (checksum,) = data[:-_CRC.size], _CRC.unpack(data[-_CRC.size:])
+    if zlib.crc32(body) != checksum:
+        raise ChoiceCodecError("Checksum mismatch")
+
+    version, flags, n, initial_balance = _HEADER.unpack_from(body)
+    if version not in _SUPPORTED_VERSIONS:
+        raise ChoiceCodecError(f"Unsupported format version: {version}")
+
+    position = _HEADER.size
+    schedule = ""
+    seed: Optional[int] = None
+    if version >= 2:
+        if len(body) < position + _NAME_LENGTH.size:
+            raise ChoiceCodecError("Truncated schedule name")
+        (name_length,) = _NAME_LENGTH.unpack_from(body, position)
+        position += _NAME_LENGTH.size
+        name = body[position:position + name_length]
+        if len(name) != name_length:
+            raise ChoiceCodecError("Truncated schedule name")
+        try:
+            schedule = name.decode("utf-8")
+        except UnicodeDecodeError:
+            raise ChoiceCodecError("Invalid schedule name") from None
+        position += name_length
+        if flags & FLAG_SEED:
+            if len(body) < position + _SEED.size:
+                raise ChoiceCodecError("Truncated seed")
+            (seed,) = _SEED.unpack_from(body, position)
+            position += _SEED.size
+
+    packed = body[position:position + (n + 3) // 4]
+    if len(packed) != (n + 3) // 4:
+        raise ChoiceCodecError("Truncated choice data")
+    position += len(packed)
+    decks = "".join(
+        DECK_LETTERS[(packed[i >> 2] >> (6 - 2 * (i & 3))) & 0b11] for i in range(n)
+    )
+
+    timestamps: Optional[List[int]] = None
+    if flags & FLAG_TIMESTAMPS:
+        if len(body) < position + _TIMESTAMP_BASE.size:
+            raise ChoiceCodecError("Truncated timestamp data")
+        (base,) = _TIMESTAMP_BASE.unpack_from(body, position)
+        position += _TIMESTAMP_BASE.size
+        timestamps = [base]
+        micros = base // 1000
+        for _ in range(n - 1):
+            delta, position = _read_varint(body, position)
+            micros += delta
+            timestamps.append(micros * 1000)
+    if position != len(body):
+        raise ChoiceCodecError("Unexpected trailing data")
+
+    if deck_manager_factory is not None:
+        deck_manager = deck_manager_factory()
+    else:
+        deck_manager = DeckManager(replay_schedule(schedule or None, seed))
+    balance = initial_balance
+    trials = []
+    for i, deck in enumerate(decks):
+        reward, penalty, net_outcome = deck_manager.draw_card(deck)
+        balance += net_outcome
+        trials.append(TrialResult(
+            trial_number=i + 1,
+            deck_choice=deck,
+            reward=reward,
+            penalty=penalty,
+            net_outcome=net_outcome,
+            balance_after=balance,
+            timestamp_ns=timestamps[i] if timestamps else None
+        ))
+
+    return {
+        "decks": decks,
+        "timestamps_ns": timestamps,
+        "initial_balance": initial_balance,
+        "schedule": schedule,
+        "seed": seed,
+        "trials": trials,
+    }
+
+
+def decode_session(
+    data: bytes,
+    session_id: str,
+    participant_id: str,
+    start_time: str = "",
+    deck_manager_factory: Optional[Callable[[], DeckManager]] = None
+) -> GameSession:
+    """
+    인코딩 데이터 → GameSession (시행 / 잔액 / 점수 집계 포함)
+
+    deck_manager_factory는 decode에 그대로 전달 (없으면 헤더의 스케줄 이름 / 시드로 재생성)
+    """
+    decoded = decode(data, deck_manager_factory)
+    session = GameSession(
+        session_id=session_id,
+        participant_id=participant_id,
+        start_time=start_time,
+        initial_balance=decoded["initial_balance"],
+        current_balance=decoded["initial_balance"],
+        total_trials=len(decoded["trials"]),
+        seed=decoded["seed"]
+    )
+    for trial in decoded["trials"]:
+        session.add_trial(trial)
+    return session
+
+
+def encode_text(data: bytes) -> str:
+    """바이트열 → URL-safe base64 문자열 (패딩 제외)"""
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def decode_text(text: str) -> bytes:
+    """encode_text 문자열 → 바이트열"""
+    padded = text + "=" * (-len(text) % 4)
+    try:
+        return base64.urlsafe_b64decode(padded.encode("ascii"))
+    except (ValueError, UnicodeEncodeError) as e:
+        raise ChoiceCodecError(f"Invalid encoded text: {e}") from None
@@ -0,0 +1,291 @@
+"""
+Iowa Gambling Task - Exact Outcome Distributions
+IGT 정책별 최종 잔액 / 순점수의 정확한 분포 (몬테카를로 없이)
+
+스케줄이 고정되어 있으므로 잔액과 순점수는 덱별 선택 횟수 (a, b, c, d)만으로 결정됨
+→ T시행 후 가능한 상태는 a + b + c + d = T인 조합 C(T + 3, 3)개 (100시행: 176,851개)
+
+- 고정 확률 정책: 상태 확률 = 다항분포 → 마지막 시행 상태만 바로 계산
+- 선택 횟수 / 잔액에 따라 확률이 바뀌는 정책: 시행 단위 동적계획법 (상태 확률 전파)
+
+상태 목록 / 상태별 잔액 / 값별 묶음은 (스케줄, 시행 수)별로 캐시 → 반복 호출은 수 ms
+참가자 점수의 정규 기준선 / p값 계산용
+"""
+
+from functools import lru_cache
+from typing import Callable, Dict, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from igt_schedules import DeckSchedule, get_schedule
+from igt_simulation import DECKS, OutcomeTables
+from igt_utils import ADVANTAGEOUS_DECKS, DeckManager, GameSession
+
+# 덱별 순점수 부호 (C/D +1, A/B -1)
+_NET_SCORE_SIGN = np.array([1 if deck in ADVANTAGEOUS_DECKS else -1 for deck in DECKS], dtype=np.int64)
+
+# count 정책: (상태별 덱 선택 횟수 (S, 4), 상태별 현재 잔액 (S,)) → (S, 4) 선택 확률
+CountPolicy = Callable[[np.ndarray, np.ndarray], np.ndarray]
+
+
+@lru_cache(maxsize=4)
+def _states(n_trials: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    a + b + c <= n_trials인 (a, b, c) 전체 (a + b + c 오름차순) 및 다음 상태 위치
+
+    t시행 후 상태 (a, b, c, t - a - b - c)는 앞쪽 C(t + 3, 3)개와 같으므로
+    모든 시행이 같은 순서 / 같은 전이표를 공유
+
+    Returns:
+        abc (S, 3), total (S,) a + b + c,
+        step (3, S): 덱 A-C 선택 시 다음 상태 위치 (덱 D 선택은 같은 위치)
+    """
+    grid = np.indices((n_trials + 1,) * 3).reshape(3, -1).T
+    total = grid.sum(axis=1)
+    keep = total <= n_trials
+    grid, total = grid[keep], total[keep]
+    order = np.argsort(total, kind="stable")
+    abc, total = grid[order], total[order]
+
+    position = np.full((n_trials + 2,) * 3, -1, dtype=np.int64)
+    position[abc[:, 0], abc[:, 1], abc[:, 2]] = np.arange(abc.shape[0])
+    step = np.empty((3, abc.shape[0]), dtype=np.int64)
+    for code in range(3):
+        moved = abc.copy()
+        moved[:, code] += 1
+        step[code] = position[moved[:, 0], moved[:, 1], moved[:, 2]]
+    return abc, total, step
+
+
+def _n_states(t: int) -> int:
+    """t시행 후 상태 수 C(t + 3, 3)"""
+    return (t + 1) * (t + 2) * (t + 3) // 6
+
+
+def _layer_counts(abc: np.ndarray, total: np.ndarray, t: int) -> np.ndarray:
+    """t시행 후 상태의 덱별 선택 횟수 (S_t, 4)"""
+    size = _n_states(t)
+    return np.column_stack([abc[:size], t - total[:size]])
+
+
+@lru_cache(maxsize=8)
+def _net_tables(schedule: DeckSchedule, n_trials: int) -> np.ndarray:
+    """덱별 k장 누적 순이익 (4, n_trials + 1)"""
+    tables = OutcomeTables(DeckManager(schedule))
+    counts = np.repeat(np.arange(n_trials + 1)[:, np.newaxis], len(DECKS), axis=1)
+    reward, penalty = tables.cumulative(counts)
+    return (reward - penalty).T
+
+
+@lru_cache(maxsize=8)
+def _final_tables(schedule: DeckSchedule, n_trials: int) -> Dict[str, np.ndarray]:
+    """
+    마지막 시행 상태별 값 묶음 (캐시)
+
+    Returns:
+        counts (S, 4), log_coefficient (S,) 다항계수 로그, balance_values / balance_index (잔액 - 시작 잔액 고유값 / 상태별 위치),
+        net_score_values / net_score_index
+    """
+    abc, total, _ = _states(n_trials)
+    counts = _layer_counts(abc, total, n_trials)
+    net = _net_tables(schedule, n_trials)
+    outcome = net[np.arange(len(DECKS)), counts].sum(axis=1)
+    balance_values, balance_index = np.unique(outcome, return_inverse=True)
+    net_score_values, net_score_index = np.unique(counts @ _NET_SCORE_SIGN, return_inverse=True)
+    log_factorial = np.concatenate([[0.0], np.cumsum(np.log(np.arange(1, n_trials + 1)))])
+    return {
+        "counts": counts,
+        "log_coefficient": log_factorial[n_trials] - log_factorial[counts].sum(axis=1),
+        "balance_values": balance_values,
+        "balance_index": balance_index,
+        "net_score_values": net_score_values,
+        "net_score_index": net_score_index,
+    }
+
+
+def _resolve_schedule(deck_manager: Optional[DeckManager]) -> DeckSchedule:
+    return deck_manager.schedule if deck_manager is not None else get_schedule()
+
+
+def _normalize(probabilities: Sequence[float]) -> np.ndarray:
+    p = np.asarray(probabilities, dtype=float)
+    if p.shape != (len(DECKS),) or (p < 0).any() or p.sum() <= 0:
+        raise ValueError("probabilities must be 4 non-negative values with a positive sum")
+    return p / p.sum()
+
+
+def _multinomial_probs(tables: Dict[str, np.ndarray], p: np.ndarray) -> np.ndarray:
+    """상태별 다항분포 확률 (로그 공간에서 계산)"""
+    counts = tables["counts"]
+    # 확률 0인 덱: 선택 횟수 0이면 기여 0, 아니면 -inf
+    with np.errstate(divide="ignore", invalid="ignore"):
+        log_terms = np.where(counts > 0, counts * np.log(p), 0.0)
+    return np.exp(tables["log_coefficient"] + log_terms.sum(axis=1))
+
+
+def _dynamic_program(
+    policy: CountPolicy,
+    schedule: DeckSchedule,
+    n_trials: int,
+    initial_balance: int
+) -> np.ndarray:
+    """시행 단위 상태 확률 전파 → 마지막 시행 상태별 확률"""
+    abc, total, step = _states(n_trials)
+    net = _net_tables(schedule, n_trials)
+    # 덱 A-C 누적 순이익 (상태별 고정), 덱 D는 시행마다 t - (a + b + c)로 조회
+    partial = initial_balance + net[np.arange(3), abc].sum(axis=1)
+
+    prob = np.ones(1)
+    for t in range(n_trials):
+        size = _n_states(t)
+        counts = _layer_counts(abc, total, t)
+        balance = partial[:size] + net[3, counts[:, 3]]
+        choice_probs = np.asarray(policy(counts, balance), dtype=float)
+        if choice_probs.shape != counts.shape:
+            raise ValueError("policy must return an (n_states, 4) probability array")
+
+        # 덱 A-C 선택 → (a, b, c) 한 칸 이동, 덱 D 선택 → 같은 (a, b, c) (d만 증가)
+        weighted = prob[:, np.newaxis] * choice_probs
+        next_prob = np.zeros(_n_states(t + 1))
+        next_prob[:size] = weighted[:, 3]
+        for code in range(3):
+            next_prob[step[code, :size]] += weighted[:, code]
+        prob = next_prob
+    return prob
+
+
+class OutcomeDistribution:
+    """
+    최종 잔액 / 순점수 분포
+
+    Attributes:
+        balance_values / balance_probs: 최종 잔액 값 (오름차순)과 확률
+        net_score_values / net_score_probs: 순점수 (C+D)-(A+B) 값과 확률
+    """
+
+    def __init__(
+        self,
+        balance_values: np.ndarray,
+        balance_probs: np.ndarray,
+        net_score_values: np.ndarray,
+        net_score_probs: np.ndarray
+    ):
+        self.balance_values = balance_values
+        self.balance_probs = balance_probs
+        self.net_score_values = net_score_values
+        self.net_score_probs = net_score_probs
+
+    def _marginal(self, kind: str) -> Tuple[np.ndarray, np.ndarray]:
+        if kind == "balance":
+            return self.balance_values, self.balance_probs
+        if kind == "net_score":
+            return self.net_score_values, self.net_score_probs
+        raise ValueError(f"Unknown outcome: {kind}")
+
+    def mean(self, kind: str = "net_score") -> float:
+        """기대값"""
+        values, probs = self._marginal(kind)
+        return float(values @ probs)
+
+    def std(self, kind: str = "net_score") -> float:
+        """표준편차"""
+        values, probs = self._marginal(kind)
+        mean = values @ probs
+        return float(np.sqrt(((values - mean) ** 2) @ probs))
+
+    def p_value(self, observed: float, kind: str = "net_score", alternative: str = "greater") -> float:
+        """
+        관찰값의 정확 p값
+
+        Args:
+            observed: 참가자 최종 잔액 또는 순점수
+            kind: "balance" 또는 "net_score"
+            alternative: "greater" P(X >= 관찰값), "less" P(X <= 관찰값),
+                         "two-sided" 관찰값 확률 이하인 값들의 확률 합
+
+        Returns:
+            p값
+        """
+        values, probs = self._marginal(kind)
+        if alternative == "greater":
+            p = probs[values >= observed].sum()
+        elif alternative == "less":
+            p = probs[values <= observed].sum()
+        elif alternative == "two-sided":
+            matches = values == observed
+            observed_prob = probs[matches].sum() if matches.any() else 0.0
+            # 부동소수점 오차 허용
+            p = probs[probs <= observed_prob * (1 + 1e-9)].sum()
+        else:
+            raise ValueError(f"Unknown alternative: {alternative}")
+        return float(min(p, 1.0))
+
+
+def exact_distribution(
+    policy: Union[Sequence[float], CountPolicy] = (0.25, 0.25, 0.25, 0.25),
+    n_trials: int = 100,
+    initial_balance: int = 2000,
+    deck_manager: Optional[DeckManager] = None
+) -> OutcomeDistribution:
+    """
+    정책의 정확한 최종 잔액 / 순점수 분포
+
+    Args:
+        policy: 덱 A-D 고정 선택 확률 또는 count 정책
+                policy(counts (S, 4), balance (S,)) → (S, 4) 선택 확률
+        n_trials: 시행 수
+        initial_balance: 시작 잔액
+        deck_manager: 보상 / 손실 스케줄 (없으면 기본 스케줄)
+
+    Returns:
+        OutcomeDistribution
+    """
+    schedule = _resolve_schedule(deck_manager)
+    tables = _final_tables(schedule, n_trials)
+
+    if callable(policy):
+        prob = _dynamic_program(policy, schedule, n_trials, initial_balance)
+    else:
+        prob = _multinomial_probs(tables, _normalize(policy))
+
+    return OutcomeDistribution(
+        balance_values=initial_balance + tables["balance_values"],
+        balance_probs=np.bincount(
+            tables["balance_index"], weights=prob, minlength=tables["balance_values"].size
+        ),
+        net_score_values=tables["net_score_values"],
+        net_score_probs=np.bincount(
+            tables["net_score_index"], weights=prob, minlength=tables["net_score_values"].size
+        ),
+    )
+
+
+def session_p_values(
+    session: GameSession,
+    policy: Union[Sequence[float], CountPolicy] = (0.25, 0.25, 0.25, 0.25),
+    alternative: str = "greater",
+    deck_manager: Optional[DeckManager] = None
+) -> Dict[str, float]:
+    """
+    참가자 세션의 정책 기준 p값 (기본: 무작위 선택 대비 더 좋은 수행인지)
+
+    Args:
+        session: 완료된 GameSession
+        policy: 기준 정책 (exact_distribution과 같은 형식)
+        alternative: OutcomeDistribution.p_value 참고
+        deck_manager: 세션에 사용한 스케줄 (없으면 기본 스케줄)
+
+    Returns:
+        - net_score / final_balance: 관찰값
+        - net_score_p / final_balance_p: p값
+    """
+    distribution = exact_distribution(
+        policy, len(session.trials), session.initial_balance, deck_manager
+    )
+    score = session.score()
+    return {
+        "net_score": score["net_score"],
+        "final_balance": session.current_balance,
+        "net_score_p": distribution.p_value(score["net_score"], "net_score", alternative),
+        "final_balance_p": distribution.p_value(session.current_balance, "balance", alternative),
+    }
@@ -0,0 +1,389 @@
+"""
+Iowa Gambling Task - Log Integrity Verifier
+IGT 시행 로그 무결성 일괄 검증 (NumPy 벡터 계산)
+
+batch_log_pending_trials / prepare_for_spreadsheet / logging_utils CSV 형식의
+시행 행을 한 번에 읽어 세션별로 묶고, DeckManager 스케줄로 기대 보상 / 손실 /
+순이익 / 잔액을 다시 계산하여 비교
+- 누락된 시행 (trial 번호 공백)
+- 중복된 시행 번호
+- 보상 / 손실 / 순이익 / 잔액 불일치
+
+세션별 스케줄은 SessionStart 이벤트 행의 스케줄 이름 / 시드로 재생성 (--events)
+기록이 없는 세션은 --schedule (기본 스케줄)로 검증
+
+사용법:
+    python igt_log_verifier.py trials.csv [trials2.csv ...] --expected-trials 100
+    python igt_log_verifier.py trials.csv --events events.csv --schedule reversed
+"""
+
+import argparse
+import csv
+import re
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from igt_schedules import DeckSchedule, replay_schedule
+from igt_simulation import DECK_CODES, OutcomeTables
+from igt_utils import DeckManager
+
+# 컬럼 이름 별칭 (로그 형식마다 이름이 다름)
+COLUMN_ALIASES = {
+    "session_id": ("session_id",),
+    "trial": ("trial", "trial_number"),
+    "deck": ("deck", "deck_choice"),
+    "reward": ("reward",),
+    "penalty": ("penalty",),
+    "net": ("net_outcome", "net"),
+    "balance": ("balance", "balance_after"),
+}
+
+# 헤더 없는 행의 기본 형식 (igt_logging_utils.TRIAL_HEADER)
+DEFAULT_HEADER = [
+    "timestamp", "session_id", "participant_id", "trial",
+    "deck", "reward", "penalty", "net_outcome", "balance"
+]
+
+# 보고서에 포함할 최대 불일치 상세 수
+MAX_MISMATCH_DETAILS = 1000
+
+_CHECKED_FIELDS = ("reward", "penalty", "net", "balance")
+
+# DEFAULT_HEADER 컬럼 → COLUMN_ALIASES 키 (load_csv 정규화용)
+_DEFAULT_COLUMN_KEYS = {
+    "session_id": "session_id",
+    "trial": "trial",
+    "deck": "deck",
+    "reward": "reward",
+    "penalty": "penalty",
+    "net_outcome": "net",
+    "balance": "balance",
+}
+
+# SessionStart 이벤트 텍스트의 "키: 값" 항목 (igt_logging_utils.log_session_start)
+_SESSION_START_FIELD = re.compile(r"(Seed|Schedule|Session): ([^,]+)")
+
+
+def _column_index(header: Sequence[str]) -> Dict[str, int]:
+    """헤더에서 검증에 필요한 컬럼 위치 찾기"""
+    names = [str(name).strip() for name in header]
+    index = {}
+    for key, aliases in COLUMN_ALIASES.items():
+        for alias in aliases:
+            if alias in names:
+                index[key] = names.index(alias)
+                break
+        else:
+            raise ValueError(f"Missing column for {key} (expected one of {aliases})")
+    return index
+
+
+def _int_column(values: List) -> np.ndarray:
+    """정수 컬럼 변환 (변환 불가 값은 INT_MIN)"""
+    try:
+        return np.array(values, dtype=np.int64)
+    except (TypeError, ValueError):
+        parsed = np.empty(len(values), dtype=np.int64)
+        for i, value in enumerate(values):
+            try:
+                parsed[i] = int(float(value))
+            except (TypeError, ValueError):
+                parsed[i] = np.iinfo(np.int64).min
+        return parsed
+
+
+def verify_rows(
+    rows: Iterable[Sequence],
+    header: Optional[Sequence[str]] = None,
+    initial_balance: int = 2000,
+    expected_trials: Optional[int] = None,
+    tables: Optional[OutcomeTables] = None,
+    deck_manager: Optional[DeckManager] = None,
+    session_schedules: Optional[Dict[str, DeckSchedule]] = None
+) -> Dict:
+    """
+    시행 행 일괄 검증
+
+    Args:
+        rows: 시행 행 목록 (첫 행이 헤더여도 됨)
+        header: 컬럼 이름 (없으면 첫 행이 헤더인지 확인, 아니면 DEFAULT_HEADER)
+        initial_balance: 세션 시작 잔액
+        expected_trials: 세션당 시행 수 (지정 시 마지막 시행 이후 누락도 검사)
+        tables: 누적 결과표 (없으면 deck_manager 스케줄)
+        deck_manager: 세션 스케줄 (없으면 기본 스케줄)
+        session_schedules: {session_id: DeckSchedule} 세션별 스케줄 (session_schedules_from_events)
+                           여기 없는 세션은 tables / deck_manager 스케줄로 검증
+
+    Returns:
+        - sessions / rows: 세션 수, 행 수
+        - malformed_rows: 숫자 / 덱 값을 읽을 수 없는 행 수
+        - duplicates: [(session_id, trial, 행 수)]
+        - gaps: {session_id: [누락된 trial 번호]}
+        - mismatches: [{session_id, trial, field, logged, expected}] (최대 MAX_MISMATCH_DETAILS개)
+        - mismatch_count: 불일치 항목 총 수
+        - unverified_rows: 누락 이후라 스케줄 위치를 알 수 없어 검증하지 못한 행 수
+        - ok: 문제가 하나도 없으면 True
+    """
+    rows = list(rows)
+    if header is None:
+        if rows and "session_id" in [str(v).strip() for v in rows[0]]:
+            header, rows = rows[0], rows[1:]
+        else:
+            header = DEFAULT_HEADER
+    index = _column_index(header)
+    tables = tables or OutcomeTables(deck_manager)
+
+    width = max(index.values()) + 1
+    rows = [row for row in rows if len(row) >= width]
+    report = {
+        "sessions": 0,
+        "rows": len(rows),
+        "malformed_rows": 0,
+        "duplicates": [],
+        "gaps": {},
+        "mismatches": [],
+        "mismatch_count": 0,
+        "unverified_rows": 0,
+        "ok": True,
+    }
+    if not rows:
+        return report
+
+    columns = list(zip(*rows))
+    session_ids, session = np.unique(
+        np.asarray([str(v) for v in columns[index["session_id"]]]), return_inverse=True
+    )
+    trial = _int_column(columns[index["trial"]])
+    deck = np.asarray(
+        [DECK_CODES.get(str(v).strip(), -1) for v in columns[index["deck"]]], dtype=np.int64
+    )
+    logged = {field: _int_column(columns[index[field]]) for field in _CHECKED_FIELDS}
+
+    # 읽을 수 없는 행 제외
+    valid = deck >= 0
+    for values in [trial] + list(logged.values()):
+        valid &= values != np.iinfo(np.int64).min
+    report["malformed_rows"] = int((~valid).sum())
+    report["sessions"] = len(session_ids)
+
+    session, trial, deck = session[valid], trial[valid], deck[valid]
+    logged = {field: values[valid] for field, values in logged.items()}
+
+    # 세션 → 시행 번호 순 정렬
+    order = np.lexsort((trial, session))
+    session, trial, deck = session[order], trial[order], deck[order]
+    logged = {field: values[order] for field, values in logged.items()}
+
+    # 중복 시행 번호 (첫 행만 검증에 사용)
+    repeated = np.zeros(len(trial), dtype=bool)
+    repeated[1:] = (session[1:] == session[:-1]) & (trial[1:] == trial[:-1])
+    if repeated.any():
+        first = np.flatnonzero(~repeated)
+        counts = np.diff(np.append(first, len(trial)))
+        for position, count in zip(first[counts > 1], counts[counts > 1]):
+            report["duplicates"].append(
+                (str(session_ids[session[position]]), int(trial[position]), int(count))
+            )
+    keep = ~repeated
+    session, trial, deck = session[keep], trial[keep], deck[keep]
+    logged = {field: values[keep] for field, values in logged.items()}
+
+    # 세션 시작 위치 / 세션 내 순번 (1부터)
+    starts = np.flatnonzero(np.r_[True, session[1:] != session[:-1]])
+    lengths = np.diff(np.append(starts, len(session)))
+    start_of_row = np.repeat(starts, lengths)
+    rank = np.arange(len(session)) - start_of_row + 1
+
+    # 누락 시행: 순번과 시행 번호가 어긋나는 지점
+    previous_trial = np.where(rank > 1, np.r_[0, trial[:-1]], 0)
+    jumps = np.flatnonzero(trial - previous_trial > 1)
+    for position in jumps:
+        sid = str(session_ids[session[position]])
+        report["gaps"].setdefault(sid, []).extend(
+            range(int(previous_trial[position]) + 1, int(trial[position]))
+        )
+    if expected_trials is not None:
+        ends = starts + lengths - 1
+        for position in ends[trial[ends] < expected_trials]:
+            sid = str(session_ids[session[position]])
+            report["gaps"].setdefault(sid, []).extend(
+                range(int(trial[position]) + 1, expected_trials + 1)
+            )
+
+    # 누락 전까지 연속된 시행만 스케줄 위치를 알 수 있음
+    contiguous = trial == rank
+    report["unverified_rows"] = int((~contiguous).sum())
+
+    # 세션별 덱 선택 횟수 (전체 누적합 - 세션 시작 직전 누적합)
+    onehot = (deck[:, np.newaxis] == np.arange(len(DECK_CODES))).astype(np.int64)
+    cumulative = np.cumsum(onehot, axis=0)
+    before_start = cumulative[start_of_row] - onehot[start_of_row]
+    counts = cumulative - before_start
+    cum_reward, cum_penalty = tables.cumulative(counts)
+    if session_schedules:
+        # 세션별 스케줄: 같은 스케줄을 쓰는 세션끼리 묶어 다시 계산
+        row_session_ids = session_ids[session]
+        groups: Dict[DeckSchedule, List[str]] = {}
+        for sid, schedule in session_schedules.items():
+            groups.setdefault(schedule, []).append(sid)
+        for schedule, sids in groups.items():
+            rows_in_group = np.isin(row_session_ids, sids)
+            if rows_in_group.any():
+                group_reward, group_penalty = OutcomeTables(DeckManager(schedule)).cumulative(
+                    counts[rows_in_group]
+                )
+                cum_reward[rows_in_group] = group_reward
+                cum_penalty[rows_in_group] = group_penalty
+    cum_reward = cum_reward.sum(axis=1)
+    cum_penalty = cum_penalty.sum(axis=1)
+
+    first_row = rank == 1
+    expected = {
+        "reward": cum_reward - np.where(first_row, 0, np.r_[0, cum_reward[:-1]]),
+        "penalty": cum_penalty - np.where(first_row, 0, np.r_[0, cum_penalty[:-1]]),
+    }
+    expected["net"] = expected["reward"] - expected["penalty"]
+    expected["balance"] = initial_balance + cum_reward - cum_penalty
+
+    details = []
+    for field in _CHECKED_FIELDS:
+        wrong = contiguous & (logged[field] != expected[field])
+        report["mismatch_count"] += int(wrong.sum())
+        for position in np.flatnonzero(wrong)[:MAX_MISMATCH_DETAILS]:
+            details.append({
+                "session_id": str(session_ids[session[position]]),
+                "trial": int(trial[position]),
+                "field": field,
+                "logged": int(logged[field][position]),
+                "expected": int(expected[field][position]),
+            })
+    details.sort(key=lambda d: (d["session_id"], d["trial"]))
+    report["mismatches"] = details[:MAX_MISMATCH_DETAILS]
+
+    report["ok"] = not (
+        report["malformed_rows"] or report["duplicates"] or report["gaps"]
+        or report["mismatch_count"]
+    )
+    return report
+
+
+def session_schedules_from_events(rows: Iterable[Sequence]) -> Dict[str, DeckSchedule]:
+    """
+    SessionStart 이벤트 행에서 세션별 스케줄 재생성
+
+    Args:
+        rows: 이벤트 행 [timestamp, user_id, event_type, text] (다른 행은 무시)
+
+    Returns:
+        {session_id: DeckSchedule} (세션 ID가 기록되지 않은 행은 제외)
+
+    Raises:
+        ScheduleError: 등록되지 않은 스케줄 / 시드 없는 재배치 스케줄
+    """
+    schedules = {}
+    for row in rows:
+        if len(row) < 4 or str(row[2]).strip() != "SessionStart":
+            continue
+        fields = dict(_SESSION_START_FIELD.findall(str(row[3])))
+        if "Session" not in fields:
+            continue
+        seed = int(fields["Seed"]) if "Seed" in fields else None
+        schedules[fields["Session"].strip()] = replay_schedule(fields.get("Schedule"), seed)
+    return schedules
+
+
+def _normalize_rows(header: Sequence[str], rows: List[List[str]]) -> List[List[str]]:
+    """
+    파일 컬럼 → DEFAULT_HEADER 순서로 재배치 (COLUMN_ALIASES로 이름 해석)
+
+    검증에 쓰지 않는 컬럼 (timestamp / participant_id)은 없으면 빈 값
+
+    Raises:
+        ValueError: 검증에 필요한 컬럼이 없음
+    """
+    index = _column_index(header)
+    names = [str(name).strip() for name in header]
+    positions = []
+    for name in DEFAULT_HEADER:
+        key = _DEFAULT_COLUMN_KEYS.get(name)
+        if key is not None:
+            positions.append(index[key])
+        else:
+            positions.append(names.index(name) if name in names else None)
+    return [
+        [row[p] if p is not None and p < len(row) else "" for p in positions]
+        for row in rows
+    ]
+
+
+def load_csv(paths: Iterable[str]) -> Dict:
+    """
+    CSV 파일 읽기 (logging_utils igt_trials CSV, 시트 내보내기, TrialResult.to_dict() 형식)
+
+    파일마다 컬럼 이름이 달라도 COLUMN_ALIASES로 해석하여 DEFAULT_HEADER 형식으로 합침
+
+    Returns:
+        {"header": DEFAULT_HEADER, "rows": 행 목록}
+
+    Raises:
+        ValueError: 검증에 필요한 컬럼이 없는 파일
+    """
+    rows: List[List[str]] = []
+    for path in paths:
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            reader = csv.reader(f)
+            first = next(reader, None)
+            if first is None:
+                continue
+            if "session_id" not in first:
+                # 헤더 없는 시트 내보내기
+                file_header, file_rows = DEFAULT_HEADER, [first] + list(reader)
+            else:
+                file_header, file_rows = first, list(reader)
+        try:
+            rows.extend(_normalize_rows(file_header, file_rows))
+        except ValueError as e:
+            raise ValueError(f"{path}: {e}") from None
+    return {"header": list(DEFAULT_HEADER), "rows": rows}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verify IGT trial log integrity")
+    parser.add_argument("paths", nargs="+")
+    parser.add_argument("--initial-balance", type=int, default=2000)
+    parser.add_argument("--expected-trials", type=int, default=None)
+    parser.add_argument("--schedule", default=None, help="schedule for sessions without a SessionStart row")
+    parser.add_argument("--events", nargs="*", default=[], help="event CSV files with SessionStart rows")
+    args = parser.parse_args()
+
+    data = load_csv(args.paths)
+    session_schedules = {}
+    for path in args.events:
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            session_schedules.update(session_schedules_from_events(csv.reader(f)))
+    report = verify_rows(
+        data["rows"], header=data["header"],
+        initial_balance=args.initial_balance,
+        expected_trials=args.expected_trials,
+        deck_manager=DeckManager(args.schedule),
+        session_schedules=session_schedules
+    )
+
+    print(f"sessions: {report['sessions']}, rows: {report['rows']}")
+    print(f"malformed rows: {report['malformed_rows']}")
+    print(f"duplicate trials: {len(report['duplicates'])}")
+    print(f"sessions with gaps: {len(report['gaps'])}")
+    print(f"mismatches: {report['mismatch_count']} (unverified rows: {report['unverified_rows']})")
+    for sid, missing in sorted(report["gaps"].items())[:20]:
+        print(f"  gap {sid}: {missing[:10]}{' ...' if len(missing) > 10 else ''}")
+    for item in report["mismatches"][:20]:
+        print(
+            f"  mismatch {item['session_id']} trial {item['trial']} {item['field']}: "
+            f"logged {item['logged']}, expected {item['expected']}"
+        )
+    print("OK" if report["ok"] else "PROBLEMS FOUND")
+
+
+if __name__ == "__main__":
+    main()
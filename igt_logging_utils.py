@@ -3,12 +3,15 @@ Iowa Gambling Task - Google Spreadsheet Logging
 Google Spreadsheet 연동 로깅 유틸리티
 """
 
+import os
+import threading
 import streamlit as st
-import gspread
-from oauth2client.service_account import ServiceAccountCredentials
 from datetime import datetime
-import time
-from typing import List, Optional
+from typing import Dict, List, Optional
+
+from gsheet_client import get_worksheet
+from gsheet_writer import get_writer
+from log_spool import LogSpool, open_spools
 
 # Google Spreadsheet 정보 (메인 + 백업)
 # TODO: 실제 사용 시 본인의 Spreadsheet URL로 변경
@@ -17,11 +20,33 @@ SHEET_INFO = [
     ("gsheet_b5", "https://docs.google.com/spreadsheets/d/1Mj2KSoXtXbLziISgDUAkt9Mi6lB6NPr0A67GMLqsB48/edit?gid=0#gid=0"),   # backup 5
 ]
 
+# True면 백그라운드 큐로 기록 (요청 경로에서 Sheets API 대기 없음)
+# False면 기존처럼 호출 시점에 동기 기록
+ASYNC_LOGGING = True
+
+# 시행 데이터 로컬 선기록 스풀 디렉토리 (Sheets 전송 확인 전까지 보관)
+SPOOL_DIR = os.environ.get(
+    "IGT_SPOOL_DIR", os.path.join(os.path.dirname(__file__), "spool", "igt_trials")
+)
+
+# 이벤트(SessionStart / SessionEnd 등) 로컬 선기록 스풀 디렉토리
+EVENT_SPOOL_DIR = os.environ.get(
+    "IGT_EVENT_SPOOL_DIR", os.path.join(os.path.dirname(__file__), "spool", "igt_events")
+)
+
+# 시행 데이터 헤더 (빈 시트에 처음 기록할 때 추가)
+TRIAL_HEADER = [
+    "timestamp", "session_id", "participant_id", "trial",
+    "deck", "reward", "penalty", "net_outcome", "balance"
+]
+
 
 def init_sheet(secret_key_name: str, sheet_url: str):
     """
     Google Spreadsheet 초기화
 
+    프로세스 전역 연결 풀에서 worksheet를 가져옴 (세션 간 공유)
+
     Args:
         secret_key_name: Streamlit secrets에 저장된 서비스 계정 키 이름
         sheet_url: Google Spreadsheet URL
@@ -29,13 +54,73 @@ def init_sheet(secret_key_name: str, sheet_url: str):
     Returns:
         gspread worksheet 객체
     """
-    scope = ["https://www.googleapis.com/auth/drive"]
-    creds = ServiceAccountCredentials.from_json_keyfile_dict(
-        st.secrets[secret_key_name], scope
-    )
-    client = gspread.authorize(creds)
-    sheet = client.open_by_url(sheet_url).sheet1
-    return sheet
+    return get_worksheet(secret_key_name, sheet_url)
+
+
+_spools: Dict[str, LogSpool] = {}
+_spool_lock = threading.Lock()
+
+
+def _get_spool(directory: Optional[str] = None) -> LogSpool:
+    """
+    프로세스 전역 스풀 반환 (최초 호출 시 미전송 기록 복구 후 전송 등록)
+
+    다른 워커 프로세스가 directory를 사용 중이면 워커별 하위 디렉토리에 기록
+
+    Args:
+        directory: SPOOL_DIR (시행, 기본) 또는 EVENT_SPOOL_DIR (이벤트)
+                   호출 시점의 모듈 값을 사용 (fake_gsheet 벤치마크 등에서 변경 가능)
+    """
+    directory = directory or SPOOL_DIR
+    spool = _spools.get(directory)
+    if spool is None:
+        with _spool_lock:
+            spool = _spools.get(directory)
+            if spool is None:
+                opened = open_spools(directory)
+                for recovered in opened:
+                    get_writer().attach_spool(recovered, background=ASYNC_LOGGING)
+                spool = opened[0]
+                _spools[directory] = spool
+    return spool
+
+
+def recover_spool():
+    """
+    이전 프로세스에서 전송하지 못한 시행 / 이벤트 기록 복구 및 재전송 시작
+
+    스풀 디렉토리가 있을 때만 동작 (모듈 import 시 자동 호출)
+    """
+    for directory in (SPOOL_DIR, EVENT_SPOOL_DIR):
+        if os.path.isdir(directory):
+            _get_spool(directory)
+
+
+def _submit_rows(
+    rows: List[List],
+    header: Optional[List[str]] = None,
+    error_message: str = "Failed to log"
+):
+    """
+    SHEET_INFO(메인 → 백업)에 행 기록
+
+    이벤트 스풀에 먼저 기록하므로 메인/백업 모두 실패해도 유실되지 않고 재전송됨
+    ASYNC_LOGGING이면 워커만 깨우고 즉시 반환, 아니면 스풀을 동기 전송
+
+    Args:
+        rows: 2D 리스트 형태의 데이터
+        header: 시트가 비어 있을 때 먼저 추가할 헤더
+        error_message: 기록 실패 시 표시할 메시지
+    """
+    _get_spool(EVENT_SPOOL_DIR).append(SHEET_INFO, rows, header=header)
+
+    if ASYNC_LOGGING:
+        get_writer().wake_spool()
+        return
+
+    error = get_writer().drain_spools()
+    if error is not None:
+        st.error(f"{error_message} (kept in local spool). Error: {error}\n")
 
 
 def log_event(text: str, user_id: str = "", event_type: str = "General"):
@@ -49,16 +134,10 @@ def log_event(text: str, user_id: str = "", event_type: str = "General"):
     """
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
-    for idx, (secret_key, sheet_url) in enumerate(SHEET_INFO):
-        try:
-            sheet = init_sheet(secret_key, sheet_url)
-            sheet.append_row([timestamp, user_id, event_type, text])
-            break  # 성공 시 종료
-        except Exception as e:
-            if idx == len(SHEET_INFO) - 1:
-                st.error(f"Failed to log even to backups. Error: {e}\n")
-            else:
-                time.sleep(1)
+    _submit_rows(
+        [[timestamp, user_id, event_type, text]],
+        error_message="Failed to log even to backups"
+    )
 
 
 def log_trial(
@@ -98,22 +177,37 @@ def log_trial(
         balance
     ]
 
-    for idx, (secret_key, sheet_url) in enumerate(SHEET_INFO):
-        try:
-            sheet = init_sheet(secret_key, sheet_url)
-            sheet.append_row(row_data)
-            break
-        except Exception as e:
-            if idx == len(SHEET_INFO) - 1:
-                st.error(f"Failed to log trial. Error: {e}\n")
-            else:
-                time.sleep(1)
+    _submit_rows([row_data], error_message="Failed to log trial")
+
+
+def log_session_start(
+    session_id: str,
+    participant_id: str,
+    seed: Optional[int] = None,
+    schedule: Optional[str] = None,
+    master_seed: Optional[int] = None
+):
+    """
+    세션 시작 로깅
 
+    스케줄 이름 / 시드 / 세션 ID를 함께 기록하여 igt_log_verifier가 참가자 스케줄을 재생성
+    (마스터 시드까지 기록하면 세션 ID에서 시드 파생 과정도 재현 가능)
 
-def log_session_start(session_id: str, participant_id: str):
-    """세션 시작 로깅"""
+    Args:
+        session_id: 세션 ID
+        participant_id: 참가자 ID
+        seed: 참가자별 스케줄 시드 (기록해 두면 스케줄 재생성 가능)
+        schedule: 스케줄 이름 (DeckSchedule.name)
+        master_seed: 시드 파생에 사용한 마스터 시드 (session_seed.get_master_seed)
+    """
+    seed_str = f", Seed: {seed}" if seed is not None else ""
+    schedule_str = f", Schedule: {schedule}" if schedule else ""
+    master_str = f", Master seed: {master_seed}" if master_seed is not None else ""
     log_event(
-        text=f"Session started - Initial balance: $2000",
+        text=(
+            f"Session started - Initial balance: $2000{seed_str}{schedule_str}{master_str}"
+            f", Session: {session_id}"
+        ),
         user_id=participant_id,
         event_type="SessionStart"
     )
@@ -164,6 +258,8 @@ def log_batch_trials(trials_data: List[List]):
     여러 시행을 한 번에 기록 (배치 로깅)
 
     단일 API 호출로 여러 행을 추가하여 API 할당량 절약
+    Sheets 전송 전에 로컬 스풀에 먼저 기록하므로 메인/백업 모두 실패해도
+    데이터가 유실되지 않고 이후 자동 재전송됨
 
     Args:
         trials_data: 2D 리스트 형태의 시행 데이터
@@ -171,22 +267,16 @@ def log_batch_trials(trials_data: List[List]):
     if not trials_data:
         return
 
-    for idx, (secret_key, sheet_url) in enumerate(SHEET_INFO):
-        try:
-            sheet = init_sheet(secret_key, sheet_url)
-            # 헤더가 없으면 추가
-            if sheet.row_count == 0 or not sheet.row_values(1):
-                header = [
-                    "timestamp", "session_id", "participant_id", "trial",
-                    "deck", "reward", "penalty", "net_outcome", "balance"
-                ]
-                sheet.append_row(header)
-
-            # 한 번의 API 호출로 모든 행 추가
-            sheet.append_rows(trials_data)
-            break
-        except Exception as e:
-            if idx == len(SHEET_INFO) - 1:
-                st.error(f"Failed to log batch trials. Error: {e}\n")
-            else:
-                time.sleep(1)
+    # 먼저 로컬 스풀에 fsync 기록 → Sheets 전송 성공 시 ack
+    _get_spool().append(SHEET_INFO, trials_data, header=TRIAL_HEADER)
+
+    if ASYNC_LOGGING:
+        get_writer().wake_spool()
+        return
+
+    error = get_writer().drain_spools()
+    if error is not None:
+        st.error(f"Failed to log batch trials (kept in local spool). Error: {error}\n")
+
+
+recover_spool()
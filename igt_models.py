@@ -0,0 +1,550 @@
+"""
+Iowa Gambling Task - Computational Models
+IGT 강화학습 모델 (EV / PVL-Delta / VPP / ORL) 우도 계산 및 최대우도 추정
+
+- 시행별 로그 우도를 참가자 × 파라미터 격자 축으로 한 번에 계산 (NumPy 브로드캐스트)
+- 최대우도 추정: 유계 파라미터를 비유계 공간으로 변환 후 유한차분 기울기 + Adam
+  (기울기 계산용 ±h 파라미터 묶음도 같은 우도 호출 한 번으로 계산)
+- 모델의 init_state / utilities / update는 시뮬레이션(simulate)에서도 그대로 사용
+
+모델 정의는 hBayesDM (Ahn et al., 2017) 구현을 따름
+결과 값은 100으로 나누어 사용 ($100 → 1.0)
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from igt_utils import DeckManager, GameSession
+from igt_simulation import DECK_CODES, DECKS, SimulationState, simulate_batch
+
+# 결과 값 스케일 ($100 → 1.0)
+OUTCOME_SCALE = 100.0
+
+# 유한차분 기울기 간격 (비유계 파라미터 공간)
+GRADIENT_STEP = 1e-3
+
+N_DECKS = len(DECKS)
+
+
+# ============================================================
+# 데이터
+# ============================================================
+
+class ChoiceData:
+    """
+    모델 적합용 선택 데이터 (참가자 × 시행, 길이가 다르면 뒤를 채우고 mask로 표시)
+
+    Attributes:
+        choices: (N, T) 덱 코드 (0-3)
+        wins: (N, T) 보상 / OUTCOME_SCALE
+        losses: (N, T) 손실 크기 / OUTCOME_SCALE (양수)
+        mask: (N, T) 실제 시행 위치
+        participant_ids: 참가자 / 세션 식별자 목록
+    """
+
+    def __init__(
+        self,
+        choices: np.ndarray,
+        wins: np.ndarray,
+        losses: np.ndarray,
+        mask: Optional[np.ndarray] = None,
+        participant_ids: Optional[List[str]] = None
+    ):
+        self.choices = np.asarray(choices, dtype=np.int64)
+        self.wins = np.asarray(wins, dtype=float)
+        self.losses = np.asarray(losses, dtype=float)
+        self.mask = np.ones(self.choices.shape, dtype=bool) if mask is None else np.asarray(mask, dtype=bool)
+        self.participant_ids = participant_ids or [str(i) for i in range(self.choices.shape[0])]
+
+        # 마스크 밖 위치는 우도 / 갱신에 영향이 없도록 0으로 정리
+        self.choices = np.where(self.mask, self.choices, 0)
+        self.wins = np.where(self.mask, self.wins, 0.0)
+        self.losses = np.where(self.mask, self.losses, 0.0)
+
+    @property
+    def n_participants(self) -> int:
+        return self.choices.shape[0]
+
+    @property
+    def n_trials(self) -> int:
+        return self.choices.shape[1]
+
+    @property
+    def outcomes(self) -> np.ndarray:
+        """순이익 (wins - losses)"""
+        return self.wins - self.losses
+
+    def subset(self, index) -> "ChoiceData":
+        """일부 참가자만 선택"""
+        index = np.atleast_1d(np.arange(self.n_participants)[index])
+        return ChoiceData(
+            self.choices[index], self.wins[index], self.losses[index], self.mask[index],
+            [self.participant_ids[i] for i in index]
+        )
+
+    @classmethod
+    def from_arrays(cls, choices, rewards, penalties, mask=None, participant_ids=None) -> "ChoiceData":
+        """
+        원 단위 배열에서 생성 (simulate_batch 결과 등)
+
+        Args:
+            choices: (N, T) 덱 코드
+            rewards: (N, T) 보상 ($)
+            penalties: (N, T) 손실 ($, 양수)
+        """
+        return cls(
+            choices,
+            np.asarray(rewards, dtype=float) / OUTCOME_SCALE,
+            np.asarray(penalties, dtype=float) / OUTCOME_SCALE,
+            mask, participant_ids
+        )
+
+    @classmethod
+    def from_sessions(cls, sessions: Sequence[GameSession]) -> "ChoiceData":
+        """GameSession.trials 목록에서 생성"""
+        n_trials = max((len(s.trials) for s in sessions), default=0)
+        shape = (len(sessions), n_trials)
+        choices = np.zeros(shape, dtype=np.int64)
+        rewards = np.zeros(shape)
+        penalties = np.zeros(shape)
+        mask = np.zeros(shape, dtype=bool)
+
+        for i, session in enumerate(sessions):
+            for t, trial in enumerate(session.trials):
+                choices[i, t] = DECK_CODES[trial.deck_choice]
+                rewards[i, t] = trial.reward
+                penalties[i, t] = trial.penalty
+                mask[i, t] = True
+
+        return cls.from_arrays(
+            choices, rewards, penalties, mask,
+            [s.participant_id or s.session_id for s in sessions]
+        )
+
+
+# ============================================================
+# 모델
+# ============================================================
+
+def _sigmoid(z: np.ndarray) -> np.ndarray:
+    return 1.0 / (1.0 + np.exp(-z))
+
+
+def _prospect_utility(x: np.ndarray, alpha: np.ndarray, lam: np.ndarray) -> np.ndarray:
+    """전망 이론 효용: x ≥ 0이면 x^α, 아니면 -λ|x|^α"""
+    magnitude = np.abs(x) ** alpha
+    return np.where(x >= 0, magnitude, -lam * magnitude)
+
+
+class IGTModel:
+    """
+    IGT 학습 모델 기본 클래스
+
+    상태(state)는 덱 축이 첫 번째인 배열 딕셔너리 (shape: (4,) + 파라미터 shape)
+    - 덱 축 최대값 / 합계가 연속된 4개 배열 간 연산이 되어 브로드캐스트 축이 클 때 빠름
+    params / win / loss는 파라미터 shape으로 브로드캐스트되는 배열 (덱 축 없음)
+
+    Attributes:
+        name: 모델 이름
+        param_names: 파라미터 이름 (순서 고정)
+        bounds: 파라미터별 (하한, 상한)
+    """
+
+    name = ""
+    param_names: Tuple[str, ...] = ()
+    bounds: Dict[str, Tuple[float, float]] = {}
+
+    def init_state(self, shape: Tuple[int, ...]) -> Dict[str, np.ndarray]:
+        """초기 상태 (모든 덱 기대값 0)"""
+        return {"ev": np.zeros((N_DECKS,) + shape)}
+
+    def utilities(self, state: Dict[str, np.ndarray], params: Dict[str, np.ndarray], t: int) -> np.ndarray:
+        """시행 t (0부터)의 softmax 입력 (민감도가 곱해진 덱별 효용)"""
+        raise NotImplementedError
+
+    def update(
+        self,
+        state: Dict[str, np.ndarray],
+        params: Dict[str, np.ndarray],
+        chosen: np.ndarray,
+        win: np.ndarray,
+        loss: np.ndarray
+    ) -> Dict[str, np.ndarray]:
+        """
+        선택 결과로 상태 갱신
+
+        Args:
+            chosen: 선택한 덱 one-hot (bool, 덱 축이 첫 번째)
+            win / loss: 보상 / 손실 크기 (스케일 적용)
+        """
+        raise NotImplementedError
+
+    # 파라미터 변환 ------------------------------------------------
+
+    def to_params(self, z: np.ndarray) -> Dict[str, np.ndarray]:
+        """비유계 값 (..., K) → 파라미터 딕셔너리"""
+        params = {}
+        for k, name in enumerate(self.param_names):
+            low, high = self.bounds[name]
+            params[name] = low + (high - low) * _sigmoid(z[..., k])
+        return params
+
+    def to_unconstrained(self, params: Dict[str, np.ndarray]) -> np.ndarray:
+        """파라미터 딕셔너리 → 비유계 값 (..., K)"""
+        columns = []
+        for name in self.param_names:
+            low, high = self.bounds[name]
+            p = np.clip((np.asarray(params[name], dtype=float) - low) / (high - low), 1e-9, 1 - 1e-9)
+            columns.append(np.log(p) - np.log1p(-p))
+        return np.stack(columns, axis=-1)
+
+    def sample_params(self, size, rng: np.random.Generator) -> Dict[str, np.ndarray]:
+        """파라미터 범위 안에서 균등 샘플링"""
+        return {
+            name: rng.uniform(*self.bounds[name], size=size) for name in self.param_names
+        }
+
+
+class EVModel(IGTModel):
+    """
+    Expectancy-Valence (Busemeyer & Stout, 2002)
+
+    u = (1 - w) × win - w × loss,  Ev ← Ev + a (u - Ev),  θ = ((t + 1) / 10)^c
+    """
+
+    name = "ev"
+    param_names = ("a", "c", "w")
+    bounds = {"a": (0.0, 1.0), "c": (-5.0, 5.0), "w": (0.0, 1.0)}
+
+    def utilities(self, state, params, t):
+        theta = ((t + 1) / 10.0) ** params["c"]
+        return theta * state["ev"]
+
+    def update(self, state, params, chosen, win, loss):
+        u = (1 - params["w"]) * win - params["w"] * loss
+        ev = state["ev"]
+        state["ev"] = np.where(chosen, ev + params["a"] * (u - ev), ev)
+        return state
+
+
+class PVLDeltaModel(IGTModel):
+    """
+    Prospect Valence Learning - Delta (Ahn et al., 2008)
+
+    u = 전망 효용(net; α, λ),  Ev ← Ev + A (u - Ev),  θ = 3^cons - 1
+    """
+
+    name = "pvl_delta"
+    param_names = ("A", "alpha", "cons", "lambda")
+    bounds = {"A": (0.0, 1.0), "alpha": (0.0, 2.0), "cons": (0.0, 5.0), "lambda": (0.0, 10.0)}
+
+    def utilities(self, state, params, t):
+        return (3.0 ** params["cons"] - 1) * state["ev"]
+
+    def update(self, state, params, chosen, win, loss):
+        u = _prospect_utility(win - loss, params["alpha"], params["lambda"])
+        ev = state["ev"]
+        state["ev"] = np.where(chosen, ev + params["A"] * (u - ev), ev)
+        return state
+
+
+class VPPModel(PVLDeltaModel):
+    """
+    Value-Plus-Perseverance (Worthy et al., 2013)
+
+    PVL-Delta 기대값 + 고집(perseverance): pers ← K × pers, 선택 덱에 ε+ / ε- 더함
+    V = w × Ev + (1 - w) × pers
+    """
+
+    name = "vpp"
+    param_names = ("A", "alpha", "cons", "lambda", "epP", "epN", "K", "w")
+    bounds = {
+        "A": (0.0, 1.0), "alpha": (0.0, 2.0), "cons": (0.0, 5.0), "lambda": (0.0, 10.0),
+        "epP": (-5.0, 5.0), "epN": (-5.0, 5.0), "K": (0.0, 1.0), "w": (0.0, 1.0),
+    }
+
+    def init_state(self, shape):
+        state = super().init_state(shape)
+        state["pers"] = np.zeros((N_DECKS,) + shape)
+        return state
+
+    def utilities(self, state, params, t):
+        value = params["w"] * state["ev"] + (1 - params["w"]) * state["pers"]
+        return (3.0 ** params["cons"] - 1) * value
+
+    def update(self, state, params, chosen, win, loss):
+        state = super().update(state, params, chosen, win, loss)
+        outcome = win - loss
+        boost = np.where(outcome >= 0, params["epP"], params["epN"])
+        state["pers"] = params["K"] * state["pers"] + np.where(chosen, boost, 0.0)
+        return state
+
+
+class ORLModel(IGTModel):
+    """
+    Outcome-Representation Learning (Haines et al., 2018)
+
+    기대값(ev) + 기대 빈도(ef, 선택하지 않은 덱은 가상 갱신) + 고집(pers)
+    util = ev + βF × ef + βP × pers
+    """
+
+    name = "orl"
+    param_names = ("Arew", "Apun", "K", "betaF", "betaP")
+    bounds = {
+        "Arew": (0.0, 1.0), "Apun": (0.0, 1.0), "K": (0.0, 5.0),
+        "betaF": (-10.0, 10.0), "betaP": (-10.0, 10.0),
+    }
+
+    def init_state(self, shape):
+        return {
+            "ev": np.zeros((N_DECKS,) + shape),
+            "ef": np.zeros((N_DECKS,) + shape),
+            "pers": np.zeros((N_DECKS,) + shape),
+        }
+
+    def utilities(self, state, params, t):
+        return state["ev"] + params["betaF"] * state["ef"] + params["betaP"] * state["pers"]
+
+    def update(self, state, params, chosen, win, loss):
+        outcome = win - loss
+        sign = np.sign(outcome)
+        gain = outcome >= 0
+        lr_chosen = np.where(gain, params["Arew"], params["Apun"])
+        lr_fictive = np.where(gain, params["Apun"], params["Arew"])
+
+        ev, ef = state["ev"], state["ef"]
+        state["ev"] = np.where(chosen, ev + lr_chosen * (outcome - ev), ev)
+        state["ef"] = np.where(
+            chosen,
+            ef + lr_chosen * (sign - ef),
+            ef + lr_fictive * (-sign / (N_DECKS - 1) - ef)
+        )
+        k = 3.0 ** params["K"] - 1
+        state["pers"] = np.where(chosen, 1.0, state["pers"]) / (1 + k)
+        return state
+
+
+MODELS: Dict[str, IGTModel] = {
+    model.name: model for model in (EVModel(), PVLDeltaModel(), VPPModel(), ORLModel())
+}
+
+
+def get_model(model) -> IGTModel:
+    """모델 이름 또는 인스턴스 → 인스턴스"""
+    if isinstance(model, IGTModel):
+        return model
+    if model not in MODELS:
+        raise ValueError(f"Unknown model: {model} (available: {', '.join(MODELS)})")
+    return MODELS[model]
+
+
+# ============================================================
+# 우도
+# ============================================================
+
+def _log_softmax_at(logits: np.ndarray, chosen: np.ndarray) -> np.ndarray:
+    """선택한 덱(chosen one-hot)의 log softmax 값 (덱 축이 첫 번째)"""
+    shifted = logits - logits.max(axis=0)
+    return (shifted * chosen).sum(axis=0) - np.log(np.exp(shifted).sum(axis=0))
+
+
+def _deck_onehot(choice: np.ndarray, ndim: int) -> np.ndarray:
+    """(N,) 선택 → (4, 1, ..., 1, N) one-hot (파라미터 shape 앞쪽 축은 브로드캐스트)"""
+    chosen = choice == np.arange(N_DECKS)[:, np.newaxis]
+    return chosen.reshape((N_DECKS,) + (1,) * (ndim - 1) + choice.shape)
+
+
+def log_likelihood(
+    model,
+    params: Dict[str, np.ndarray],
+    data: ChoiceData,
+    per_trial: bool = False
+) -> np.ndarray:
+    """
+    로그 우도 계산 (시행 축만 반복, 나머지는 브로드캐스트)
+
+    Args:
+        model: 모델 이름 또는 IGTModel
+        params: 파라미터별 배열 - shape이 (..., N)으로 브로드캐스트 가능해야 함
+                (예: 참가자별 (N,), 격자 × 참가자 (G, N), 스칼라)
+        data: 선택 데이터 (N명)
+        per_trial: True면 시행별 로그 우도 (..., N, T) 반환
+
+    Returns:
+        (..., N) 참가자별 로그 우도 합 (per_trial이면 (..., N, T))
+    """
+    model = get_model(model)
+    n, n_trials = data.choices.shape
+    shape = np.broadcast_shapes(*(np.shape(params[name]) for name in model.param_names), (n,))
+    p = {name: np.asarray(params[name], dtype=float) for name in model.param_names}
+
+    state = model.init_state(shape)
+    total = np.zeros(shape)
+    trials = np.zeros(shape + (n_trials,)) if per_trial else None
+    weights = data.mask.astype(float)
+
+    for t in range(n_trials):
+        chosen = _deck_onehot(data.choices[:, t], len(shape))
+        logits = model.utilities(state, p, t)
+        ll = _log_softmax_at(logits, chosen) * weights[:, t]
+        total += ll
+        if per_trial:
+            trials[..., t] = ll
+
+        state = model.update(state, p, chosen, data.wins[:, t], data.losses[:, t])
+
+    return trials if per_trial else total
+
+
+def log_likelihood_grid(model, grid: Dict[str, Sequence[float]], data: ChoiceData) -> np.ndarray:
+    """
+    파라미터 격자 전체의 참가자별 로그 우도
+
+    Args:
+        grid: 파라미터별 격자 값 목록 (모든 파라미터 필요)
+
+    Returns:
+        (격자1 크기, 격자2 크기, ..., N) 배열 (param_names 순서)
+    """
+    model = get_model(model)
+    axes = [np.asarray(grid[name], dtype=float) for name in model.param_names]
+    mesh = np.meshgrid(*axes, indexing="ij")
+    params = {name: m[..., np.newaxis] for name, m in zip(model.param_names, mesh)}
+    return log_likelihood(model, params, data)
+
+
+# ============================================================
+# 최대우도 추정
+# ============================================================
+
+def fit_mle(
+    model,
+    data: ChoiceData,
+    n_candidates: int = 200,
+    n_starts: int = 3,
+    max_iter: int = 150,
+    learning_rate: float = 0.1,
+    tol: float = 1e-3,
+    seed=None
+) -> Dict:
+    """
+    참가자별 최대우도 추정 (모든 참가자 / 시작점을 한 번에 최적화)
+
+    1. 무작위 후보 n_candidates개의 우도를 한 번에 계산하여 참가자별 상위 n_starts개 선택
+    2. 비유계 공간에서 중심 유한차분 기울기를 구하고 Adam으로 상승
+       (K개 파라미터의 ±h 평가 2K + 1개를 우도 호출 한 번에 계산)
+
+    Args:
+        model: 모델 이름 또는 IGTModel
+        data: 선택 데이터
+        n_candidates: 시작점 선별용 무작위 후보 수
+        n_starts: 참가자별 최적화 시작점 수
+        max_iter: 최대 반복 수
+        learning_rate: Adam 학습률
+        tol: 모든 기울기 절대값이 이보다 작으면 종료
+        seed: 후보 난수 시드
+
+    Returns:
+        - params: 파라미터별 (N,) 추정값
+        - log_likelihood: (N,) 최대 로그 우도
+        - aic / bic: (N,)
+        - iterations: 반복 수
+    """
+    model = get_model(model)
+    rng = np.random.default_rng(seed)
+    n, k = data.n_participants, len(model.param_names)
+    participants = np.arange(n)
+
+    candidates = rng.normal(0.0, 1.5, size=(max(n_candidates, n_starts), n, k))
+    screen = log_likelihood(model, model.to_params(candidates), data)
+    top = np.argsort(-screen, axis=0)[:n_starts]
+    z = candidates[top, participants]
+
+    m = np.zeros_like(z)
+    v = np.zeros_like(z)
+    beta1, beta2, eps = 0.9, 0.999, 1e-8
+
+    # 0: 기준점, 1..K: +h, K+1..2K: -h
+    offsets = np.zeros((2 * k + 1, 1, 1, k))
+    offsets[1:k + 1, 0, 0] = np.eye(k) * GRADIENT_STEP
+    offsets[k + 1:, 0, 0] = -np.eye(k) * GRADIENT_STEP
+
+    iteration = 0
+    for iteration in range(1, max_iter + 1):
+        ll = log_likelihood(model, model.to_params(z + offsets), data)
+        grad = np.moveaxis((ll[1:k + 1] - ll[k + 1:]) / (2 * GRADIENT_STEP), 0, -1)
+        if np.abs(grad).max() < tol:
+            break
+
+        m = beta1 * m + (1 - beta1) * grad
+        v = beta2 * v + (1 - beta2) * grad ** 2
+        m_hat = m / (1 - beta1 ** iteration)
+        v_hat = v / (1 - beta2 ** iteration)
+        z = z + learning_rate * m_hat / (np.sqrt(v_hat) + eps)
+
+    ll = log_likelihood(model, model.to_params(z), data)
+    best = ll.argmax(axis=0)
+    z_best = z[best, participants]
+    ll_best = ll[best, participants]
+
+    n_obs = data.mask.sum(axis=1)
+    return {
+        "model": model.name,
+        "participant_ids": list(data.participant_ids),
+        "params": model.to_params(z_best),
+        "log_likelihood": ll_best,
+        "aic": 2 * k - 2 * ll_best,
+        "bic": k * np.log(np.maximum(n_obs, 1)) - 2 * ll_best,
+        "iterations": iteration,
+    }
+
+
+# ============================================================
+# 시뮬레이션
+# ============================================================
+
+def simulate(
+    model,
+    params: Dict[str, np.ndarray],
+    n_trials: int = 100,
+    deck_manager: Optional[DeckManager] = None,
+    seed=None
+) -> ChoiceData:
+    """
+    모델 에이전트로 IGT 시뮬레이션 (실제 DeckManager 스케줄 사용)
+
+    Args:
+        model: 모델 이름 또는 IGTModel
+        params: 파라미터별 (N,) 배열 (에이전트당 하나)
+        n_trials: 시행 수
+        deck_manager: 보상 / 손실 스케줄 (없으면 기본 DeckManager)
+        seed: 난수 시드 (int 또는 np.random.Generator)
+
+    Returns:
+        적합에 바로 쓸 수 있는 ChoiceData
+    """
+    model = get_model(model)
+    n_agents = int(np.broadcast_shapes(*(np.shape(params[name]) for name in model.param_names))[0])
+    p = {name: np.broadcast_to(np.asarray(params[name], dtype=float), (n_agents,))
+         for name in model.param_names}
+    model_state = model.init_state((n_agents,))
+
+    def policy(t: int, sim: SimulationState) -> np.ndarray:
+        nonlocal model_state
+        if t > 0:
+            model_state = model.update(
+                model_state, p, _deck_onehot(sim.last_choice, 1),
+                sim.last_reward / OUTCOME_SCALE,
+                sim.last_penalty / OUTCOME_SCALE
+            )
+        logits = model.utilities(model_state, p, t)
+        cumulative = np.cumsum(np.exp(logits - logits.max(axis=0)), axis=0)
+        draws = sim.rng.random(n_agents) * cumulative[-1]
+        return (draws >= cumulative).sum(axis=0)
+
+    result = simulate_batch(
+        policy=policy, n_agents=n_agents, n_trials=n_trials,
+        deck_manager=deck_manager, seed=seed
+    )
+    return ChoiceData.from_arrays(result["choice"], result["reward"], result["penalty"])
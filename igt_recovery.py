@@ -0,0 +1,254 @@
+"""
+Iowa Gambling Task - Parameter Recovery
+IGT 모델 파라미터 복원 분석 (병렬 실행 + 체크포인트)
+
+1. 파라미터 범위에서 참가자 파라미터 샘플링
+2. 실제 DeckManager 스케줄로 에이전트 시뮬레이션
+3. 최대우도로 다시 추정
+4. 참 값 / 추정값 상관 (recovery correlation) 보고
+
+에이전트는 chunk_size 단위로 나누어 프로세스 풀에서 처리
+- chunk별 시드는 SeedSequence(seed).spawn()으로 고정 → 작업자 수와 무관하게 같은 결과
+- 완료된 chunk는 checkpoint_dir에 npz로 저장 → 중단 후 다시 실행하면 남은 chunk만 처리
+- 실행 설정은 manifest.json에 기록 → 설정이 다른 체크포인트는 이어서 사용하지 않음
+
+사용법:
+    python igt_recovery.py --model pvl_delta --agents 10000 --workers 8 --checkpoint-dir recovery_pvl
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from igt_models import fit_mle, get_model, simulate
+from igt_utils import DeckManager
+
+# chunk당 에이전트 수 (작업 단위 / 체크포인트 단위)
+CHUNK_SIZE = 250
+
+MANIFEST_FILE = "manifest.json"
+
+
+class CheckpointMismatchError(ValueError):
+    """체크포인트 디렉토리의 실행 설정이 현재 실행과 다름"""
+
+
+def _chunk_path(checkpoint_dir: str, index: int) -> str:
+    return os.path.join(checkpoint_dir, f"chunk_{index:05d}.npz")
+
+
+def _manifest(model_name: str, n_agents: int, n_trials: int, seed: int, chunk_size: int,
+              deck_manager: Optional[DeckManager], fit_kwargs: Dict) -> Dict:
+    """체크포인트 재사용 여부를 결정하는 실행 설정 (JSON 직렬화 후 비교)"""
+    schedule = (deck_manager or DeckManager()).schedule
+    # 같은 이름의 참가자별 변형 스케줄(+shuffled)도 구분되도록 내용 해시 포함
+    digest = hashlib.sha1(repr((schedule.rewards, schedule.penalties)).encode("utf-8")).hexdigest()
+    manifest = {
+        "model": model_name,
+        "seed": seed,
+        "n_agents": n_agents,
+        "n_trials": n_trials,
+        "chunk_size": chunk_size,
+        "schedule": schedule.name,
+        "schedule_digest": digest,
+        "fit_kwargs": fit_kwargs,
+    }
+    return json.loads(json.dumps(manifest, sort_keys=True, default=str))
+
+
+def _prepare_checkpoint(checkpoint_dir: str, manifest: Dict, overwrite: bool):
+    """
+    manifest 확인 / 기록
+
+    Raises:
+        CheckpointMismatchError: 기존 체크포인트의 설정이 다르고 overwrite가 False
+    """
+    os.makedirs(checkpoint_dir, exist_ok=True)
+    path = os.path.join(checkpoint_dir, MANIFEST_FILE)
+    chunks = glob.glob(os.path.join(checkpoint_dir, "chunk_*.npz"))
+
+    existing = None
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            existing = json.load(f)
+    if existing == manifest:
+        return
+
+    if chunks or existing is not None:
+        if not overwrite:
+            changed = sorted(
+                key for key in set(manifest) | set(existing or {})
+                if (existing or {}).get(key) != manifest.get(key)
+            )
+            raise CheckpointMismatchError(
+                f"Checkpoint in {checkpoint_dir} was created with different settings "
+                f"({', '.join(changed)}); use another directory or overwrite_checkpoint=True"
+            )
+        for chunk in chunks:
+            os.remove(chunk)
+
+    temp_path = path + ".tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(temp_path, path)
+
+
+def _recover_chunk(task: Dict) -> Dict[str, np.ndarray]:
+    """
+    chunk 하나 처리 (작업 프로세스에서 실행)
+
+    Args:
+        task: model, size, n_trials, seed (SeedSequence), deck_manager, fit_kwargs, path
+    """
+    model = get_model(task["model"])
+    rng = np.random.default_rng(task["seed"])
+
+    true_params = model.sample_params(task["size"], rng)
+    data = simulate(model, true_params, task["n_trials"], task["deck_manager"], seed=rng)
+    fit = fit_mle(model, data, seed=rng, **task["fit_kwargs"])
+
+    result = {f"true_{name}": true_params[name] for name in model.param_names}
+    result.update({f"fit_{name}": fit["params"][name] for name in model.param_names})
+    result["log_likelihood"] = fit["log_likelihood"]
+
+    if task["path"]:
+        # 임시 파일에 쓴 뒤 교체 (중단되어도 반쯤 쓴 체크포인트가 남지 않음)
+        temp_path = task["path"] + ".tmp.npz"
+        np.savez(temp_path, **result)
+        os.replace(temp_path, task["path"])
+    return result
+
+
+def run_recovery(
+    model,
+    n_agents: int = 1000,
+    n_trials: int = 100,
+    seed: int = 0,
+    workers: Optional[int] = None,
+    chunk_size: int = CHUNK_SIZE,
+    checkpoint_dir: Optional[str] = None,
+    deck_manager: Optional[DeckManager] = None,
+    overwrite_checkpoint: bool = False,
+    **fit_kwargs
+) -> Dict:
+    """
+    파라미터 복원 분석 실행
+
+    Args:
+        model: 모델 이름 또는 IGTModel
+        n_agents: 시뮬레이션 에이전트 수
+        n_trials: 에이전트당 시행 수
+        seed: 기준 시드 (chunk별 시드는 여기서 파생)
+        workers: 프로세스 수 (None이면 CPU 수, 1이면 현재 프로세스에서 실행)
+        chunk_size: chunk당 에이전트 수
+        checkpoint_dir: 체크포인트 디렉토리 (없으면 저장하지 않음)
+        deck_manager: 보상 / 손실 스케줄 (없으면 기본 DeckManager)
+        overwrite_checkpoint: 설정이 다른 기존 체크포인트를 지우고 새로 시작
+                              (False면 CheckpointMismatchError)
+        **fit_kwargs: fit_mle에 전달할 옵션
+
+    Returns:
+        - true / fitted: 파라미터별 (n_agents,) 배열
+        - log_likelihood: (n_agents,)
+        - correlations: 파라미터별 참 값 / 추정값 Pearson 상관
+        - rmse: 파라미터별 평균제곱근 오차
+        - resumed_chunks: 체크포인트에서 불러온 chunk 수
+    """
+    model = get_model(model)
+    n_chunks = (n_agents + chunk_size - 1) // chunk_size
+    seeds = np.random.SeedSequence(seed).spawn(n_chunks)
+    if checkpoint_dir:
+        manifest = _manifest(model.name, n_agents, n_trials, seed, chunk_size, deck_manager, fit_kwargs)
+        _prepare_checkpoint(checkpoint_dir, manifest, overwrite_checkpoint)
+
+    results: List[Optional[Dict[str, np.ndarray]]] = [None] * n_chunks
+    tasks = []
+    for index in range(n_chunks):
+        size = min(chunk_size, n_agents - index * chunk_size)
+        path = _chunk_path(checkpoint_dir, index) if checkpoint_dir else None
+        if path and os.path.exists(path):
+            with np.load(path) as saved:
+                if saved["log_likelihood"].shape[0] == size:
+                    results[index] = dict(saved)
+                    continue
+        tasks.append((index, {
+            "model": model.name,
+            "size": size,
+            "n_trials": n_trials,
+            "seed": seeds[index],
+            "deck_manager": deck_manager,
+            "fit_kwargs": fit_kwargs,
+            "path": path,
+        }))
+    resumed = n_chunks - len(tasks)
+
+    if workers == 1 or len(tasks) <= 1:
+        for index, task in tasks:
+            results[index] = _recover_chunk(task)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            outputs = executor.map(_recover_chunk, [task for _, task in tasks])
+            for (index, _), output in zip(tasks, outputs):
+                results[index] = output
+
+    true = {
+        name: np.concatenate([r[f"true_{name}"] for r in results]) for name in model.param_names
+    }
+    fitted = {
+        name: np.concatenate([r[f"fit_{name}"] for r in results]) for name in model.param_names
+    }
+    return {
+        "model": model.name,
+        "n_agents": n_agents,
+        "true": true,
+        "fitted": fitted,
+        "log_likelihood": np.concatenate([r["log_likelihood"] for r in results]),
+        "correlations": {
+            name: float(np.corrcoef(true[name], fitted[name])[0, 1]) for name in model.param_names
+        },
+        "rmse": {
+            name: float(np.sqrt(np.mean((true[name] - fitted[name]) ** 2)))
+            for name in model.param_names
+        },
+        "resumed_chunks": resumed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="IGT model parameter recovery")
+    parser.add_argument("--model", default="pvl_delta")
+    parser.add_argument("--agents", type=int, default=1000)
+    parser.add_argument("--trials", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--checkpoint-dir", default=None)
+    parser.add_argument("--overwrite-checkpoint", action="store_true",
+                        help="discard checkpoints created with different settings")
+    args = parser.parse_args()
+
+    result = run_recovery(
+        args.model,
+        n_agents=args.agents,
+        n_trials=args.trials,
+        seed=args.seed,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        checkpoint_dir=args.checkpoint_dir,
+        overwrite_checkpoint=args.overwrite_checkpoint,
+    )
+
+    print(f"model: {result['model']}, agents: {result['n_agents']} "
+          f"(resumed chunks: {result['resumed_chunks']})")
+    for name, r in result["correlations"].items():
+        print(f"  {name:>8}: r = {r:.3f}, rmse = {result['rmse'][name]:.3f}")
+
+
+if __name__ == "__main__":
+    main()
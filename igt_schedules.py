@@ -0,0 +1,269 @@
+"""
+Iowa Gambling Task - Deck Schedules
+IGT 덱 보상 / 손실 스케줄 등록 및 컴파일
+
+스케줄 정의는 igt_schedules.json에서 읽어 한 번만 검증 / 컴파일하고
+불변 DeckSchedule로 캐시하여 모든 DeckManager가 공유
+(DeckManager는 참가자별 카드 위치 / 선택 횟수만 보유)
+
+정의 형식 (schedules.<이름>):
+    직접 정의:
+        rewards:   {"A": 100, ...}              덱별 카드당 보상
+        penalties: {"A": [0, 0, 150, ...], ...}  덱별 손실 스케줄 (길이는 10의 배수, 모든 덱 동일)
+        expected:  {"A": {"ev_per_10": -250, "losses_per_10": 5}, ...}
+                   10장 블록마다 기대값(보상 - 손실 합계) / 손실 횟수 검증
+    다른 스케줄에서 파생 (base 지정):
+        deck_map:     {"A": "C", ...}  새 덱이 가져올 base 덱 (대응 교환)
+        repeat:       n                 주기를 n배로 확장
+        shuffle_seed: int               10장 블록 안에서 손실 위치 재배치 (블록별 기대값 / 손실 빈도 유지)
+"""
+
+import json
+import os
+import random
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+# 덱 순서 (DeckSchedule 튜플의 인덱스)
+DECKS = ('A', 'B', 'C', 'D')
+
+# 검증 단위 (10장당 기대값 / 손실 빈도)
+BLOCK_CARDS = 10
+
+# 기본 스케줄 파일 / 이름
+SCHEDULE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "igt_schedules.json")
+DEFAULT_SCHEDULE = "bechara1994"
+
+# 참가자별 재배치 스케줄 이름 접미어 (shuffle_schedule)
+SHUFFLED_SUFFIX = "+shuffled"
+
+
+class ScheduleError(ValueError):
+    """스케줄 정의 오류 / 검증 실패"""
+
+
+@dataclass(frozen=True, slots=True)
+class DeckSchedule:
+    """
+    컴파일된 덱 스케줄 (불변, 여러 DeckManager가 공유)
+
+    rewards / penalties는 DECKS 순서의 튜플
+    """
+    name: str
+    description: str
+    rewards: Tuple[int, ...]
+    penalties: Tuple[Tuple[int, ...], ...]
+
+    @property
+    def cycle_length(self) -> int:
+        """손실 스케줄 주기 (카드 수)"""
+        return len(self.penalties[0])
+
+    def reward_map(self) -> Dict[str, int]:
+        """{'A': 보상, ...}"""
+        return dict(zip(DECKS, self.rewards))
+
+    def penalty_map(self) -> Dict[str, List[int]]:
+        """{'A': [손실, ...], ...}"""
+        return {deck: list(schedule) for deck, schedule in zip(DECKS, self.penalties)}
+
+
+def _deck_values(spec: Dict, key: str, name: str) -> Dict:
+    values = spec.get(key)
+    if not isinstance(values, dict) or set(values) != set(DECKS):
+        raise ScheduleError(f"Schedule '{name}': '{key}' must define decks {', '.join(DECKS)}")
+    return values
+
+
+def _validate(
+    name: str,
+    rewards: Dict[str, int],
+    penalties: Dict[str, List[int]],
+    expected: Dict[str, Dict[str, int]]
+):
+    """10장 블록마다 기대값 / 손실 횟수 검증"""
+    lengths = {len(penalties[deck]) for deck in DECKS}
+    if len(lengths) != 1:
+        raise ScheduleError(f"Schedule '{name}': all decks must have the same schedule length")
+    length = lengths.pop()
+    if length == 0 or length % BLOCK_CARDS:
+        raise ScheduleError(
+            f"Schedule '{name}': schedule length must be a positive multiple of {BLOCK_CARDS}"
+        )
+
+    for deck in DECKS:
+        reward = rewards[deck]
+        if not isinstance(reward, int) or reward < 0:
+            raise ScheduleError(f"Schedule '{name}': invalid reward for deck {deck}")
+        schedule = penalties[deck]
+        if any(not isinstance(p, int) or p < 0 for p in schedule):
+            raise ScheduleError(f"Schedule '{name}': penalties must be non-negative integers")
+
+        for start in range(0, length, BLOCK_CARDS):
+            block = schedule[start:start + BLOCK_CARDS]
+            ev = reward * BLOCK_CARDS - sum(block)
+            losses = sum(1 for p in block if p)
+            if ev != expected[deck]["ev_per_10"]:
+                raise ScheduleError(
+                    f"Schedule '{name}': deck {deck} cards {start + 1}-{start + BLOCK_CARDS} "
+                    f"expected value {ev} != {expected[deck]['ev_per_10']}"
+                )
+            if losses != expected[deck]["losses_per_10"]:
+                raise ScheduleError(
+                    f"Schedule '{name}': deck {deck} cards {start + 1}-{start + BLOCK_CARDS} "
+                    f"has {losses} losses != {expected[deck]['losses_per_10']}"
+                )
+
+
+def _shuffle_blocks(schedule, rng: random.Random) -> List[int]:
+    """10장 블록 안에서 손실 위치 재배치 (블록별 기대값 / 손실 빈도 유지)"""
+    schedule = list(schedule)
+    for start in range(0, len(schedule), BLOCK_CARDS):
+        block = schedule[start:start + BLOCK_CARDS]
+        rng.shuffle(block)
+        schedule[start:start + BLOCK_CARDS] = block
+    return schedule
+
+
+def _resolve(name: str, definitions: Dict, resolving: Tuple[str, ...] = ()) -> Dict:
+    """정의 → 직접 정의 형식 (rewards / penalties / expected), base 파생 적용"""
+    if name not in definitions:
+        raise ScheduleError(f"Unknown schedule: {name}")
+    if name in resolving:
+        raise ScheduleError(f"Circular schedule base: {' -> '.join(resolving + (name,))}")
+    spec = definitions[name]
+
+    if "base" not in spec:
+        return {
+            "rewards": dict(_deck_values(spec, "rewards", name)),
+            "penalties": {deck: list(p) for deck, p in _deck_values(spec, "penalties", name).items()},
+            "expected": dict(_deck_values(spec, "expected", name)),
+        }
+
+    base = _resolve(spec["base"], definitions, resolving + (name,))
+    deck_map = spec.get("deck_map", {deck: deck for deck in DECKS})
+    if set(deck_map) != set(DECKS) or set(deck_map.values()) - set(DECKS):
+        raise ScheduleError(f"Schedule '{name}': invalid deck_map")
+    resolved = {
+        key: {deck: base[key][source] for deck, source in deck_map.items()}
+        for key in ("rewards", "penalties", "expected")
+    }
+
+    repeat = spec.get("repeat", 1)
+    if not isinstance(repeat, int) or repeat < 1:
+        raise ScheduleError(f"Schedule '{name}': repeat must be a positive integer")
+    resolved["penalties"] = {deck: p * repeat for deck, p in resolved["penalties"].items()}
+
+    if "shuffle_seed" in spec:
+        rng = random.Random(spec["shuffle_seed"])
+        for deck in DECKS:
+            resolved["penalties"][deck] = _shuffle_blocks(resolved["penalties"][deck], rng)
+    return resolved
+
+
+def compile_schedule(name: str, definitions: Dict) -> DeckSchedule:
+    """
+    스케줄 정의 하나를 검증 / 컴파일
+
+    Args:
+        name: 스케줄 이름
+        definitions: {이름: 정의} (base 참조 해석용)
+
+    Returns:
+        DeckSchedule
+    """
+    resolved = _resolve(name, definitions)
+    _validate(name, resolved["rewards"], resolved["penalties"], resolved["expected"])
+    return DeckSchedule(
+        name=name,
+        description=definitions[name].get("description", ""),
+        rewards=tuple(resolved["rewards"][deck] for deck in DECKS),
+        penalties=tuple(tuple(resolved["penalties"][deck]) for deck in DECKS),
+    )
+
+
+def shuffle_schedule(schedule: DeckSchedule, rng: random.Random) -> DeckSchedule:
+    """
+    참가자별 스케줄 생성 (10장 블록 안에서 손실 위치 재배치)
+
+    블록별 기대값 / 손실 빈도는 원래 스케줄과 같으므로 다시 검증하지 않음
+
+    Args:
+        schedule: 기준 스케줄
+        rng: 참가자별 난수 생성기 (session_seed.session_rng)
+
+    Returns:
+        새 DeckSchedule
+    """
+    return DeckSchedule(
+        name=f"{schedule.name}{SHUFFLED_SUFFIX}",
+        description=schedule.description,
+        rewards=schedule.rewards,
+        penalties=tuple(tuple(_shuffle_blocks(p, rng)) for p in schedule.penalties),
+    )
+
+
+@lru_cache(maxsize=None)
+def load_schedules(path: str = SCHEDULE_FILE) -> Dict[str, DeckSchedule]:
+    """
+    스케줄 파일의 모든 스케줄 컴파일 (경로별로 한 번만 수행)
+
+    Returns:
+        {이름: DeckSchedule}
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        definitions = json.load(f).get("schedules", {})
+    return {name: compile_schedule(name, definitions) for name in definitions}
+
+
+def available_schedules(path: str = SCHEDULE_FILE) -> List[str]:
+    """등록된 스케줄 이름 목록"""
+    return list(load_schedules(path))
+
+
+def get_schedule(schedule=None, path: Optional[str] = None) -> DeckSchedule:
+    """
+    스케줄 조회
+
+    Args:
+        schedule: 이름, DeckSchedule 또는 None (기본 스케줄)
+        path: 스케줄 파일 (없으면 igt_schedules.json)
+
+    Returns:
+        공유 DeckSchedule
+    """
+    if isinstance(schedule, DeckSchedule):
+        return schedule
+    schedules = load_schedules(path or SCHEDULE_FILE)
+    name = schedule or DEFAULT_SCHEDULE
+    if name not in schedules:
+        raise ScheduleError(f"Unknown schedule: {name}")
+    return schedules[name]
+
+
+def replay_schedule(
+    name: Optional[str] = None,
+    seed: Optional[int] = None,
+    path: Optional[str] = None
+) -> DeckSchedule:
+    """
+    로그에 기록된 스케줄 이름 / 시드로 참가자 스케줄 재생성
+
+    "<base>+shuffled"는 base 스케줄을 random.Random(seed)로 shuffle_schedule한 결과
+    (앱의 start_game과 같은 방식)
+
+    Args:
+        name: 스케줄 이름 (없으면 기본 스케줄)
+        seed: 참가자별 스케줄 시드 (재배치 스케줄에 필요)
+        path: 스케줄 파일 (없으면 igt_schedules.json)
+
+    Returns:
+        DeckSchedule
+    """
+    if name and name.endswith(SHUFFLED_SUFFIX):
+        if seed is None:
+            raise ScheduleError(f"Schedule '{name}' needs the participant seed to be replayed")
+        base = get_schedule(name[:-len(SHUFFLED_SUFFIX)], path)
+        return shuffle_schedule(base, random.Random(seed))
+    return get_schedule(name, path)
@@ -0,0 +1,362 @@
+"""
+Iowa Gambling Task - Batch Simulator
+NumPy 기반 IGT 일괄 시뮬레이터 (N명 × T시행 동시 계산)
+
+DeckManager와 같은 보상 / 고정 손실 스케줄(igt_schedules)을 배열로 변환하여
+선택 행렬 또는 정책 함수로부터 보상 / 손실 / 순이익 / 잔액 배열 생성
+(검정력 분석용 합성 세션 대량 생성)
+"""
+
+from typing import Callable, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from igt_schedules import get_schedule
+from igt_utils import DeckManager
+
+# 덱 순서 (선택 행렬의 정수 코드 0-3)
+DECKS = ('A', 'B', 'C', 'D')
+DECK_CODES = {deck: code for code, deck in enumerate(DECKS)}
+
+# 선택 행렬 계산 시 한 번에 처리할 에이전트 수 (중간 배열 메모리 제한)
+CHUNK_AGENTS = 100_000
+
+
+def deck_tables(deck_manager: Optional[DeckManager] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    DeckManager 스케줄을 배열로 변환
+
+    Args:
+        deck_manager: 보상 / 손실 스케줄을 가져올 DeckManager (없으면 기본 스케줄)
+
+    Returns:
+        (rewards (4,), penalties (4, 스케줄 길이))
+    """
+    schedule = deck_manager.schedule if deck_manager is not None else get_schedule()
+    rewards = np.array(schedule.rewards, dtype=np.int32)
+    penalties = np.array(schedule.penalties, dtype=np.int32)
+    return rewards, penalties
+
+
+def encode_choices(choices) -> np.ndarray:
+    """
+    선택 행렬을 정수 코드 배열로 변환
+
+    Args:
+        choices: (N, T) 배열 - 덱 이름('A'-'D') 또는 정수 코드(0-3)
+
+    Returns:
+        (N, T) int8 배열
+    """
+    array = np.asarray(choices)
+    if array.dtype.kind in ('U', 'S', 'O'):
+        lookup = np.vectorize(lambda deck: DECK_CODES.get(str(deck), -1), otypes=[np.int8])
+        codes = lookup(array)
+    else:
+        # int8 변환 전에 원래 값으로 검사 (256 → 0 같은 순환 / 1.7 → 1 같은 절사 방지)
+        if array.dtype.kind not in ('i', 'u', 'f'):
+            raise ValueError("Invalid deck in choice matrix")
+        if array.size and (
+            array.min() < 0 or array.max() >= len(DECKS) or (array != np.floor(array)).any()
+        ):
+            raise ValueError("Invalid deck in choice matrix")
+        codes = array.astype(np.int8)
+
+    if codes.ndim == 1:
+        codes = codes[np.newaxis, :]
+    if codes.ndim != 2:
+        raise ValueError("Choice matrix must be 2-dimensional (agents x trials)")
+    if codes.size and (codes.min() < 0 or codes.max() >= len(DECKS)):
+        raise ValueError("Invalid deck in choice matrix")
+    return codes
+
+
+def decode_choices(codes: np.ndarray) -> np.ndarray:
+    """정수 코드 배열을 덱 이름 배열로 변환"""
+    return np.asarray(DECKS)[np.asarray(codes)]
+
+
+class SimulationState:
+    """
+    정책 함수에 전달되는 현재 상태 (모든 값은 에이전트별 배열)
+
+    Attributes:
+        trial: 현재 시행 (0부터)
+        deck_counts: (N, 4) 덱별 지금까지 선택 횟수
+        balance: (N,) 현재 잔액
+        last_choice: (N,) 직전 선택 (첫 시행은 -1)
+        last_reward / last_penalty / last_net: (N,) 직전 결과 (첫 시행은 0)
+        rng: 정책에서 사용할 난수 생성기
+    """
+
+    def __init__(self, n_agents: int, initial_balance: int, rng: np.random.Generator):
+        self.trial = 0
+        self.deck_counts = np.zeros((n_agents, len(DECKS)), dtype=np.int32)
+        self.balance = np.full(n_agents, initial_balance, dtype=np.int32)
+        self.last_choice = np.full(n_agents, -1, dtype=np.int8)
+        self.last_reward = np.zeros(n_agents, dtype=np.int32)
+        self.last_penalty = np.zeros(n_agents, dtype=np.int32)
+        self.last_net = np.zeros(n_agents, dtype=np.int32)
+        self.rng = rng
+
+
+def _outcomes_from_choices(
+    codes: np.ndarray,
+    rewards: np.ndarray,
+    penalties: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """선택 행렬 → (보상, 손실) 배열 (덱별 누적 선택 횟수로 스케줄 위치 계산)"""
+    cycle = penalties.shape[1]
+    reward = rewards[codes]
+    penalty = np.empty(codes.shape, dtype=np.int32)
+    count_dtype = np.int16 if codes.shape[1] < np.iinfo(np.int16).max else np.int32
+
+    for start in range(0, codes.shape[0], CHUNK_AGENTS):
+        chunk = codes[start:start + CHUNK_AGENTS]
+        # 각 시행이 해당 덱에서 몇 번째 카드인지 (0부터)
+        position = np.zeros(chunk.shape, dtype=count_dtype)
+        for code in range(len(DECKS)):
+            mask = chunk == code
+            counts = np.cumsum(mask, axis=1, dtype=count_dtype)
+            position += np.where(mask, counts - 1, 0).astype(count_dtype)
+        penalty[start:start + CHUNK_AGENTS] = penalties[chunk, position % cycle]
+    return reward, penalty
+
+
+def simulate_batch(
+    choices=None,
+    policy: Optional[Callable[[int, SimulationState], Sequence[int]]] = None,
+    n_agents: Optional[int] = None,
+    n_trials: int = 100,
+    initial_balance: int = 2000,
+    deck_manager: Optional[DeckManager] = None,
+    seed=None
+) -> Dict[str, np.ndarray]:
+    """
+    N명 × T시행 IGT 일괄 시뮬레이션
+
+    choices 또는 policy 중 하나를 지정
+    - choices: 미리 정해진 선택 행렬 → 전체를 한 번에 벡터 계산
+    - policy(t, state): 시행마다 (N,) 선택 코드 반환 → 시행 단위로 N명 동시 계산
+
+    Args:
+        choices: (N, T) 선택 행렬 (덱 이름 또는 0-3 코드)
+        policy: 정책 함수 (t, SimulationState) → (N,) 선택 코드
+        n_agents: 정책 사용 시 에이전트 수
+        n_trials: 정책 사용 시 시행 수
+        initial_balance: 시작 잔액
+        deck_manager: 보상 / 손실 스케줄 (없으면 기본 DeckManager)
+        seed: 정책용 난수 시드 (int 또는 np.random.Generator)
+
+    Returns:
+        choice / reward / penalty / net / balance: (N, T) 배열
+        (balance는 각 시행 직후 잔액 = TrialResult.balance_after)
+    """
+    if (choices is None) == (policy is None):
+        raise ValueError("Specify exactly one of choices or policy")
+
+    rewards, penalties = deck_tables(deck_manager)
+
+    if choices is not None:
+        codes = encode_choices(choices)
+        reward, penalty = _outcomes_from_choices(codes, rewards, penalties)
+    else:
+        if n_agents is None:
+            raise ValueError("n_agents is required with a policy")
+        rng = seed if isinstance(seed, np.random.Generator) else np.random.default_rng(seed)
+        codes, reward, penalty = _run_policy(
+            policy, n_agents, n_trials, initial_balance, rewards, penalties, rng
+        )
+
+    net = reward - penalty
+    balance = initial_balance + np.cumsum(net, axis=1, dtype=np.int64)
+
+    return {
+        "choice": codes,
+        "reward": reward,
+        "penalty": penalty,
+        "net": net,
+        "balance": balance,
+    }
+
+
+def _run_policy(
+    policy: Callable[[int, SimulationState], Sequence[int]],
+    n_agents: int,
+    n_trials: int,
+    initial_balance: int,
+    rewards: np.ndarray,
+    penalties: np.ndarray,
+    rng: np.random.Generator
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """정책 함수를 시행 단위로 실행 (에이전트 축은 벡터 계산)"""
+    cycle = penalties.shape[1]
+    agents = np.arange(n_agents)
+
+    codes = np.empty((n_agents, n_trials), dtype=np.int8)
+    reward = np.empty((n_agents, n_trials), dtype=np.int32)
+    penalty = np.empty((n_agents, n_trials), dtype=np.int32)
+
+    state = SimulationState(n_agents, initial_balance, rng)
+    for t in range(n_trials):
+        state.trial = t
+        choice = np.asarray(policy(t, state), dtype=np.int8)
+        if choice.shape != (n_agents,):
+            raise ValueError(f"Policy must return {n_agents} choices, got shape {choice.shape}")
+        if choice.min() < 0 or choice.max() >= len(DECKS):
+            raise ValueError("Invalid deck returned by policy")
+
+        position = state.deck_counts[agents, choice] % cycle
+        r = rewards[choice]
+        p = penalties[choice, position]
+
+        codes[:, t] = choice
+        reward[:, t] = r
+        penalty[:, t] = p
+
+        state.deck_counts[agents, choice] += 1
+        state.balance += r - p
+        state.last_choice = choice
+        state.last_reward = r
+        state.last_penalty = p
+        state.last_net = r - p
+
+    return codes, reward, penalty
+
+
+def random_policy(probabilities: Sequence[float] = (0.25, 0.25, 0.25, 0.25)) -> Callable:
+    """
+    고정 확률로 덱을 고르는 정책 생성
+
+    Args:
+        probabilities: 덱 A-D 선택 확률
+    """
+    p = np.asarray(probabilities, dtype=float)
+    cumulative = np.cumsum(p / p.sum())
+    cumulative[-1] = 1.0
+
+    def policy(t: int, state: SimulationState) -> np.ndarray:
+        draws = state.rng.random(state.balance.shape[0])
+        return np.searchsorted(cumulative, draws, side="right").astype(np.int8)
+
+    return policy
+
+
+# ============================================================
+# 누적 결과표 (덱별 prefix sum)
+# ============================================================
+
+class OutcomeTables:
+    """
+    덱별 누적 보상 / 손실표
+
+    스케줄이 고정 주기(기본 40장)로 순환하므로 덱에서 k장을 뽑은 뒤의 누적 보상 / 손실은
+    k = q × 주기 + r 로 나누어 q × (한 주기 합계) + (처음 r장 합계)로 O(1) 계산
+
+    Args:
+        deck_manager: 보상 / 손실 스케줄 (없으면 기본 DeckManager)
+    """
+
+    def __init__(self, deck_manager: Optional[DeckManager] = None):
+        rewards, penalties = deck_tables(deck_manager)
+        self.cycle = penalties.shape[1]
+
+        # (4, 주기 + 1): k번째 열 = 처음 k장의 합계
+        self.cum_reward = rewards[:, np.newaxis].astype(np.int64) * np.arange(self.cycle + 1)
+        self.cum_penalty = np.zeros((len(DECKS), self.cycle + 1), dtype=np.int64)
+        self.cum_penalty[:, 1:] = np.cumsum(penalties, axis=1)
+
+        self.cycle_reward = self.cum_reward[:, -1]
+        self.cycle_penalty = self.cum_penalty[:, -1]
+        self._deck_axis = np.arange(len(DECKS))
+
+    @staticmethod
+    def _as_counts(deck_counts) -> np.ndarray:
+        if isinstance(deck_counts, dict):
+            return np.array([deck_counts.get(deck, 0) for deck in DECKS], dtype=np.int64)
+        return np.asarray(deck_counts, dtype=np.int64)
+
+    def cumulative(self, deck_counts) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        덱별 선택 횟수 → 덱별 누적 (보상, 손실)
+
+        Args:
+            deck_counts: (..., 4) 배열 또는 {'A': n, ...} 딕셔너리 (DeckManager.get_deck_counts())
+
+        Returns:
+            (누적 보상, 누적 손실) - 각각 (..., 4) 배열
+        """
+        counts = self._as_counts(deck_counts)
+        q, r = np.divmod(counts, self.cycle)
+        reward = q * self.cycle_reward + self.cum_reward[self._deck_axis, r]
+        penalty = q * self.cycle_penalty + self.cum_penalty[self._deck_axis, r]
+        return reward, penalty
+
+    def balance(self, deck_counts, initial_balance: int = 2000):
+        """
+        덱별 선택 횟수만으로 잔액 계산 (선택 순서와 무관)
+
+        Args:
+            deck_counts: (..., 4) 배열 또는 {'A': n, ...} 딕셔너리
+            initial_balance: 시작 잔액
+
+        Returns:
+            잔액 (deck_counts가 (..., 4)이면 (...) 배열)
+        """
+        reward, penalty = self.cumulative(deck_counts)
+        return initial_balance + (reward - penalty).sum(axis=-1)
+
+    def reconstruct(self, choices, initial_balance: int = 2000) -> Dict[str, np.ndarray]:
+        """
+        선택 행렬로 세션 전체 재구성 (시행 반복 없이 벡터 계산)
+
+        Args:
+            choices: (N, T) 선택 행렬 (덱 이름 또는 0-3 코드)
+            initial_balance: 시작 잔액
+
+        Returns:
+            choice / reward / penalty / net / balance: (N, T) 배열
+        """
+        codes = encode_choices(choices)
+        n_agents, n_trials = codes.shape
+        cum_reward = np.empty((n_agents, n_trials), dtype=np.int64)
+        cum_penalty = np.empty((n_agents, n_trials), dtype=np.int64)
+
+        for start in range(0, n_agents, CHUNK_AGENTS):
+            chunk = codes[start:start + CHUNK_AGENTS]
+            chunk_reward = cum_reward[start:start + CHUNK_AGENTS]
+            chunk_penalty = cum_penalty[start:start + CHUNK_AGENTS]
+            chunk_reward[:] = 0
+            chunk_penalty[:] = 0
+            for code in range(len(DECKS)):
+                # 각 시행 직후 이 덱의 선택 횟수 → 누적표 조회
+                counts = np.cumsum(chunk == code, axis=1, dtype=np.int32)
+                q = counts // self.cycle
+                r = counts - q * self.cycle
+                chunk_reward += q * self.cycle_reward[code] + self.cum_reward[code][r]
+                chunk_penalty += q * self.cycle_penalty[code] + self.cum_penalty[code][r]
+
+        reward = np.diff(cum_reward, axis=1, prepend=0)
+        penalty = np.diff(cum_penalty, axis=1, prepend=0)
+        return {
+            "choice": codes,
+            "reward": reward,
+            "penalty": penalty,
+            "net": reward - penalty,
+            "balance": initial_balance + cum_reward - cum_penalty,
+        }
+
+    def verify_balances(self, choices, balances, initial_balance: int = 2000) -> np.ndarray:
+        """
+        기록된 balance_after 값 검증
+
+        Args:
+            choices: (N, T) 선택 행렬
+            balances: (N, T) 기록된 시행별 잔액
+            initial_balance: 시작 잔액
+
+        Returns:
+            (N, T) bool 배열 - 재구성한 잔액과 다른 위치가 True
+        """
+        expected = self.reconstruct(choices, initial_balance)["balance"]
+        return expected != np.asarray(balances)
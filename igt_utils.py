@@ -3,36 +3,281 @@ Iowa Gambling Task - Utility Functions
 로그 기록 및 데이터 관리를 위한 유틸리티
 """
 
-import random
+import time
+from array import array
 from datetime import datetime
 from dataclasses import dataclass, field
-from typing import List, Dict, Optional
+from typing import Iterator, List, Dict, Optional, Tuple
 import json
 
+from igt_schedules import get_schedule
+from session_ids import new_session_id
 
-@dataclass
+
+def now_ns() -> int:
+    """
+    현재 시각 (epoch ns, 벽시계)
+
+    저장용 시각이므로 time.time_ns() 그대로 사용 (시스템 시각 동기화가 바로 반영됨)
+    경과 시간 측정에는 time.monotonic() 사용
+    """
+    return time.time_ns()
+
+
+def format_timestamp_ns(timestamp_ns: int) -> str:
+    """epoch ns → datetime.now().isoformat()과 같은 형식의 로컬 시각 문자열"""
+    seconds, remainder = divmod(timestamp_ns, 1_000_000_000)
+    return datetime.fromtimestamp(seconds).replace(microsecond=remainder // 1000).isoformat()
+
+
+def parse_timestamp_ns(timestamp: str) -> int:
+    """ISO 시각 문자열 → epoch ns"""
+    moment = datetime.fromisoformat(timestamp)
+    return int(moment.timestamp()) * 1_000_000_000 + moment.microsecond * 1000
+
+
+@dataclass(frozen=True, slots=True)
 class TrialResult:
-    """단일 시행 결과"""
+    """
+    단일 시행 결과 (불변, __slots__)
+
+    시각은 정수(epoch ns)로 저장하고 timestamp 속성에서 ISO 문자열로 변환
+    """
     trial_number: int
     deck_choice: str  # A, B, C, D
     reward: int
     penalty: int
     net_outcome: int
     balance_after: int
-    timestamp: str = field(default_factory=lambda: datetime.now().isoformat())
+    timestamp_ns: Optional[int] = field(default_factory=now_ns)  # None: 시각 정보 없음
+
+    @property
+    def timestamp(self) -> str:
+        """ISO 시각 문자열 (시각 정보가 없으면 "")"""
+        if self.timestamp_ns is None:
+            return ""
+        return format_timestamp_ns(self.timestamp_ns)
+
+    def to_dict(self) -> Dict:
+        """
+        딕셔너리로 변환 (timestamp는 ISO 문자열, 시각 정보가 없으면 "")
+
+        dataclasses.asdict()는 timestamp_ns 정수를 그대로 내보내므로 저장 / 직렬화에는 이 메서드 사용
+        """
+        return {
+            "trial_number": self.trial_number,
+            "deck_choice": self.deck_choice,
+            "reward": self.reward,
+            "penalty": self.penalty,
+            "net_outcome": self.net_outcome,
+            "balance_after": self.balance_after,
+            "timestamp": self.timestamp,
+        }
+
+
+# 덱 코드 (열 저장용 uint8)
+DECK_LETTERS = ('A', 'B', 'C', 'D')
+_DECK_CODE = {deck: code for code, deck in enumerate(DECK_LETTERS)}
+
+# TrialColumns에서 시각 정보 없음을 나타내는 값
+_NO_TIMESTAMP = 0
+
+
+class TrialColumns:
+    """
+    열 단위 시행 저장소 (GameSession.trials 대체, list[TrialResult]와 같은 방식으로 사용)
+
+    시행마다 객체를 만드는 대신 array 열에 값만 저장
+    - trial / reward / penalty / net / balance: int32, deck: uint8 코드, timestamp: int64 epoch ns
+    - 인덱싱 / 슬라이싱 / 순회 시 TrialResult를 그때그때 생성 (lazy view)
+    - rows()는 TrialResult 없이 열에서 바로 값 생성 (to_dict / 스프레드시트 내보내기용)
+    """
+
+    _COLUMNS = (
+        ("trial_number", "i"), ("deck", "B"), ("reward", "i"), ("penalty", "i"),
+        ("net_outcome", "i"), ("balance_after", "i"), ("timestamp_ns", "q"),
+    )
+
+    def __init__(self, trials: Optional[List[TrialResult]] = None):
+        for name, typecode in self._COLUMNS:
+            setattr(self, name, array(typecode))
+        for trial in trials or ():
+            self.append(trial)
+
+    def append(self, trial: TrialResult):
+        """TrialResult 값을 열에 추가"""
+        self.append_values(
+            trial.trial_number, trial.deck_choice, trial.reward, trial.penalty,
+            trial.net_outcome, trial.balance_after,
+            _NO_TIMESTAMP if trial.timestamp_ns is None else trial.timestamp_ns
+        )
+
+    def append_values(
+        self,
+        trial_number: int,
+        deck_choice: str,
+        reward: int,
+        penalty: int,
+        net_outcome: int,
+        balance_after: int,
+        timestamp_ns: int
+    ):
+        """값을 열에 바로 추가 (TrialResult 생성 없이)"""
+        self.trial_number.append(trial_number)
+        self.deck.append(_DECK_CODE[deck_choice])
+        self.reward.append(reward)
+        self.penalty.append(penalty)
+        self.net_outcome.append(net_outcome)
+        self.balance_after.append(balance_after)
+        self.timestamp_ns.append(timestamp_ns)
+
+    def _view(self, i: int) -> TrialResult:
+        return TrialResult(
+            trial_number=self.trial_number[i],
+            deck_choice=DECK_LETTERS[self.deck[i]],
+            reward=self.reward[i],
+            penalty=self.penalty[i],
+            net_outcome=self.net_outcome[i],
+            balance_after=self.balance_after[i],
+            timestamp_ns=self.timestamp_ns[i] or None
+        )
+
+    def __len__(self) -> int:
+        return len(self.trial_number)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._view(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("trial index out of range")
+        return self._view(index)
+
+    def __iter__(self) -> Iterator[TrialResult]:
+        for i in range(len(self)):
+            yield self._view(i)
+
+    def __bool__(self) -> bool:
+        return len(self) > 0
+
+    def rows(self) -> Iterator[Tuple[int, str, int, int, int, int, str]]:
+        """(trial, deck, reward, penalty, net, balance, timestamp) 값 순회"""
+        for values in zip(
+            self.trial_number, self.deck, self.reward, self.penalty,
+            self.net_outcome, self.balance_after, self.timestamp_ns
+        ):
+            yield values[:1] + (DECK_LETTERS[values[1]],) + values[2:6] + (
+                format_timestamp_ns(values[6]) if values[6] != _NO_TIMESTAMP else "",
+            )
+
+    def nbytes(self) -> int:
+        """열 데이터 크기 (바이트)"""
+        return sum(len(column) * column.itemsize for column in (
+            getattr(self, name) for name, _ in self._COLUMNS
+        ))
+
+
+def _trial_rows(trials) -> Iterator[Tuple[int, str, int, int, int, int, str]]:
+    """시행 목록(list 또는 TrialColumns)의 (trial, deck, reward, penalty, net, balance, timestamp) 값"""
+    if isinstance(trials, TrialColumns):
+        return trials.rows()
+    return (
+        (t.trial_number, t.deck_choice, t.reward, t.penalty,
+         t.net_outcome, t.balance_after, t.timestamp)
+        for t in trials
+    )
+
+
+# 유리한 / 불리한 덱
+ADVANTAGEOUS_DECKS = ('C', 'D')
+DISADVANTAGEOUS_DECKS = ('A', 'B')
+
+# 블록별 순점수 계산 단위 (시행 수)
+BLOCK_SIZE = 20
 
 
 @dataclass
 class GameSession:
-    """게임 세션 데이터"""
+    """
+    게임 세션 데이터
+
+    add_trial()로 시행을 추가하면 덱 선택 횟수 / 블록별 순점수 / 잔액을 누적 관리하여
+    점수를 O(1)로 조회 (score())
+    trials에 TrialColumns()를 넘기면 열 단위로 저장 (세션 메모리 절약)
+    """
     session_id: str
     participant_id: str
     start_time: str
-    trials: List[TrialResult] = field(default_factory=list)
+    trials: List[TrialResult] = field(default_factory=list)  # 또는 TrialColumns
     initial_balance: int = 2000
     current_balance: int = 2000
     total_trials: int = 100
     end_time: Optional[str] = None
+    seed: Optional[int] = None  # 참가자별 스케줄 시드 (session_seed.derive_seed)
+
+    # 누적 집계 (add_trial에서 갱신)
+    deck_counts: Dict[str, int] = field(
+        default_factory=lambda: {'A': 0, 'B': 0, 'C': 0, 'D': 0}, init=False, repr=False
+    )
+    block_net_scores: List[int] = field(default_factory=list, init=False, repr=False)
+    _aggregated_trials: int = field(default=0, init=False, repr=False)
+
+    def __post_init__(self):
+        # 시행 목록을 받아 생성한 경우 집계 재구성
+        if self.trials:
+            self._rebuild_aggregates()
+
+    def _rebuild_aggregates(self):
+        self.deck_counts = {'A': 0, 'B': 0, 'C': 0, 'D': 0}
+        self.block_net_scores = []
+        self._aggregated_trials = 0
+        for trial in self.trials:
+            self._aggregate(trial)
+
+    def _aggregate(self, trial: TrialResult):
+        self.deck_counts[trial.deck_choice] += 1
+
+        block = self._aggregated_trials // BLOCK_SIZE
+        if block == len(self.block_net_scores):
+            self.block_net_scores.append(0)
+        self.block_net_scores[block] += 1 if trial.deck_choice in ADVANTAGEOUS_DECKS else -1
+        self._aggregated_trials += 1
+
+    def add_trial(self, trial: TrialResult):
+        """시행 추가 (잔액 / 누적 집계 갱신)"""
+        if self._aggregated_trials != len(self.trials):
+            # trials 목록이 직접 수정된 경우
+            self._rebuild_aggregates()
+        self.trials.append(trial)
+        self._aggregate(trial)
+        self.current_balance = trial.balance_after
+
+    def score(self) -> Dict:
+        """
+        현재 IGT 점수 (누적 집계 사용, calculate_igt_score와 같은 형식)
+
+        Returns:
+            - net_score / deck_counts / advantageous_ratio / total_trials
+            - final_balance / profit
+            - block_net_scores: BLOCK_SIZE 시행 단위 순점수
+        """
+        if self._aggregated_trials != len(self.trials):
+            self._rebuild_aggregates()
+
+        advantageous = sum(self.deck_counts[d] for d in ADVANTAGEOUS_DECKS)
+        disadvantageous = sum(self.deck_counts[d] for d in DISADVANTAGEOUS_DECKS)
+        total = self._aggregated_trials
+
+        return {
+            'net_score': advantageous - disadvantageous,
+            'deck_counts': self.deck_counts.copy(),
+            'advantageous_ratio': advantageous / total if total > 0 else 0,
+            'total_trials': total,
+            'final_balance': self.current_balance,
+            'profit': self.current_balance - self.initial_balance,
+            'block_net_scores': list(self.block_net_scores),
+        }
 
     def to_dict(self) -> Dict:
         """딕셔너리로 변환"""
@@ -44,17 +289,18 @@ class GameSession:
             "initial_balance": self.initial_balance,
             "final_balance": self.current_balance,
             "total_trials_completed": len(self.trials),
+            "seed": self.seed,
             "trials": [
                 {
-                    "trial": t.trial_number,
-                    "deck": t.deck_choice,
-                    "reward": t.reward,
-                    "penalty": t.penalty,
-                    "net": t.net_outcome,
-                    "balance": t.balance_after,
-                    "time": t.timestamp
+                    "trial": trial,
+                    "deck": deck,
+                    "reward": reward,
+                    "penalty": penalty,
+                    "net": net,
+                    "balance": balance,
+                    "time": timestamp
                 }
-                for t in self.trials
+                for trial, deck, reward, penalty, net, balance, timestamp in _trial_rows(self.trials)
             ]
         }
 
@@ -76,56 +322,34 @@ class DeckManager:
     각 덱은 40장 단위로 순환하며, 10장당 기대값:
     - Deck A/B: -$250 (불리)
     - Deck C/D: +$250 (유리)
-    """
 
-    def __init__(self):
-        # 보상 설정
-        self.rewards = {
-            'A': 100,
-            'B': 100,
-            'C': 50,
-            'D': 50
-        }
+    스케줄은 igt_schedules.json에서 읽어 한 번만 컴파일 (변형 스케줄은 이름으로 선택)
+    """
 
-        # 40장 고정 스케줄 (Bechara et al., 1994 Figure 1 기반)
-        # 손실 위치가 불규칙하게 배치됨
-        self.penalty_schedules = {
-            # Deck A: 10장당 5회 손실, 합계 $1250 (빈번하고 다양한 손실)
-            'A': [
-                0, 0, 150, 0, 300, 0, 200, 0, 250, 350,      # 1-10: 손실 5회, 합계 $1250
-                0, 350, 0, 250, 0, 200, 0, 300, 150, 0,      # 11-20: 손실 5회, 합계 $1250
-                150, 0, 300, 0, 0, 200, 250, 0, 0, 350,      # 21-30: 손실 5회, 합계 $1250
-                350, 0, 200, 250, 0, 0, 150, 0, 300, 0,      # 31-40: 손실 5회, 합계 $1250
-            ],
-            # Deck B: 10장당 1회 큰 손실 $1250 (드물지만 치명적)
-            'B': [
-                0, 0, 0, 0, 0, 0, 0, 0, 1250, 0,             # 1-10: 9번째에서 $1250
-                0, 0, 0, 0, 0, 0, 0, 0, 0, 1250,             # 11-20: 10번째에서 $1250
-                0, 0, 0, 0, 1250, 0, 0, 0, 0, 0,             # 21-30: 5번째에서 $1250
-                0, 0, 0, 0, 0, 0, 1250, 0, 0, 0,             # 31-40: 7번째에서 $1250
-            ],
-            # Deck C: 10장당 5회 손실, 합계 $250 (빈번하지만 작은 손실)
-            'C': [
-                0, 0, 50, 0, 50, 0, 50, 0, 50, 50,           # 1-10: 손실 5회, 합계 $250
-                0, 25, 0, 75, 0, 50, 0, 25, 75, 0,           # 11-20: 손실 5회, 합계 $250
-                50, 0, 25, 0, 0, 75, 50, 0, 0, 50,           # 21-30: 손실 5회, 합계 $250
-                25, 0, 75, 50, 0, 0, 25, 0, 75, 0,           # 31-40: 손실 5회, 합계 $250
-            ],
-            # Deck D: 10장당 1회 손실 $250 (드물고 중간 크기)
-            'D': [
-                0, 0, 0, 0, 0, 0, 0, 0, 250, 0,              # 1-10: 9번째에서 $250
-                0, 0, 0, 0, 0, 0, 0, 0, 0, 250,              # 11-20: 10번째에서 $250
-                0, 0, 0, 0, 250, 0, 0, 0, 0, 0,              # 21-30: 5번째에서 $250
-                0, 0, 0, 0, 0, 0, 250, 0, 0, 0,              # 31-40: 7번째에서 $250
-            ],
-        }
+    def __init__(self, schedule=None):
+        """
+        Args:
+            schedule: 스케줄 이름 또는 DeckSchedule (없으면 기본 bechara1994)
+                      컴파일된 스케줄은 모든 DeckManager가 공유
+        """
+        self.schedule = get_schedule(schedule)
 
-        # 각 덱별 현재 카드 인덱스 (0-39 순환)
+        # 각 덱별 현재 카드 인덱스 (스케줄 주기 단위 순환)
         self.deck_indices = {'A': 0, 'B': 0, 'C': 0, 'D': 0}
 
         # 각 덱별 선택 횟수 추적
         self.deck_counts = {'A': 0, 'B': 0, 'C': 0, 'D': 0}
 
+    @property
+    def rewards(self) -> Dict[str, int]:
+        """덱별 카드당 보상"""
+        return self.schedule.reward_map()
+
+    @property
+    def penalty_schedules(self) -> Dict[str, List[int]]:
+        """덱별 손실 스케줄"""
+        return self.schedule.penalty_map()
+
     def draw_card(self, deck: str) -> tuple:
         """
         덱에서 카드를 뽑고 보상/손실 반환 (고정 스케줄 방식)
@@ -133,19 +357,21 @@ class DeckManager:
         Returns:
             (reward, penalty, net_outcome)
         """
-        if deck not in self.rewards:
+        code = _DECK_CODE.get(deck)
+        if code is None:
             raise ValueError(f"Invalid deck: {deck}")
 
         self.deck_counts[deck] += 1
 
-        reward = self.rewards[deck]
+        reward = self.schedule.rewards[code]
 
         # 현재 인덱스의 손실 가져오기
         current_index = self.deck_indices[deck]
-        penalty = self.penalty_schedules[deck][current_index]
+        penalties = self.schedule.penalties[code]
+        penalty = penalties[current_index]
 
-        # 인덱스 증가 (40장 단위 순환)
-        self.deck_indices[deck] = (current_index + 1) % 40
+        # 인덱스 증가 (스케줄 주기 단위 순환)
+        self.deck_indices[deck] = (current_index + 1) % len(penalties)
 
         net_outcome = reward - penalty
 
@@ -161,40 +387,21 @@ class DeckManager:
 
 
 def generate_session_id() -> str:
-    """고유 세션 ID 생성"""
-    return datetime.now().strftime("%Y%m%d_%H%M%S_") + str(random.randint(1000, 9999))
+    """고유 세션 ID 생성 (시간순 정렬 가능, session_ids.new_session_id)"""
+    return new_session_id()
 
 
 def calculate_igt_score(session: GameSession) -> Dict:
     """
-    IGT 점수 계산
+    IGT 점수 계산 (GameSession.score()의 누적 집계 사용)
 
     Returns:
         - net_score: (C+D) - (A+B) 점수
         - deck_counts: 각 덱 선택 횟수
         - advantageous_ratio: 유리한 덱 선택 비율
+        - block_net_scores: 20시행 블록별 순점수
     """
-    deck_counts = {'A': 0, 'B': 0, 'C': 0, 'D': 0}
-
-    for trial in session.trials:
-        deck_counts[trial.deck_choice] += 1
-
-    # Net Score: (유리한 덱) - (불리한 덱)
-    advantageous = deck_counts['C'] + deck_counts['D']
-    disadvantageous = deck_counts['A'] + deck_counts['B']
-    net_score = advantageous - disadvantageous
-
-    total = len(session.trials)
-    advantageous_ratio = advantageous / total if total > 0 else 0
-
-    return {
-        'net_score': net_score,
-        'deck_counts': deck_counts,
-        'advantageous_ratio': advantageous_ratio,
-        'total_trials': total,
-        'final_balance': session.current_balance,
-        'profit': session.current_balance - session.initial_balance
-    }
+    return session.score()
 
 
 def format_trial_log(trial: TrialResult) -> str:
@@ -226,17 +433,17 @@ def prepare_for_spreadsheet(session: GameSession) -> List[List]:
     rows.append(header)
 
     # 데이터 행
-    for trial in session.trials:
+    for trial, deck, reward, penalty, net, balance, timestamp in _trial_rows(session.trials):
         row = [
             session.session_id,
             session.participant_id,
-            trial.trial_number,
-            trial.deck_choice,
-            trial.reward,
-            trial.penalty,
-            trial.net_outcome,
-            trial.balance_after,
-            trial.timestamp
+            trial,
+            deck,
+            reward,
+            penalty,
+            net,
+            balance,
+            timestamp
         ]
         rows.append(row)
 
@@ -7,15 +7,19 @@ Bechara et al. (1994) 기반 의사결정 과제
 
 import streamlit as st
 import time
+import random
 from datetime import datetime, timezone, timedelta
 from igt_utils import (
     DeckManager,
     GameSession,
+    TrialColumns,
     TrialResult,
     generate_session_id,
     calculate_igt_score,
     prepare_for_spreadsheet
 )
+from igt_schedules import get_schedule, shuffle_schedule
+from session_seed import derive_seed, get_master_seed
 from igt_logging_utils import (
     log_batch_trials,
     log_session_start,
@@ -27,6 +31,12 @@ KST = timezone(timedelta(hours=9))
 # 배치 로깅 간격 (N시행마다 Google Sheets에 기록)
 BATCH_LOG_INTERVAL = 100
 
+# 덱 보상 / 손실 스케줄 (igt_schedules.json에 등록된 이름)
+DECK_SCHEDULE = "bechara1994"
+
+# 참가자별 시드로 10장 블록 안에서 손실 위치 재배치 여부
+SHUFFLE_SCHEDULE = False
+
 # 페이지 설정
 st.set_page_config(
     page_title="Iowa Gambling Task",
@@ -157,21 +167,35 @@ def start_game(participant_id: str):
     """게임 시작"""
     st.session_state.game_started = True
     st.session_state.game_ended = False
-    st.session_state.deck_manager = DeckManager()
+
+    # 참가자별 시드 (세션 ID에서 파생, 로그에 기록하여 스케줄 재생성 가능)
+    session_id = generate_session_id()
+    master_seed = get_master_seed()
+    seed = derive_seed(session_id, "schedule", master_seed)
+    schedule = get_schedule(DECK_SCHEDULE)
+    if SHUFFLE_SCHEDULE:
+        schedule = shuffle_schedule(schedule, random.Random(seed))
+
+    st.session_state.deck_manager = DeckManager(schedule)
     st.session_state.session = GameSession(
-        session_id=generate_session_id(),
+        session_id=session_id,
         participant_id=participant_id,
-        start_time=datetime.now().isoformat()
+        start_time=datetime.now().isoformat(),
+        trials=TrialColumns(),
+        seed=seed
     )
     st.session_state.last_result = None
     st.session_state.show_result = False
-    st.session_state.game_start_timestamp = time.time()
+    st.session_state.game_start_timestamp = time.monotonic()
     st.session_state.last_logged_trial_idx = 0
 
     # Google Spreadsheet 로깅
     log_session_start(
-        session_id=st.session_state.session.session_id,
-        participant_id=participant_id
+        session_id=session_id,
+        participant_id=participant_id,
+        seed=seed,
+        schedule=schedule.name,
+        master_seed=master_seed
     )
     
     st.session_state.show_participant_input = False
@@ -185,19 +209,16 @@ def select_deck(deck: str):
     # 카드 뽑기
     reward, penalty, net_outcome = deck_manager.draw_card(deck)
 
-    # 잔액 업데이트
-    session.current_balance += net_outcome
-
-    # 시행 결과 기록
+    # 시행 결과 기록 (잔액 / 점수 집계도 함께 갱신)
     trial = TrialResult(
         trial_number=len(session.trials) + 1,
         deck_choice=deck,
         reward=reward,
         penalty=penalty,
         net_outcome=net_outcome,
-        balance_after=session.current_balance
+        balance_after=session.current_balance + net_outcome
     )
-    session.trials.append(trial)
+    session.add_trial(trial)
 
     # 주기적 배치 로깅 (N시행마다)
     if len(session.trials) % BATCH_LOG_INTERVAL == 0:
@@ -210,7 +231,7 @@ def select_deck(deck: str):
     # 게임 종료 체크
     if len(session.trials) >= session.total_trials:
         session.end_time = datetime.now().isoformat()
-        st.session_state.game_end_duration = time.time() - st.session_state.game_start_timestamp
+        st.session_state.game_end_duration = time.monotonic() - st.session_state.game_start_timestamp
         st.session_state.game_ended = True
 
 
@@ -462,7 +483,7 @@ def main():
     elif st.session_state.game_ended:
         # 게임 종료: 10분 미만이면 대기 화면, 이상이면 결과 표시
         MIN_GAME_DURATION = 600  # 10분 (초)
-        elapsed = time.time() - st.session_state.game_start_timestamp
+        elapsed = time.monotonic() - st.session_state.game_start_timestamp
 
         with page.container():
             if elapsed < MIN_GAME_DURATION:
@@ -8,15 +8,19 @@ IGT 다음 TOM
 
 import streamlit as st
 import time
+import random
 from datetime import datetime, timezone, timedelta
 from igt_utils import (
     DeckManager,
     GameSession,
+    TrialColumns,
     TrialResult,
     generate_session_id,
     calculate_igt_score,
     prepare_for_spreadsheet
 )
+from igt_schedules import get_schedule, shuffle_schedule
+from session_seed import derive_seed, get_master_seed
 from igt_logging_utils import (
     log_batch_trials,
     log_session_start,
@@ -28,6 +32,12 @@ KST = timezone(timedelta(hours=9))
 # 배치 로깅 간격 (N시행마다 Google Sheets에 기록)
 BATCH_LOG_INTERVAL = 100
 
+# 덱 보상 / 손실 스케줄 (igt_schedules.json에 등록된 이름)
+DECK_SCHEDULE = "bechara1994"
+
+# 참가자별 시드로 10장 블록 안에서 손실 위치 재배치 여부
+SHUFFLE_SCHEDULE = False
+
 # 페이지 설정
 st.set_page_config(
     page_title="Iowa Gambling Task",
@@ -158,21 +168,35 @@ def start_game(participant_id: str):
     """게임 시작"""
     st.session_state.game_started = True
     st.session_state.game_ended = False
-    st.session_state.deck_manager = DeckManager()
+
+    # 참가자별 시드 (세션 ID에서 파생, 로그에 기록하여 스케줄 재생성 가능)
+    session_id = generate_session_id()
+    master_seed = get_master_seed()
+    seed = derive_seed(session_id, "schedule", master_seed)
+    schedule = get_schedule(DECK_SCHEDULE)
+    if SHUFFLE_SCHEDULE:
+        schedule = shuffle_schedule(schedule, random.Random(seed))
+
+    st.session_state.deck_manager = DeckManager(schedule)
     st.session_state.session = GameSession(
-        session_id=generate_session_id(),
+        session_id=session_id,
         participant_id=participant_id,
-        start_time=datetime.now().isoformat()
+        start_time=datetime.now().isoformat(),
+        trials=TrialColumns(),
+        seed=seed
     )
     st.session_state.last_result = None
     st.session_state.show_result = False
-    st.session_state.game_start_timestamp = time.time()
+    st.session_state.game_start_timestamp = time.monotonic()
     st.session_state.last_logged_trial_idx = 0
 
     # Google Spreadsheet 로깅
     log_session_start(
-        session_id=st.session_state.session.session_id,
-        participant_id=participant_id
+        session_id=session_id,
+        participant_id=participant_id,
+        seed=seed,
+        schedule=schedule.name,
+        master_seed=master_seed
     )
     
     st.session_state.show_participant_input = False
@@ -186,19 +210,16 @@ def select_deck(deck: str):
     # 카드 뽑기
     reward, penalty, net_outcome = deck_manager.draw_card(deck)
 
-    # 잔액 업데이트
-    session.current_balance += net_outcome
-
-    # 시행 결과 기록
+    # 시행 결과 기록 (잔액 / 점수 집계도 함께 갱신)
     trial = TrialResult(
         trial_number=len(session.trials) + 1,
         deck_choice=deck,
         reward=reward,
         penalty=penalty,
         net_outcome=net_outcome,
-        balance_after=session.current_balance
+        balance_after=session.current_balance + net_outcome
     )
-    session.trials.append(trial)
+    session.add_trial(trial)
 
     # 주기적 배치 로깅 (N시행마다)
     if len(session.trials) % BATCH_LOG_INTERVAL == 0:
@@ -211,7 +232,7 @@ def select_deck(deck: str):
     # 게임 종료 체크
     if len(session.trials) >= session.total_trials:
         session.end_time = datetime.now().isoformat()
-        st.session_state.game_end_duration = time.time() - st.session_state.game_start_timestamp
+        st.session_state.game_end_duration = time.monotonic() - st.session_state.game_start_timestamp
         st.session_state.game_ended = True
 
 
@@ -0,0 +1,319 @@
+"""
+Local Write-Ahead Spool
+Google Spreadsheet 전송 전 로컬 선기록(append-only) 스풀
+
+모든 기록을 먼저 fsync된 세그먼트 파일에 추가한 뒤 Sheets로 전송하고,
+전송 확인(ack)된 위치를 체크포인트에 저장하여 프로세스 비정상 종료 후에도
+미전송 기록을 복구하여 재전송할 수 있도록 함
+
+스풀 디렉토리는 잠금 파일(fcntl.flock)로 한 프로세스만 사용
+(여러 워커 프로세스가 같은 세그먼트를 동시에 복구 / 재전송하지 않도록)
+"""
+
+import json
+import os
+import threading
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: 잠금 없이 동작
+    fcntl = None
+
+# 세그먼트 파일 최대 크기 (초과 시 새 세그먼트로 교체)
+SEGMENT_MAX_BYTES = 1024 * 1024
+
+CHECKPOINT_FILE = "checkpoint.json"
+SEGMENT_PREFIX = "segment_"
+SEGMENT_SUFFIX = ".log"
+LOCK_FILE = "spool.lock"
+
+# 다른 프로세스가 기본 디렉토리를 사용 중일 때 워커별 스풀을 만드는 하위 디렉토리
+WORKERS_DIR = "workers"
+
+
+class SpoolLockedError(RuntimeError):
+    """다른 프로세스가 이미 사용 중인 스풀 디렉토리"""
+
+
+def _fsync_dir(path: str):
+    """디렉토리 엔트리(파일 생성/교체) 영속화"""
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    fd = os.open(path, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class _Segment:
+    """세그먼트 파일 정보"""
+
+    __slots__ = ("path", "first_seq", "last_seq")
+
+    def __init__(self, path: str, first_seq: int, last_seq: int):
+        self.path = path
+        self.first_seq = first_seq
+        self.last_seq = last_seq
+
+
+class LogSpool:
+    """
+    세그먼트 파일 기반 append-only 스풀
+
+    레코드 형식 (한 줄당 JSON 하나):
+        {"seq": 일련번호, "sheet_info": [[키, URL], ...], "header": [...] 또는 null, "rows": [[...], ...]}
+    """
+
+    def __init__(self, directory: str, segment_max_bytes: int = SEGMENT_MAX_BYTES):
+        """
+        Raises:
+            SpoolLockedError: 다른 프로세스가 같은 디렉토리를 사용 중
+        """
+        self.directory = directory
+        self.segment_max_bytes = segment_max_bytes
+
+        self._lock = threading.Lock()
+        self._segments: List[_Segment] = []
+        self._active = None  # 현재 쓰기 중인 파일 객체
+        self._next_seq = 1
+        self._acked_seq = 0
+
+        # 미전송 레코드 (seq 오름차순)
+        self._pending: "deque[Dict]" = deque()
+
+        os.makedirs(directory, exist_ok=True)
+        self._lock_file = self._acquire_lock()
+        self._recover()
+
+    def _acquire_lock(self):
+        """디렉토리 잠금 (프로세스 종료 시 OS가 자동 해제)"""
+        if fcntl is None:
+            return None
+        lock_file = open(os.path.join(self.directory, LOCK_FILE), "a")
+        try:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            raise SpoolLockedError(f"Spool directory is in use by another process: {self.directory}")
+        return lock_file
+
+    # ------------------------------------------------------------
+    # 복구
+    # ------------------------------------------------------------
+
+    def _recover(self):
+        """체크포인트 + 세그먼트 파일에서 미전송 레코드 복구"""
+        checkpoint_path = os.path.join(self.directory, CHECKPOINT_FILE)
+        if os.path.exists(checkpoint_path):
+            with open(checkpoint_path, "r", encoding="utf-8") as f:
+                self._acked_seq = json.load(f).get("acked_seq", 0)
+        self._next_seq = self._acked_seq + 1
+
+        names = sorted(
+            name for name in os.listdir(self.directory)
+            if name.startswith(SEGMENT_PREFIX) and name.endswith(SEGMENT_SUFFIX)
+        )
+        for name in names:
+            path = os.path.join(self.directory, name)
+            first_seq = last_seq = None
+            valid_bytes = 0
+            with open(path, "rb") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # 비정상 종료로 잘린 마지막 줄 → 이후 내용 폐기
+                        break
+                    valid_bytes += len(line)
+                    seq = record["seq"]
+                    if first_seq is None:
+                        first_seq = seq
+                    last_seq = seq
+                    if seq > self._acked_seq:
+                        self._pending.append(record)
+
+            if last_seq is None:
+                os.remove(path)
+                continue
+            if valid_bytes < os.path.getsize(path):
+                with open(path, "r+b") as f:
+                    f.truncate(valid_bytes)
+                    f.flush()
+                    os.fsync(f.fileno())
+            self._segments.append(_Segment(path, first_seq, last_seq))
+            self._next_seq = max(self._next_seq, last_seq + 1)
+
+        self._remove_acked_segments()
+
+    # ------------------------------------------------------------
+    # 기록
+    # ------------------------------------------------------------
+
+    def _open_segment(self):
+        path = os.path.join(
+            self.directory, f"{SEGMENT_PREFIX}{self._next_seq:012d}{SEGMENT_SUFFIX}"
+        )
+        self._active = open(path, "ab")
+        _fsync_dir(self.directory)
+        self._segments.append(_Segment(path, self._next_seq, self._next_seq - 1))
+
+    def append(
+        self,
+        sheet_info: List[Tuple[str, str]],
+        rows: List[List],
+        header: Optional[List[str]] = None
+    ) -> int:
+        """
+        레코드를 세그먼트 파일에 추가하고 fsync (반환 시점에 디스크 기록 보장)
+
+        Returns:
+            레코드 일련번호 (seq)
+        """
+        with self._lock:
+            if self._active is None or self._active.tell() >= self.segment_max_bytes:
+                if self._active is not None:
+                    self._active.close()
+                self._open_segment()
+
+            seq = self._next_seq
+            record = {
+                "seq": seq,
+                "sheet_info": [list(info) for info in sheet_info],
+                "header": header,
+                "rows": rows,
+            }
+            line = json.dumps(record, ensure_ascii=False, default=str) + "\n"
+            self._active.write(line.encode("utf-8"))
+            self._active.flush()
+            os.fsync(self._active.fileno())
+
+            self._next_seq += 1
+            self._segments[-1].last_seq = seq
+            self._pending.append(record)
+            return seq
+
+    # ------------------------------------------------------------
+    # 전송 / 확인
+    # ------------------------------------------------------------
+
+    def pending(self, max_rows: Optional[int] = None) -> List[Dict]:
+        """
+        미전송 레코드를 앞에서부터 반환 (제거하지 않음)
+
+        Args:
+            max_rows: 반환할 레코드들의 최대 행 수 합계 (첫 레코드는 항상 포함)
+        """
+        with self._lock:
+            records = []
+            total = 0
+            for record in self._pending:
+                if records and max_rows is not None and total + len(record["rows"]) > max_rows:
+                    break
+                records.append(record)
+                total += len(record["rows"])
+            return records
+
+    def pending_count(self) -> int:
+        """미전송 레코드 수"""
+        with self._lock:
+            return len(self._pending)
+
+    def ack(self, seq: int):
+        """
+        seq 이하 레코드 전송 완료 처리 및 체크포인트 저장
+        """
+        with self._lock:
+            if seq <= self._acked_seq:
+                return
+            while self._pending and self._pending[0]["seq"] <= seq:
+                self._pending.popleft()
+            self._acked_seq = seq
+            self._write_checkpoint()
+            self._remove_acked_segments()
+
+    def _write_checkpoint(self):
+        """체크포인트 원자적 교체 (임시 파일 → fsync → rename)"""
+        path = os.path.join(self.directory, CHECKPOINT_FILE)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"acked_seq": self._acked_seq}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+        _fsync_dir(self.directory)
+
+    def _remove_acked_segments(self):
+        """모두 전송된(쓰기 중이 아닌) 세그먼트 삭제"""
+        active_path = self._active.name if self._active is not None else None
+        remaining = []
+        for segment in self._segments:
+            if segment.path != active_path and segment.last_seq <= self._acked_seq:
+                os.remove(segment.path)
+            else:
+                remaining.append(segment)
+        self._segments = remaining
+
+    def close(self):
+        """쓰기 중인 세그먼트 닫기 및 디렉토리 잠금 해제"""
+        with self._lock:
+            if self._active is not None:
+                self._active.close()
+                self._active = None
+            if self._lock_file is not None:
+                self._lock_file.close()  # 닫으면 flock 해제
+                self._lock_file = None
+
+
+def _has_segments(directory: str) -> bool:
+    return any(
+        name.startswith(SEGMENT_PREFIX) and name.endswith(SEGMENT_SUFFIX)
+        for name in os.listdir(directory)
+    )
+
+
+def open_spools(directory: str, segment_max_bytes: int = SEGMENT_MAX_BYTES) -> List[LogSpool]:
+    """
+    여러 워커 프로세스가 같은 디렉토리를 설정해도 안전하게 스풀 열기
+
+    - directory 잠금을 얻으면 그대로 사용
+    - 다른 프로세스가 사용 중이면 workers/<pid> 하위 디렉토리 사용
+    - 종료된 워커가 남긴 workers/* 스풀(잠기지 않고 세그먼트가 남은 것)은 함께 열어 재전송
+
+    Args:
+        directory: 스풀 디렉토리
+        segment_max_bytes: 세그먼트 파일 최대 크기
+
+    Returns:
+        [기록용 스풀, 복구한 다른 워커 스풀, ...]
+    """
+    try:
+        spool = LogSpool(directory, segment_max_bytes)
+    except SpoolLockedError:
+        spool = None
+        # 같은 pid의 이전 스풀을 다른 프로세스가 복구 중이면 다음 이름 사용
+        for attempt in range(100):
+            name = str(os.getpid()) if attempt == 0 else f"{os.getpid()}.{attempt}"
+            try:
+                spool = LogSpool(os.path.join(directory, WORKERS_DIR, name), segment_max_bytes)
+                break
+            except SpoolLockedError:
+                continue
+        if spool is None:
+            raise
+
+    spools = [spool]
+    workers_dir = os.path.join(directory, WORKERS_DIR)
+    if os.path.isdir(workers_dir):
+        own = os.path.abspath(spool.directory)
+        for name in sorted(os.listdir(workers_dir)):
+            path = os.path.join(workers_dir, name)
+            if os.path.abspath(path) == own or not os.path.isdir(path) or not _has_segments(path):
+                continue
+            try:
+                spools.append(LogSpool(path, segment_max_bytes))
+            except SpoolLockedError:
+                continue  # 실행 중인 워커의 스풀
+    return spools
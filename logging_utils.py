@@ -2,21 +2,26 @@
 Logging Utilities for Psychology Experiments
 심리학 실험 데이터 로깅 유틸리티
 
-Google Spreadsheet + 로컬 파일 로깅 지원
+Google Spreadsheet + 로컬 파일(CSV 또는 SQLite) 로깅 지원
 """
 
 import json
 import os
-import time
 from datetime import datetime
+import threading
 from typing import Dict, List, Optional, Any
-import csv
+
+from csv_writer_pool import create_pool
+from log_spool import LogSpool, open_spools
+from session_index import get_index
 
 # Google Spreadsheet 연동
 try:
     import streamlit as st
     import gspread
     from oauth2client.service_account import ServiceAccountCredentials
+    from gsheet_client import get_worksheet
+    from gsheet_writer import get_writer
     GSPREAD_AVAILABLE = True
 except ImportError:
     GSPREAD_AVAILABLE = False
@@ -30,16 +35,62 @@ SHEET_INFO = [
     ("gsheet_b4", "https://docs.google.com/spreadsheets/d/1bA9yFiL7Y5Paxe5drC-t8Sc1V0Z7GT9vokBkU8wY6sI/edit?gid=0#gid=0"),   # backup 4
 ]
 
+# True면 백그라운드 큐로 기록 (요청 경로에서 Sheets API 대기 없음)
+ASYNC_LOGGING = True
+
+# Sheets 기록 로컬 선기록 스풀 디렉토리 (전송 확인 전까지 보관, igt_logging_utils와 같은 방식)
+GSHEET_SPOOL_DIR = os.environ.get(
+    "GSHEET_SPOOL_DIR", os.path.join(os.path.dirname(__file__), "spool", "gsheet_events")
+)
+
+_gsheet_spool: Optional[LogSpool] = None
+_gsheet_spool_lock = threading.Lock()
+
 
 def init_sheet(secret_key_name: str, sheet_url: str):
-    """Google Spreadsheet 초기화"""
-    scope = ["https://www.googleapis.com/auth/drive"]
-    creds = ServiceAccountCredentials.from_json_keyfile_dict(
-        st.secrets[secret_key_name], scope
-    )
-    client = gspread.authorize(creds)
-    sheet = client.open_by_url(sheet_url).sheet1
-    return sheet
+    """Google Spreadsheet 초기화 (프로세스 전역 연결 풀 사용)"""
+    return get_worksheet(secret_key_name, sheet_url)
+
+
+def _get_gsheet_spool() -> LogSpool:
+    """프로세스 전역 Sheets 스풀 반환 (최초 호출 시 미전송 기록 복구 후 전송 등록)"""
+    global _gsheet_spool
+    if _gsheet_spool is None:
+        with _gsheet_spool_lock:
+            if _gsheet_spool is None:
+                opened = open_spools(GSHEET_SPOOL_DIR)
+                for recovered in opened:
+                    get_writer().attach_spool(recovered, background=ASYNC_LOGGING)
+                _gsheet_spool = opened[0]
+    return _gsheet_spool
+
+
+def _gsheet_submit(rows: List[List], error_message: str):
+    """
+    SHEET_INFO(메인 → 백업)에 행 기록
+
+    스풀에 먼저 기록하므로 쓰기 큐가 가득 차거나 메인/백업 모두 실패해도 유실되지 않고 재전송됨
+    ASYNC_LOGGING이면 워커만 깨우고 즉시 반환, 아니면 스풀을 동기 전송
+    """
+    _get_gsheet_spool().append(SHEET_INFO, rows)
+
+    if ASYNC_LOGGING:
+        get_writer().wake_spool()
+        return
+
+    error = get_writer().drain_spools()
+    if error is not None:
+        st.error(f"{error_message} (kept in local spool). Error: {error}\n")
+
+
+def recover_gsheet_spool():
+    """
+    이전 프로세스에서 전송하지 못한 Sheets 기록 복구 및 재전송 시작
+
+    스풀 디렉토리가 있을 때만 동작 (모듈 import 시 자동 호출)
+    """
+    if GSPREAD_AVAILABLE and os.path.isdir(GSHEET_SPOOL_DIR):
+        _get_gsheet_spool()
 
 
 def gsheet_log_event(text: str, user_id: str = "", event_type: str = "General"):
@@ -56,17 +107,10 @@ def gsheet_log_event(text: str, user_id: str = "", event_type: str = "General"):
 
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
-    for idx, (secret_key, sheet_url) in enumerate(SHEET_INFO):
-        try:
-            sheet = init_sheet(secret_key, sheet_url)
-            sheet.append_row([timestamp, user_id, event_type, text])
-            break
-        except Exception as e:
-            if idx == len(SHEET_INFO) - 1:
-                if GSPREAD_AVAILABLE:
-                    st.error(f"Failed to log to Google Sheets. Error: {e}\n")
-            else:
-                time.sleep(1)
+    _gsheet_submit(
+        [[timestamp, user_id, event_type, text]],
+        error_message="Failed to log to Google Sheets"
+    )
 
 
 def gsheet_log_batch(rows: List[List]):
@@ -79,17 +123,7 @@ def gsheet_log_batch(rows: List[List]):
     if not GSPREAD_AVAILABLE or not rows:
         return
 
-    for idx, (secret_key, sheet_url) in enumerate(SHEET_INFO):
-        try:
-            sheet = init_sheet(secret_key, sheet_url)
-            sheet.append_rows(rows)
-            break
-        except Exception as e:
-            if idx == len(SHEET_INFO) - 1:
-                if GSPREAD_AVAILABLE:
-                    st.error(f"Failed to batch log to Google Sheets. Error: {e}\n")
-            else:
-                time.sleep(1)
+    _gsheet_submit(rows, error_message="Failed to batch log to Google Sheets")
 
 
 # ============================================================
@@ -99,6 +133,45 @@ def gsheet_log_batch(rows: List[List]):
 # 로컬 로깅 디렉토리
 LOG_DIR = os.path.join(os.path.dirname(__file__), "logs")
 
+# 로컬 로깅 백엔드: "csv" (날짜별 CSV 파일) 또는 "sqlite" (WAL 모드 SQLite, 배치 커밋)
+LOCAL_LOG_BACKEND = os.environ.get("LOCAL_LOG_BACKEND", "csv")
+
+# CSV 파일 핸들 풀 정책 (csv_writer_pool 참고)
+# flush: "row" / "interval" / "exit", fsync: "never" / "flush"
+CSV_FLUSH_POLICY = os.environ.get("CSV_FLUSH_POLICY", "interval")
+CSV_FLUSH_INTERVAL = float(os.environ.get("CSV_FLUSH_INTERVAL", "1.0"))
+CSV_FSYNC_POLICY = os.environ.get("CSV_FSYNC_POLICY", "never")
+
+# CSV 기록 + 세션 인덱스 갱신을 하나로 묶는 잠금
+_csv_lock = threading.Lock()
+_csv_pool = None
+
+# SQLite 백엔드 데이터베이스 파일
+SQLITE_LOG_PATH = os.path.join(LOG_DIR, "logs.sqlite3")
+
+# 기록 유형별 컬럼
+IGT_SESSION_COLUMNS = ["timestamp", "session_id", "participant_id", "event", "details"]
+IGT_TRIAL_COLUMNS = [
+    "timestamp", "session_id", "participant_id",
+    "trial_number", "deck_choice", "reward", "penalty",
+    "net_outcome", "balance"
+]
+FREE_RECALL_SESSION_COLUMNS = [
+    "timestamp", "session_id", "participant_id",
+    "condition", "processing_type", "num_words",
+    "event", "details"
+]
+WORD_PRESENTATION_COLUMNS = [
+    "timestamp", "session_id", "participant_id",
+    "word", "position", "category", "valence", "arousal"
+]
+RECALL_RESPONSE_COLUMNS = [
+    "timestamp", "session_id", "participant_id",
+    "recalled_word", "recall_order", "is_correct",
+    "is_intrusion", "original_position"
+]
+EVENT_COLUMNS = ["timestamp", "session_id", "participant_id", "event_type", "data"]
+
 
 def ensure_log_dir():
     """로그 디렉토리 생성"""
@@ -114,30 +187,80 @@ def get_log_file_path(task_name: str, date: Optional[str] = None) -> str:
     return os.path.join(LOG_DIR, f"{task_name}_{date}.csv")
 
 
+def _get_sqlite_store():
+    """SQLite 로그 저장소 (프로세스 전역)"""
+    from sqlite_log_store import get_store
+    ensure_log_dir()
+    return get_store(SQLITE_LOG_PATH)
+
+
+def _on_csv_open(filename: str, is_new: bool):
+    """CSV 파일을 처음 열 때 세션 인덱스 등록 (기존 파일은 backfill)"""
+    index = get_index(LOG_DIR)
+    if is_new:
+        index.mark_covered(filename)
+    else:
+        index.ensure_covered(filename)
+
+
+def _get_csv_pool():
+    """CSV 파일 핸들 풀 (프로세스 전역)"""
+    global _csv_pool
+    if _csv_pool is None:
+        _csv_pool = create_pool(
+            get_log_file_path,
+            on_open=_on_csv_open,
+            on_flush=lambda: get_index(LOG_DIR).flush(),
+            flush_policy=CSV_FLUSH_POLICY,
+            flush_interval=CSV_FLUSH_INTERVAL,
+            fsync_policy=CSV_FSYNC_POLICY,
+        )
+    return _csv_pool
+
+
+def _write_row(task_name: str, columns: List[str], row: List[Any]):
+    """
+    로컬 로그 한 행 기록
+
+    Args:
+        task_name: 기록 유형 (CSV 파일 접두어 / SQLite 테이블 이름)
+        columns: 컬럼 이름 (새 파일 헤더 / 테이블 생성에 사용)
+        row: 컬럼 순서의 값 목록
+    """
+    if LOCAL_LOG_BACKEND == "sqlite":
+        _get_sqlite_store().write(task_name, columns, row)
+        return
+
+    with _csv_lock:
+        # 장기 유지 버퍼 파일에 기록 (헤더 확인은 파일을 처음 열 때 한 번만)
+        filename, offset = _get_csv_pool().write(task_name, columns, row)
+
+        # 세션 인덱스에 행 위치 기록 (export_session_data에서 바로 이동)
+        if "session_id" in columns:
+            get_index(LOG_DIR).add(row[columns.index("session_id")], filename, offset)
+
+
+def flush_local_logs():
+    """버퍼된 로컬 로그 즉시 저장"""
+    if LOCAL_LOG_BACKEND == "sqlite":
+        _get_sqlite_store().flush()
+    elif _csv_pool is not None:
+        _csv_pool.flush()
+
+
 # ============================================================
 # Iowa Gambling Task 로깅 함수
 # ============================================================
 
 def log_session_start(session_id: str, participant_id: str):
     """IGT 세션 시작 로깅"""
-    log_file = get_log_file_path("igt_sessions")
-
-    # 파일이 없으면 헤더 추가
-    write_header = not os.path.exists(log_file)
-
-    with open(log_file, 'a', newline='', encoding='utf-8') as f:
-        writer = csv.writer(f)
-        if write_header:
-            writer.writerow([
-                "timestamp", "session_id", "participant_id", "event", "details"
-            ])
-        writer.writerow([
-            datetime.now().isoformat(),
-            session_id,
-            participant_id,
-            "session_start",
-            ""
-        ])
+    _write_row("igt_sessions", IGT_SESSION_COLUMNS, [
+        datetime.now().isoformat(),
+        session_id,
+        participant_id,
+        "session_start",
+        ""
+    ])
 
 
 def log_trial(
@@ -151,29 +274,17 @@ def log_trial(
     balance: int
 ):
     """IGT 시행 로깅"""
-    log_file = get_log_file_path("igt_trials")
-
-    write_header = not os.path.exists(log_file)
-
-    with open(log_file, 'a', newline='', encoding='utf-8') as f:
-        writer = csv.writer(f)
-        if write_header:
-            writer.writerow([
-                "timestamp", "session_id", "participant_id",
-                "trial_number", "deck_choice", "reward", "penalty",
-                "net_outcome", "balance"
-            ])
-        writer.writerow([
-            datetime.now().isoformat(),
-            session_id,
-            participant_id,
-            trial_number,
-            deck_choice,
-            reward,
-            penalty,
-            net_outcome,
-            balance
-        ])
+    _write_row("igt_trials", IGT_TRIAL_COLUMNS, [
+        datetime.now().isoformat(),
+        session_id,
+        participant_id,
+        trial_number,
+        deck_choice,
+        reward,
+        penalty,
+        net_outcome,
+        balance
+    ])
 
 
 def log_session_end(
@@ -184,21 +295,17 @@ def log_session_end(
     deck_counts: Dict[str, int]
 ):
     """IGT 세션 종료 로깅"""
-    log_file = get_log_file_path("igt_sessions")
-
-    with open(log_file, 'a', newline='', encoding='utf-8') as f:
-        writer = csv.writer(f)
-        writer.writerow([
-            datetime.now().isoformat(),
-            session_id,
-            participant_id,
-            "session_end",
-            json.dumps({
-                "final_balance": final_balance,
-                "net_score": net_score,
-                "deck_counts": deck_counts
-            }, ensure_ascii=False)
-        ])
+    _write_row("igt_sessions", IGT_SESSION_COLUMNS, [
+        datetime.now().isoformat(),
+        session_id,
+        participant_id,
+        "session_end",
+        json.dumps({
+            "final_balance": final_balance,
+            "net_score": net_score,
+            "deck_counts": deck_counts
+        }, ensure_ascii=False)
+    ])
 
 
 # ============================================================
@@ -213,28 +320,16 @@ def log_free_recall_session_start(
     num_words: int
 ):
     """Free Recall 세션 시작 로깅"""
-    log_file = get_log_file_path("free_recall_sessions")
-
-    write_header = not os.path.exists(log_file)
-
-    with open(log_file, 'a', newline='', encoding='utf-8') as f:
-        writer = csv.writer(f)
-        if write_header:
-            writer.writerow([
-                "timestamp", "session_id", "participant_id",
-                "condition", "processing_type", "num_words",
-                "event", "details"
-            ])
-        writer.writerow([
-            datetime.now().isoformat(),
-            session_id,
-            participant_id,
-            condition,
-            processing_type,
-            num_words,
-            "session_start",
-            ""
-        ])
+    _write_row("free_recall_sessions", FREE_RECALL_SESSION_COLUMNS, [
+        datetime.now().isoformat(),
+        session_id,
+        participant_id,
+        condition,
+        processing_type,
+        num_words,
+        "session_start",
+        ""
+    ])
 
 
 def log_word_presentation(
@@ -247,27 +342,16 @@ def log_word_presentation(
     arousal: float
 ):
     """단어 제시 로깅"""
-    log_file = get_log_file_path("free_recall_presentations")
-
-    write_header = not os.path.exists(log_file)
-
-    with open(log_file, 'a', newline='', encoding='utf-8') as f:
-        writer = csv.writer(f)
-        if write_header:
-            writer.writerow([
-                "timestamp", "session_id", "participant_id",
-                "word", "position", "category", "valence", "arousal"
-            ])
-        writer.writerow([
-            datetime.now().isoformat(),
-            session_id,
-            participant_id,
-            word,
-            position,
-            category,
-            valence,
-            arousal
-        ])
+    _write_row("free_recall_presentations", WORD_PRESENTATION_COLUMNS, [
+        datetime.now().isoformat(),
+        session_id,
+        participant_id,
+        word,
+        position,
+        category,
+        valence,
+        arousal
+    ])
 
 
 def log_recall_response(
@@ -280,28 +364,16 @@ def log_recall_response(
     original_position: Optional[int]
 ):
     """회상 응답 로깅"""
-    log_file = get_log_file_path("free_recall_responses")
-
-    write_header = not os.path.exists(log_file)
-
-    with open(log_file, 'a', newline='', encoding='utf-8') as f:
-        writer = csv.writer(f)
-        if write_header:
-            writer.writerow([
-                "timestamp", "session_id", "participant_id",
-                "recalled_word", "recall_order", "is_correct",
-                "is_intrusion", "original_position"
-            ])
-        writer.writerow([
-            datetime.now().isoformat(),
-            session_id,
-            participant_id,
-            recalled_word,
-            recall_order,
-            is_correct,
-            is_intrusion,
-            original_position if original_position else ""
-        ])
+    _write_row("free_recall_responses", RECALL_RESPONSE_COLUMNS, [
+        datetime.now().isoformat(),
+        session_id,
+        participant_id,
+        recalled_word,
+        recall_order,
+        is_correct,
+        is_intrusion,
+        original_position if original_position else ""
+    ])
 
 
 def log_free_recall_session_end(
@@ -316,28 +388,24 @@ def log_free_recall_session_end(
     distractor_accuracy: float
 ):
     """Free Recall 세션 종료 로깅"""
-    log_file = get_log_file_path("free_recall_sessions")
-
-    with open(log_file, 'a', newline='', encoding='utf-8') as f:
-        writer = csv.writer(f)
-        writer.writerow([
-            datetime.now().isoformat(),
-            session_id,
-            participant_id,
-            "",  # condition
-            "",  # processing_type
-            "",  # num_words
-            "session_end",
-            json.dumps({
-                "total_presented": total_presented,
-                "correct_recalls": correct_recalls,
-                "recall_rate": recall_rate,
-                "intrusion_errors": intrusion_errors,
-                "category_recall": category_recall,
-                "serial_position": serial_position,
-                "distractor_accuracy": distractor_accuracy
-            }, ensure_ascii=False)
-        ])
+    _write_row("free_recall_sessions", FREE_RECALL_SESSION_COLUMNS, [
+        datetime.now().isoformat(),
+        session_id,
+        participant_id,
+        "",  # condition
+        "",  # processing_type
+        "",  # num_words
+        "session_end",
+        json.dumps({
+            "total_presented": total_presented,
+            "correct_recalls": correct_recalls,
+            "recall_rate": recall_rate,
+            "intrusion_errors": intrusion_errors,
+            "category_recall": category_recall,
+            "serial_position": serial_position,
+            "distractor_accuracy": distractor_accuracy
+        }, ensure_ascii=False)
+    ])
 
 
 # ============================================================
@@ -352,39 +420,42 @@ def log_event(
     data: Dict[str, Any]
 ):
     """범용 이벤트 로깅"""
-    log_file = get_log_file_path(f"{task_name}_events")
-
-    write_header = not os.path.exists(log_file)
-
-    with open(log_file, 'a', newline='', encoding='utf-8') as f:
-        writer = csv.writer(f)
-        if write_header:
-            writer.writerow([
-                "timestamp", "session_id", "participant_id",
-                "event_type", "data"
-            ])
-        writer.writerow([
-            datetime.now().isoformat(),
-            session_id,
-            participant_id,
-            event_type,
-            json.dumps(data, ensure_ascii=False)
-        ])
+    _write_row(f"{task_name}_events", EVENT_COLUMNS, [
+        datetime.now().isoformat(),
+        session_id,
+        participant_id,
+        event_type,
+        json.dumps(data, ensure_ascii=False)
+    ])
 
 
 def export_session_data(task_name: str, session_id: str) -> Dict[str, List]:
-    """특정 세션의 모든 데이터 내보내기"""
+    """
+    특정 세션의 모든 데이터 내보내기
+
+    CSV 백엔드는 session_index의 (파일, 오프셋) 인덱스를 사용하여
+    전체 로그를 읽지 않고 해당 세션의 행만 읽음
+
+    Returns:
+        CSV 백엔드: 파일 이름 → 행 목록, SQLite 백엔드: 테이블 이름 → 행 목록
+    """
     data = {}
 
-    # 관련 로그 파일들 찾기
-    ensure_log_dir()
-    for filename in os.listdir(LOG_DIR):
-        if filename.startswith(task_name) and filename.endswith('.csv'):
-            filepath = os.path.join(LOG_DIR, filename)
-            with open(filepath, 'r', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                rows = [row for row in reader if row.get('session_id') == session_id]
+    if LOCAL_LOG_BACKEND == "sqlite":
+        from sqlite_log_store import table_name
+        store = _get_sqlite_store()
+        for table in store.tables():
+            if table.startswith(table_name(task_name)):
+                rows = store.query_session(table, session_id)
                 if rows:
-                    data[filename] = rows
+                    data[table] = rows
+        return data
+
+    # 세션 인덱스로 해당 행만 읽기 (인덱스에 없는 기존 파일은 최초 1회 backfill)
+    ensure_log_dir()
+    with _csv_lock:
+        flush_local_logs()
+        return get_index(LOG_DIR).lookup(session_id, prefix=task_name)
+
 
-    return data
+recover_gsheet_spool()
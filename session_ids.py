@@ -0,0 +1,106 @@
+"""
+Session IDs
+시간순 정렬 가능한 세션 ID 생성 (ULID 형식)
+
+ID = 밀리초 시각 48비트 + 임의값 80비트 → Crockford base32 26자
+- 같은 밀리초 안에서는 직전 임의값 + 1 (프로세스 내 단조 증가, 충돌 없음)
+- 시계가 뒤로 가도 직전 시각 유지 → 프로세스 안에서 생성된 ID는 항상 증가
+- 문자열 순서 = 생성 순서 → 로그 / 인덱스에서 ID 범위로 기간 조회 가능 (id_range)
+
+free recall은 "FR_" 접두어 유지 (접두어가 같은 ID끼리 정렬 순서 보존)
+"""
+
+import secrets
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Optional, Tuple
+
+# Crockford base32 (I, L, O, U 제외 → 혼동 문자 없음, ASCII 순서 = 값 순서)
+_ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+_DECODE = {char: value for value, char in enumerate(_ALPHABET)}
+
+_TIME_BITS = 48
+_RANDOM_BITS = 80
+_ID_LENGTH = 26
+_RANDOM_MAX = (1 << _RANDOM_BITS) - 1
+
+# 직전 ID 상태 (같은 밀리초 / 시계 역행 시 단조 증가용)
+_lock = threading.Lock()
+_last_ms = -1
+_last_random = 0
+
+
+def _encode(value: int) -> str:
+    chars = []
+    for _ in range(_ID_LENGTH):
+        value, digit = divmod(value, 32)
+        chars.append(_ALPHABET[digit])
+    return "".join(reversed(chars))
+
+
+def new_session_id(prefix: str = "") -> str:
+    """
+    새 세션 ID 생성 (스레드 안전, 프로세스 내 단조 증가)
+
+    Args:
+        prefix: ID 앞에 붙일 접두어 (예: "FR_")
+
+    Returns:
+        prefix + 26자 ID
+    """
+    global _last_ms, _last_random
+    now_ms = time.time_ns() // 1_000_000
+    with _lock:
+        if now_ms > _last_ms:
+            _last_ms = now_ms
+            _last_random = secrets.randbits(_RANDOM_BITS)
+        elif _last_random < _RANDOM_MAX:
+            _last_random += 1
+        else:
+            # 같은 밀리초에서 임의값 소진 → 다음 밀리초로 이월
+            _last_ms += 1
+            _last_random = secrets.randbits(_RANDOM_BITS)
+        value = (_last_ms << _RANDOM_BITS) | _last_random
+    return prefix + _encode(value)
+
+
+def session_id_time(session_id: str, prefix: str = "") -> datetime:
+    """
+    세션 ID의 생성 시각 (UTC)
+
+    Raises:
+        ValueError: 형식이 맞지 않는 ID
+    """
+    body = session_id[len(prefix):] if prefix and session_id.startswith(prefix) else session_id
+    if len(body) != _ID_LENGTH:
+        raise ValueError(f"Invalid session ID: {session_id}")
+    value = 0
+    for char in body.upper():
+        if char not in _DECODE:
+            raise ValueError(f"Invalid session ID: {session_id}")
+        value = value * 32 + _DECODE[char]
+    return datetime.fromtimestamp((value >> _RANDOM_BITS) / 1000, tz=timezone.utc)
+
+
+def id_range(start: datetime, end: Optional[datetime] = None, prefix: str = "") -> Tuple[str, str]:
+    """
+    기간 [start, end)에 생성된 ID의 범위
+
+    start_id <= session_id < end_id 비교만으로 기간 조회 (ID 인덱스 범위 탐색)
+
+    Args:
+        start: 시작 시각 (naive면 로컬 시각)
+        end: 끝 시각 (없으면 현재)
+        prefix: ID 접두어
+
+    Returns:
+        (start_id, end_id)
+    """
+    end = end or datetime.now(timezone.utc)
+    start_ms = int(start.timestamp() * 1000)
+    end_ms = int(end.timestamp() * 1000)
+    return (
+        prefix + _encode(start_ms << _RANDOM_BITS),
+        prefix + _encode(end_ms << _RANDOM_BITS),
+    )
@@ -0,0 +1,285 @@
+"""
+Session Index for CSV Logs
+CSV 로그 세션 인덱스 (session_id → (파일, 바이트 오프셋))
+
+행을 추가할 때마다 인덱스에 위치를 함께 기록하여, 세션 내보내기 시
+전체 로그 디렉토리를 읽지 않고 해당 행으로 바로 이동(seek)
+
+조회 시 읽은 행의 session_id를 확인하여, 비정상 종료 등으로 인덱스와 CSV가
+어긋난 파일은 인덱스를 다시 생성
+"""
+
+import atexit
+import csv
+import io
+import os
+import threading
+from typing import Dict, Iterator, List, Optional, Tuple
+
+INDEX_FILE = "session_index.tsv"
+
+# 인덱스 파일 레코드 형식 (탭 구분, 한 줄당 하나)
+#   R <session_id> <filename> <offset>  : 행 위치
+#   F <filename>                        : 해당 파일의 모든 행이 인덱스에 포함됨
+#   X <filename>                        : 해당 파일의 이전 레코드 폐기 (인덱스 재생성)
+_ROW = "R"
+_FILE = "F"
+_RESET = "X"
+
+
+class SessionIndex:
+    """
+    append-only 세션 인덱스 (스레드 안전)
+
+    Args:
+        log_dir: CSV 로그 디렉토리 (인덱스 파일도 이 디렉토리에 저장)
+    """
+
+    def __init__(self, log_dir: str):
+        self.log_dir = log_dir
+        self.path = os.path.join(log_dir, INDEX_FILE)
+
+        self._lock = threading.RLock()
+        self._entries: Dict[str, List[Tuple[str, int]]] = {}
+        self._covered: set = set()
+        self._headers: Dict[str, List[str]] = {}
+        self._loaded_bytes = 0
+        self._file = None  # 추가 기록용 버퍼 파일 (flush()로 디스크에 기록)
+
+    # ------------------------------------------------------------
+    # 인덱스 파일 읽기 / 쓰기
+    # ------------------------------------------------------------
+
+    def _refresh(self):
+        """인덱스 파일에서 마지막으로 읽은 이후 추가된 레코드 반영"""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "rb") as f:
+            f.seek(self._loaded_bytes)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    # 기록 중인 마지막 줄은 다음에 다시 읽음
+                    break
+                self._loaded_bytes += len(line)
+                fields = line.decode("utf-8").rstrip("\n").split("\t")
+                if fields[0] == _ROW and len(fields) == 4:
+                    self._entries.setdefault(fields[1], []).append((fields[2], int(fields[3])))
+                elif fields[0] == _FILE and len(fields) == 2:
+                    self._covered.add(fields[1])
+                elif fields[0] == _RESET and len(fields) == 2:
+                    self._discard(fields[1])
+
+    def _discard(self, filename: str):
+        """파일의 행 위치 / 등록 정보 제거"""
+        for session_id in list(self._entries):
+            kept = [entry for entry in self._entries[session_id] if entry[0] != filename]
+            if kept:
+                self._entries[session_id] = kept
+            else:
+                del self._entries[session_id]
+        self._covered.discard(filename)
+        self._headers.pop(filename, None)
+
+    def _append(self, lines: List[str]):
+        data = "".join(lines).encode("utf-8")
+        if self._file is None:
+            self._file = open(self.path, "ab")
+        self._file.write(data)
+        self._loaded_bytes += len(data)
+
+    def flush(self):
+        """버퍼된 인덱스 레코드를 디스크에 기록"""
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    # ------------------------------------------------------------
+    # 기록 시 호출
+    # ------------------------------------------------------------
+
+    def ensure_covered(self, filename: str):
+        """
+        인덱스에 없는 기존 CSV 파일이면 한 번 전체를 읽어 인덱스 생성 (backfill)
+        """
+        with self._lock:
+            self._refresh()
+            if filename in self._covered:
+                return
+            self._append(self._index_file(filename))
+
+    def _index_file(self, filename: str) -> List[str]:
+        """CSV 파일 전체를 읽어 행 위치 등록 → 인덱스 파일에 추가할 레코드"""
+        lines = []
+        filepath = os.path.join(self.log_dir, filename)
+        if os.path.exists(filepath):
+            for session_id, offset in self._scan(filepath):
+                lines.append(f"{_ROW}\t{session_id}\t{filename}\t{offset}\n")
+                self._entries.setdefault(session_id, []).append((filename, offset))
+        lines.append(f"{_FILE}\t{filename}\n")
+        self._covered.add(filename)
+        return lines
+
+    def rebuild(self, filename: str):
+        """파일의 인덱스를 버리고 CSV를 다시 읽어 재생성"""
+        with self._lock:
+            self._refresh()
+            self._discard(filename)
+            self._append([f"{_RESET}\t{filename}\n"] + self._index_file(filename))
+
+    def mark_covered(self, filename: str):
+        """새로 만든 CSV 파일 등록 (이후 모든 행이 add()로 인덱스됨)"""
+        with self._lock:
+            self._refresh()
+            if filename not in self._covered:
+                self._covered.add(filename)
+                self._append([f"{_FILE}\t{filename}\n"])
+
+    def add(self, session_id: str, filename: str, offset: int):
+        """행 위치 추가"""
+        session_id = str(session_id).replace("\t", " ").replace("\n", " ")
+        with self._lock:
+            self._append([f"{_ROW}\t{session_id}\t{filename}\t{offset}\n"])
+            self._entries.setdefault(session_id, []).append((filename, offset))
+
+    # ------------------------------------------------------------
+    # 조회
+    # ------------------------------------------------------------
+
+    def lookup(self, session_id: str, prefix: str = "") -> Dict[str, List[Dict[str, str]]]:
+        """
+        세션의 행을 파일별로 반환 (csv.DictReader와 같은 문자열 값 딕셔너리)
+
+        인덱스에 없는 CSV 파일은 먼저 backfill한 뒤 조회
+        읽은 행의 session_id가 다르거나 오프셋이 파일 범위를 벗어나면
+        (인덱스와 CSV 불일치) 해당 파일의 인덱스를 재생성하고 다시 읽음
+
+        Args:
+            session_id: 세션 ID
+            prefix: 파일 이름 접두어 (task_name)
+        """
+        with self._lock:
+            for filename in os.listdir(self.log_dir):
+                if filename.startswith(prefix) and filename.endswith(".csv"):
+                    self.ensure_covered(filename)
+            self._refresh()
+            entries = list(self._entries.get(session_id, []))
+
+        by_file: Dict[str, List[int]] = {}
+        for filename, offset in entries:
+            if filename.startswith(prefix):
+                by_file.setdefault(filename, []).append(offset)
+
+        data = {}
+        for filename, offsets in by_file.items():
+            filepath = os.path.join(self.log_dir, filename)
+            if not os.path.exists(filepath):
+                continue
+            rows, stale = self._read_rows(filepath, filename, session_id, offsets)
+            if stale:
+                self.rebuild(filename)
+                with self._lock:
+                    offsets = [
+                        offset for name, offset in self._entries.get(session_id, [])
+                        if name == filename
+                    ]
+                rows, _ = self._read_rows(filepath, filename, session_id, offsets)
+            if rows:
+                data[filename] = rows
+        return data
+
+    def _read_rows(
+        self,
+        filepath: str,
+        filename: str,
+        session_id: str,
+        offsets: List[int]
+    ) -> Tuple[List[Dict[str, str]], bool]:
+        """
+        오프셋의 행 읽기 (session_id가 일치하는 행만)
+
+        Returns:
+            (행 목록, 일치하지 않는 오프셋이 있었는지)
+        """
+        header = self._header(filepath, filename)
+        column = header.index("session_id") if "session_id" in header else None
+        rows = []
+        stale = False
+        with open(filepath, "rb") as f:
+            for offset in sorted(offsets):
+                f.seek(offset)
+                values = self._read_record(f)
+                if values is None or (
+                    column is not None and (column >= len(values) or values[column] != session_id)
+                ):
+                    stale = True
+                    continue
+                rows.append(dict(zip(header, values)))
+        return rows, stale
+
+    def _header(self, filepath: str, filename: str) -> List[str]:
+        header = self._headers.get(filename)
+        if header is None:
+            with open(filepath, "rb") as f:
+                header = self._headers[filename] = self._read_record(f) or []
+        return header
+
+    @staticmethod
+    def _read_record(f) -> Optional[List[str]]:
+        """현재 위치에서 CSV 레코드 하나 읽기 (따옴표 안 줄바꿈 포함)"""
+        text = io.TextIOWrapper(f, encoding="utf-8", newline="")
+        try:
+            return next(csv.reader(text), None)
+        finally:
+            text.detach()
+
+    @staticmethod
+    def _scan(filepath: str) -> Iterator[Tuple[str, int]]:
+        """CSV 파일 전체를 읽어 (session_id, 레코드 시작 오프셋) 생성"""
+        offsets: List[int] = []
+
+        def lines(f):
+            position = 0
+            for raw in f:
+                offsets.append(position)
+                position += len(raw)
+                yield raw.decode("utf-8")
+
+        with open(filepath, "rb") as f:
+            reader = csv.reader(lines(f))
+            header = next(reader, None)
+            if not header or "session_id" not in header:
+                return
+            column = header.index("session_id")
+            while True:
+                start = len(offsets)
+                row = next(reader, None)
+                if row is None:
+                    break
+                if column < len(row):
+                    yield row[column], offsets[start]
+
+
+_indexes: Dict[str, SessionIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_index(log_dir: str) -> SessionIndex:
+    """로그 디렉토리별 프로세스 전역 인덱스 반환"""
+    with _indexes_lock:
+        index = _indexes.get(log_dir)
+        if index is None:
+            index = _indexes[log_dir] = SessionIndex(log_dir)
+        return index
+
+
+@atexit.register
+def _close_on_exit():
+    """프로세스 종료 시 인덱스 파일 닫기"""
+    for index in list(_indexes.values()):
+        index.close()
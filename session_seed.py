@@ -0,0 +1,56 @@
+"""
+Session Seeds
+참가자(세션)별 독립 난수 생성기
+
+전역 random 모듈은 같은 프로세스의 모든 Streamlit 세션이 공유하는 가변 상태이므로
+마스터 시드 + 세션 ID (+ 용도 이름)에서 세션별 시드를 파생하여 별도 random.Random 사용
+- 잠금 없이 세션마다 독립된 난수 흐름
+- 로그에 기록된 시드(또는 세션 ID + 마스터 시드)로 단어 순서 / 스케줄 무선화를 그대로 재생성 가능
+"""
+
+import hashlib
+import os
+import random
+from typing import Optional
+
+# 마스터 시드 환경 변수 (기본 0, derive_seed 호출 시점에 읽음)
+MASTER_SEED_ENV = "EXPERIMENT_MASTER_SEED"
+
+
+def get_master_seed() -> int:
+    """
+    현재 마스터 시드 (환경 변수 EXPERIMENT_MASTER_SEED, 없으면 0)
+
+    세션 시작 로그에 함께 기록해야 세션 ID에서 시드를 다시 파생할 수 있음
+
+    Raises:
+        ValueError: 환경 변수가 정수가 아님
+    """
+    value = os.environ.get(MASTER_SEED_ENV, "0")
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"{MASTER_SEED_ENV} must be an integer, got {value!r}") from None
+
+
+def derive_seed(session_id: str, stream: str = "", master_seed: Optional[int] = None) -> int:
+    """
+    세션별 64비트 시드 파생
+
+    Args:
+        session_id: 세션 ID
+        stream: 용도 이름 (같은 세션에서 독립된 난수 흐름이 여러 개 필요할 때)
+        master_seed: 마스터 시드 (없으면 get_master_seed())
+
+    Returns:
+        0 이상 2^64 미만 정수
+    """
+    if master_seed is None:
+        master_seed = get_master_seed()
+    key = f"{master_seed}\x00{session_id}\x00{stream}".encode("utf-8")
+    return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), "big")
+
+
+def session_rng(session_id: str, stream: str = "", master_seed: Optional[int] = None) -> random.Random:
+    """세션별 독립 random.Random (derive_seed 시드 사용)"""
+    return random.Random(derive_seed(session_id, stream, master_seed))
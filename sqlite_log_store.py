@@ -0,0 +1,318 @@
+"""
+SQLite Local Log Store
+로컬 로그 SQLite 저장소 (WAL 모드, 배치 트랜잭션)
+
+logging_utils의 로컬 로깅 백엔드로 사용
+- 기록 유형(task_name)별 테이블 하나
+- 행은 메모리에 모았다가 batch_size 또는 flush_interval마다 한 트랜잭션으로 INSERT
+- session_id / timestamp 인덱스로 세션 조회
+- 커밋에 실패한 행은 dead-letter 테이블(실패 시 파일)로 옮기고 버퍼에서 제거
+  (잘못된 행 하나가 이후 모든 커밋을 막거나 요청 경로로 예외가 전달되지 않도록)
+"""
+
+import atexit
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# 한 트랜잭션에 모을 최대 행 수
+BATCH_SIZE = 200
+
+# 버퍼에 남은 행을 커밋하기까지 최대 대기 시간 (초)
+FLUSH_INTERVAL = 1.0
+
+# 커밋에 실패한 행을 보관하는 테이블 (기록 유형 테이블 목록에서 제외)
+DEAD_LETTER_TABLE = "_dead_letter"
+
+# dead-letter 테이블에도 기록할 수 없을 때 사용하는 파일 (데이터베이스 경로 + 접미사)
+DEAD_LETTER_FILE_SUFFIX = ".dead_letter.jsonl"
+
+_IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+_INVALID_CHARS = re.compile(r"[^A-Za-z0-9_]")
+
+
+def _quote(identifier: str) -> str:
+    """테이블/컬럼 이름 검증 후 따옴표 처리"""
+    if not _IDENTIFIER.match(identifier):
+        raise ValueError(f"Invalid SQLite identifier: {identifier}")
+    return f'"{identifier}"'
+
+
+def table_name(name: str) -> str:
+    """
+    기록 유형 이름 → 테이블 이름 (식별자로 쓸 수 없는 문자는 '_'로 변환)
+
+    예: "free-recall_events" → "free_recall_events", "2afc" → "_2afc"
+    """
+    name = _INVALID_CHARS.sub("_", name)
+    if not name or name[0].isdigit():
+        name = "_" + name
+    return name
+
+
+class SQLiteLogStore:
+    """
+    WAL 모드 SQLite 로그 저장소 (스레드 안전)
+
+    Args:
+        path: 데이터베이스 파일 경로
+        batch_size: 커밋 전 최대 버퍼 행 수
+        flush_interval: 버퍼 최대 보관 시간 (초)
+    """
+
+    def __init__(
+        self,
+        path: str,
+        batch_size: int = BATCH_SIZE,
+        flush_interval: float = FLUSH_INTERVAL
+    ):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+
+        # table -> (컬럼 목록, INSERT 문)
+        self._tables: Dict[str, tuple] = {}
+        # table -> 버퍼된 행
+        self._buffer: Dict[str, List[List]] = {}
+        self._buffered = 0
+        self._timer: Optional[threading.Timer] = None
+
+        self._load_tables()
+
+    def _load_tables(self):
+        """기존 테이블 스키마 로드"""
+        cursor = self._conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'"
+        )
+        for (table,) in cursor.fetchall():
+            if table == DEAD_LETTER_TABLE:
+                continue
+            columns = [
+                row[1] for row in self._conn.execute(f"PRAGMA table_info({_quote(table)})")
+                if row[1] != "id"
+            ]
+            self._tables[table] = (columns, self._insert_sql(table, columns))
+
+    @staticmethod
+    def _insert_sql(table: str, columns: List[str]) -> str:
+        return (
+            f"INSERT INTO {_quote(table)} ({', '.join(_quote(c) for c in columns)}) "
+            f"VALUES ({', '.join('?' for _ in columns)})"
+        )
+
+    def _ensure_table(self, table: str, columns: List[str]):
+        """테이블이 없으면 생성 (session_id, timestamp 인덱스 포함)"""
+        if table in self._tables:
+            return
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {_quote(table)} "
+            f"(id INTEGER PRIMARY KEY, {', '.join(_quote(c) for c in columns)})"
+        )
+        for column in ("session_id", "timestamp"):
+            if column in columns:
+                self._conn.execute(
+                    f"CREATE INDEX IF NOT EXISTS {_quote(f'idx_{table}_{column}')} "
+                    f"ON {_quote(table)} ({_quote(column)})"
+                )
+        self._tables[table] = (list(columns), self._insert_sql(table, columns))
+
+    def write(self, table: str, columns: List[str], row: List[Any]):
+        """
+        행 기록 (버퍼에 추가 후 조건 충족 시 커밋)
+
+        Args:
+            table: 테이블 이름 (기록 유형, table_name으로 변환)
+            columns: 컬럼 이름 목록 (첫 기록 시 테이블 생성에 사용)
+            row: 컬럼 순서의 값 목록
+        """
+        table = table_name(table)
+        with self._lock:
+            self._ensure_table(table, columns)
+            self._buffer.setdefault(table, []).append(row)
+            self._buffered += 1
+
+            if self._buffered >= self.batch_size:
+                self.flush()
+            elif self._timer is None:
+                self._timer = threading.Timer(self.flush_interval, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self):
+        """
+        버퍼된 행을 한 트랜잭션으로 커밋
+
+        트랜잭션이 실패하면 행 단위로 다시 기록하여 실패한 행만 dead-letter로 옮김
+        (버퍼는 항상 비워지며 예외는 호출자에게 전달되지 않음)
+        """
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._buffered:
+                return
+
+            buffer = self._buffer
+            self._buffer = {}
+            self._buffered = 0
+            try:
+                self._conn.execute("BEGIN")
+                for table, rows in buffer.items():
+                    if rows:
+                        self._conn.executemany(self._tables[table][1], rows)
+                self._conn.execute("COMMIT")
+            except Exception as e:
+                self._rollback()
+                logger.warning("SQLite batch commit failed, retrying row by row. Error: %s", e)
+                self._insert_rows_individually(buffer)
+
+    def _rollback(self):
+        try:
+            self._conn.execute("ROLLBACK")
+        except sqlite3.Error:
+            pass  # 오류로 이미 롤백된 트랜잭션
+
+    def _insert_rows_individually(self, buffer: Dict[str, List[List]]):
+        """행마다 따로 커밋하고 실패한 행은 dead-letter로 이동"""
+        failed = []
+        for table, rows in buffer.items():
+            for row in rows:
+                try:
+                    self._conn.execute(self._tables[table][1], row)
+                except Exception as e:
+                    failed.append((table, row, repr(e)))
+        if failed:
+            logger.error("Moved %d SQLite log rows to dead letter. Error: %s", len(failed), failed[-1][2])
+            self._dead_letter(failed)
+
+    def _dead_letter(self, failed: List[tuple]):
+        """
+        실패한 행 보관 (dead-letter 테이블, 테이블에도 기록할 수 없으면 JSON lines 파일)
+
+        Args:
+            failed: (테이블, 행, 오류) 목록
+        """
+        failed_at = time.strftime("%Y-%m-%dT%H:%M:%S")
+        records = [
+            (failed_at, table, json.dumps(row, ensure_ascii=False, default=str), error)
+            for table, row, error in failed
+        ]
+        try:
+            self._conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {_quote(DEAD_LETTER_TABLE)} "
+                f"(id INTEGER PRIMARY KEY, failed_at, table_name, row, error)"
+            )
+            self._conn.execute("BEGIN")
+            self._conn.executemany(
+                f"INSERT INTO {_quote(DEAD_LETTER_TABLE)} (failed_at, table_name, row, error) "
+                f"VALUES (?, ?, ?, ?)",
+                records
+            )
+            self._conn.execute("COMMIT")
+        except Exception as e:
+            self._rollback()
+            logger.error("SQLite dead-letter table unavailable, writing to file. Error: %s", e)
+            try:
+                with open(self.path + DEAD_LETTER_FILE_SUFFIX, "a", encoding="utf-8") as f:
+                    for failed_at, table, row, error in records:
+                        f.write(json.dumps({
+                            "failed_at": failed_at, "table_name": table, "row": row, "error": error
+                        }, ensure_ascii=False) + "\n")
+            except OSError as file_error:
+                logger.error("Dropped %d SQLite log rows. Error: %s", len(records), file_error)
+
+    def dead_letters(self) -> List[Dict[str, Any]]:
+        """dead-letter 테이블의 행 (기록 순서, row는 JSON 문자열)"""
+        with self._lock:
+            self.flush()
+            try:
+                cursor = self._conn.execute(
+                    f"SELECT failed_at, table_name, row, error FROM {_quote(DEAD_LETTER_TABLE)} ORDER BY id"
+                )
+            except sqlite3.OperationalError:
+                return []  # 실패한 행이 없어 테이블이 없음
+            columns = ["failed_at", "table_name", "row", "error"]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def tables(self) -> List[str]:
+        """테이블 이름 목록"""
+        with self._lock:
+            return list(self._tables)
+
+    def query_session(self, table: str, session_id: str) -> List[Dict[str, Any]]:
+        """
+        세션 ID로 행 조회 (session_id 인덱스 사용)
+
+        Returns:
+            컬럼 이름 → 값 딕셔너리 목록 (기록 순서)
+        """
+        table = table_name(table)
+        with self._lock:
+            self.flush()
+            columns = self._tables[table][0]
+            cursor = self._conn.execute(
+                f"SELECT {', '.join(_quote(c) for c in columns)} FROM {_quote(table)} "
+                f"WHERE session_id = ? ORDER BY id",
+                (session_id,)
+            )
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def query_session_range(self, table: str, start_id: str, end_id: str) -> List[Dict[str, Any]]:
+        """
+        세션 ID 범위로 행 조회 (start_id <= session_id < end_id, session_id 인덱스 범위 탐색)
+
+        세션 ID는 생성 시각 순으로 정렬되므로 session_ids.id_range로 기간 조회 가능
+
+        Returns:
+            컬럼 이름 → 값 딕셔너리 목록 (세션 ID 순, 세션 안에서는 기록 순서)
+        """
+        table = table_name(table)
+        with self._lock:
+            self.flush()
+            columns = self._tables[table][0]
+            cursor = self._conn.execute(
+                f"SELECT {', '.join(_quote(c) for c in columns)} FROM {_quote(table)} "
+                f"WHERE session_id >= ? AND session_id < ? ORDER BY session_id, id",
+                (start_id, end_id)
+            )
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def close(self):
+        """남은 행 커밋 후 연결 종료"""
+        with self._lock:
+            self.flush()
+            self._conn.close()
+
+
+_stores: Dict[str, SQLiteLogStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_store(path: str) -> SQLiteLogStore:
+    """경로별 프로세스 전역 저장소 반환"""
+    with _stores_lock:
+        store = _stores.get(path)
+        if store is None:
+            store = _stores[path] = SQLiteLogStore(path)
+        return store
+
+
+@atexit.register
+def _close_on_exit():
+    """프로세스 종료 시 남은 행 커밋"""
+    for store in list(_stores.values()):
+        try:
+            store.close()
+        except sqlite3.Error:
+            pass
@@ -0,0 +1,68 @@
+import os
+import sys
+import time
+
+import pytest
+
+# 저장소 루트의 모듈(flat layout)을 테스트에서 import
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _reset_sheets():
+    import fake_gsheet
+    import gsheet_client
+
+    fake_gsheet.reset()
+    gsheet_client.clear_pool()
+    gsheet_client._breakers.clear()
+    gsheet_client._limiters.clear()
+    with gsheet_client._hedge_cond:
+        gsheet_client._reconcile_tasks.clear()
+    with gsheet_client._hedge_lock:
+        gsheet_client._acked_keys.clear()
+
+
+@pytest.fixture
+def fake_backend(monkeypatch):
+    """지연 / 할당량 없는 대체 Sheets 서버 + 빠른 재시도 설정"""
+    import fake_gsheet
+    import gsheet_client
+
+    monkeypatch.setattr(gsheet_client, "GSHEET_BACKEND", "fake")
+    monkeypatch.setattr(gsheet_client, "BACKOFF_BASE_SECONDS", 0.0)
+    monkeypatch.setattr(gsheet_client, "WRITE_QUOTA_PER_MINUTE", 60_000)
+    monkeypatch.setattr(gsheet_client, "WRITE_BURST", 1000)
+    for key in ("latency", "jitter", "error_rate", "quota_per_minute", "auth_latency"):
+        monkeypatch.setitem(fake_gsheet.CONFIG, key, 0)
+    _reset_sheets()
+    yield
+    _reset_sheets()
+
+
+@pytest.fixture
+def failing_writes(fake_backend, monkeypatch):
+    """switch["on"]이 True인 동안 모든 append_rows가 503으로 실패 (재시도 없음)"""
+    import fake_gsheet
+    import gsheet_client
+
+    switch = {"on": False}
+    original = fake_gsheet.FakeWorksheet.append_rows
+
+    def append_rows(self, values):
+        if switch["on"]:
+            raise fake_gsheet.FakeAPIError(503, "unavailable")
+        return original(self, values)
+
+    monkeypatch.setattr(fake_gsheet.FakeWorksheet, "append_rows", append_rows)
+    monkeypatch.setattr(gsheet_client, "MAX_RETRIES", 0)
+    return switch
+
+
+def wait_for_rows(url, count, timeout=5.0):
+    """hedged 기록의 늦은 대상이 백그라운드에서 끝날 때까지 대기"""
+    import fake_gsheet
+
+    deadline = time.monotonic() + timeout
+    while len(fake_gsheet.get_rows(url)) < count and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return fake_gsheet.get_rows(url)
@@ -0,0 +1,107 @@
+import pytest
+
+import fake_gsheet
+import gsheet_client
+from conftest import wait_for_rows
+from fake_gsheet import FakeAPIError
+
+
+@pytest.mark.parametrize("error, expected", [
+    (FakeAPIError(401, "unauthorized"), True),
+    (FakeAPIError(403, "forbidden"), True),
+    (FakeAPIError(429, "quota"), False),
+    (FakeAPIError(503, "unavailable"), False),
+    (ConnectionResetError("closed"), True),
+    (ValueError("bad payload"), False),
+])
+def test_should_invalidate_only_auth_and_transport_errors(error, expected):
+    assert gsheet_client._should_invalidate(error) is expected
+
+
+def test_retryable_error_keeps_pooled_connection(fake_backend, monkeypatch):
+    url = "https://example.com/sheet"
+    gsheet_client.get_worksheet("main", url)
+    auth_before = fake_gsheet.server_stats()["auth"]
+
+    calls = {"n": 0}
+    original = fake_gsheet.FakeWorksheet.append_rows
+
+    def flaky(self, values):
+        calls["n"] += 1
+        if calls["n"] == 1:
+            raise FakeAPIError(503, "unavailable")
+        return original(self, values)
+
+    monkeypatch.setattr(fake_gsheet.FakeWorksheet, "append_rows", flaky)
+    gsheet_client._append_to_target("main", url, [["row"]])
+
+    assert fake_gsheet.get_rows(url) == [["row"]]
+    assert fake_gsheet.server_stats()["auth"] == auth_before
+
+
+def test_half_open_breaker_allows_a_single_probe():
+    breaker = gsheet_client.CircuitBreaker(failure_threshold=1, cooldown_seconds=0.0)
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+    assert breaker.allow() is True
+    assert breaker.state == "half_open"
+    # 시험 전송 중에는 다른 호출 거부
+    assert breaker.allow() is False
+    assert breaker.allow() is False
+
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert breaker.allow() is True
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.allow() is True
+    assert breaker.allow() is True
+
+
+MAIN = ("main", "https://example.com/main")
+BACKUP = ("backup", "https://example.com/backup")
+
+
+def test_hedged_identical_rows_are_not_deduplicated(fake_backend):
+    row = ["2024-01-01 10:00:00", "P001", "Click", "deck A"]
+    gsheet_client.append_rows_hedged([MAIN, BACKUP], [row])
+    gsheet_client.append_rows_hedged([MAIN, BACKUP], [row])
+
+    assert wait_for_rows(MAIN[1], 2) == [row, row]
+    assert wait_for_rows(BACKUP[1], 2) == [row, row]
+
+
+def test_failed_hedge_cancels_its_reconciles(fake_backend, failing_writes):
+    failing_writes["on"] = True
+    with pytest.raises(FakeAPIError):
+        gsheet_client.append_rows_hedged([MAIN, BACKUP], [["t1"]], idempotency_key="k1")
+    assert not [task for task in gsheet_client._reconcile_tasks if task.key == "k1"]
+
+    # 호출자가 다른 묶음(key)으로 재전송 → 각 대상에 한 번만 기록
+    failing_writes["on"] = False
+    gsheet_client.append_rows_hedged([MAIN, BACKUP], [["t1"], ["t2"]], idempotency_key="k2")
+    assert wait_for_rows(MAIN[1], 2) == [["t1"], ["t2"]]
+    assert wait_for_rows(BACKUP[1], 2) == [["t1"], ["t2"]]
+    assert not gsheet_client._reconcile_tasks
+
+
+def test_idempotency_key_depends_on_record_identity_only():
+    assert gsheet_client.make_idempotency_key(["a", "b"]) == gsheet_client.make_idempotency_key(["a", "b"])
+    assert gsheet_client.make_idempotency_key(["a", "b"]) != gsheet_client.make_idempotency_key(["a", "c"])
+
+
+def test_count_rows_excludes_header_and_reports_duplicates(fake_backend):
+    main, backup = "https://example.com/main", "https://example.com/backup"
+    header = ["timestamp", "session_id", "trial"]
+    gsheet_client._append_to_target("main", main, [["t1", "S1", 1], ["t2", "S1", 2]], header=header)
+    # 재시도로 같은 행이 다시 기록된 경우 (시각만 다름)
+    gsheet_client._append_to_target("main", main, [["t3", "S1", 2]])
+    gsheet_client._append_to_target("backup", backup, [["t1", "S1", 1], ["t4", "S1", 3]], header=header)
+
+    counts = fake_gsheet.count_rows([main, backup], header=header)
+    assert counts["targets"] == {
+        main: {"rows": 3, "duplicates": 1},
+        backup: {"rows": 2, "duplicates": 0},
+    }
+    assert counts["unique_rows"] == 3
@@ -0,0 +1,35 @@
+import gsheet_client
+from conftest import wait_for_rows
+from gsheet_writer import SheetWriteQueue
+from log_spool import LogSpool
+
+MAIN = ("main", "https://example.com/main")
+BACKUP = ("backup", "https://example.com/backup")
+
+
+def test_spool_retry_after_failed_hedge_writes_rows_once(tmp_path, failing_writes, monkeypatch):
+    monkeypatch.setattr(gsheet_client, "HEDGED_WRITES", True)
+    writer = SheetWriteQueue()
+    spool = LogSpool(str(tmp_path))
+    writer.attach_spool(spool, background=False)
+    spool.append([MAIN, BACKUP], [["trial", 1], ["trial", 2]])
+
+    failing_writes["on"] = True
+    assert writer.drain_spools() is not None
+    assert spool.pending_count() == 1
+    # 실패한 묶음의 재전송 예약은 취소됨 (재전송은 스풀이 담당)
+    assert not gsheet_client._reconcile_tasks
+
+    # 스풀 재전송 (새 레코드가 붙어 묶음 구성 / key가 바뀜)
+    failing_writes["on"] = False
+    spool.append([MAIN, BACKUP], [["trial", 3]])
+    assert writer.drain_spools() is None
+    assert spool.pending_count() == 0
+    assert writer.flush(timeout=5)
+
+    expected = [["trial", 1], ["trial", 2], ["trial", 3]]
+    # 먼저 성공한 대상에서 반환하고 늦은 대상은 백그라운드에서 완료
+    assert wait_for_rows(MAIN[1], 3) == expected
+    assert wait_for_rows(BACKUP[1], 3) == expected
+    assert not gsheet_client._reconcile_tasks
+    spool.close()
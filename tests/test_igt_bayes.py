@@ -0,0 +1,34 @@
+import warnings
+
+import numpy as np
+
+import igt_bayes
+from igt_models import get_model, simulate
+
+
+def test_sampler_acceptance_is_near_target_and_reported(tmp_path):
+    model = get_model("ev")
+    rng = np.random.default_rng(0)
+    data = simulate("ev", model.to_params(rng.normal(0, 0.5, size=(6, 3))), n_trials=60, seed=1)
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        result = igt_bayes.sample("ev", data, str(tmp_path), n_chains=2, n_warmup=300, n_draws=100,
+                                  workers=1, seed=2)
+
+    summary = result["summary"]
+    assert summary["accept_rates"] == result["accept_rates"]
+    for rate in result["accept_rates"]:
+        assert 0.12 < rate < 0.40
+    assert summary["accept_warning"] == any(
+        not igt_bayes.ACCEPT_WARN_RANGE[0] <= rate <= igt_bayes.ACCEPT_WARN_RANGE[1]
+        for rate in result["accept_rates"]
+    )
+
+
+def test_split_rhat_detects_unmixed_chains():
+    rng = np.random.default_rng(0)
+    mixed = rng.normal(size=(4, 500))
+    assert igt_bayes.split_rhat(mixed) < 1.02
+    shifted = mixed + np.arange(4)[:, np.newaxis]
+    assert igt_bayes.split_rhat(shifted) > 1.5
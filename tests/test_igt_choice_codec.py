@@ -0,0 +1,136 @@
+import random
+import struct
+import zlib
+
+import pytest
+
+from igt_choice_codec import (
+    ChoiceCodecError,
+    decode,
+    decode_session,
+    decode_text,
+    encode_choices,
+    encode_session,
+    encode_text,
+)
+from igt_schedules import get_schedule, shuffle_schedule
+from igt_utils import DeckManager, GameSession, TrialColumns, TrialResult
+
+DECKS = "ABCDDCBAAC" * 5
+
+
+def _play(decks, schedule=None, seed=None):
+    """DeckManager로 진행한 GameSession"""
+    manager = DeckManager(schedule)
+    session = GameSession("S1", "P1", "", seed=seed)
+    for i, deck in enumerate(decks):
+        reward, penalty, net = manager.draw_card(deck)
+        session.add_trial(TrialResult(
+            i + 1, deck, reward, penalty, net, session.current_balance + net,
+            timestamp_ns=1_700_000_000_000_000_000 + i * 1_500_000_000
+        ))
+    return session, manager
+
+
+def _rows(trials):
+    return [(t.deck_choice, t.reward, t.penalty, t.net_outcome, t.balance_after) for t in trials]
+
+
+def test_header_records_schedule_and_seed():
+    session, manager = _play(DECKS, "reversed", seed=42)
+    decoded = decode(encode_session(session, manager))
+    assert decoded["schedule"] == "reversed"
+    assert decoded["seed"] == 42
+    assert _rows(decoded["trials"]) == _rows(session.trials)
+
+
+def test_shuffled_schedule_is_replayed_from_seed():
+    seed = 2**64 - 1
+    schedule = shuffle_schedule(get_schedule(), random.Random(seed))
+    session, manager = _play(DECKS, schedule, seed=seed)
+
+    restored = decode_session(encode_session(session, manager), "S1", "P1")
+    assert restored.seed == seed
+    assert _rows(restored.trials) == _rows(session.trials)
+    assert restored.current_balance == session.current_balance
+
+
+def test_deck_manager_factory_overrides_header():
+    session, manager = _play(DECKS)
+    data = encode_session(session, manager)
+    restored = decode_session(data, "S1", "P1", deck_manager_factory=lambda: DeckManager("reversed"))
+    assert _rows(restored.trials) == _rows(_play(DECKS, "reversed")[0].trials)
+
+
+def test_shuffled_schedule_without_seed_is_rejected():
+    data = encode_choices(DECKS, schedule="bechara1994+shuffled")
+    with pytest.raises(ValueError):
+        decode(data)
+
+
+def test_version_1_data_decodes_with_default_schedule():
+    body = bytearray(struct.pack(">BBHi", 1, 0, 4, 2000))
+    body.append(0b00011011)  # A B C D
+    data = bytes(body) + struct.pack(">I", zlib.crc32(body))
+
+    decoded = decode(data)
+    assert decoded["decks"] == "ABCD"
+    assert decoded["schedule"] == "" and decoded["seed"] is None
+    assert _rows(decoded["trials"]) == _rows(_play("ABCD")[0].trials)
+
+
+@pytest.mark.parametrize("n", [0, 1, 3, 4, 5, 100, 257])
+def test_round_trip_choices(n):
+    rng = random.Random(n)
+    decks = "".join(rng.choice("ABCD") for _ in range(n))
+    data = encode_choices(decks, initial_balance=1500)
+    assert len(data) == 8 + 1 + (n + 3) // 4 + 4
+
+    decoded = decode(data)
+    assert decoded["decks"] == decks
+    assert decoded["initial_balance"] == 1500
+    assert decoded["timestamps_ns"] is None
+    assert [t.timestamp_ns for t in decoded["trials"]] == [None] * n
+
+
+def test_round_trip_timestamps_truncated_to_microseconds():
+    timestamps = [1_700_000_000_123_456_789, 1_700_000_001_000_000_999, 1_700_000_000_900_000_000]
+    decoded = decode(encode_choices("ADB", timestamps))
+    assert decoded["timestamps_ns"] == [t // 1000 * 1000 for t in timestamps]
+
+
+def test_round_trip_session_with_trial_columns():
+    session, manager = _play(DECKS)
+    columns = GameSession("S1", "P1", "", trials=TrialColumns())
+    for trial in session.trials:
+        columns.add_trial(trial)
+
+    restored = decode_session(encode_session(columns, manager), "S1", "P1")
+    assert _rows(restored.trials) == _rows(session.trials)
+    assert [t.timestamp_ns for t in restored.trials] == [t.timestamp_ns for t in session.trials]
+    assert restored.score() == session.score()
+
+
+def test_text_round_trip():
+    data = encode_choices(DECKS)
+    text = encode_text(data)
+    assert "=" not in text
+    assert decode_text(text) == data
+
+
+def test_corrupted_data_is_rejected():
+    data = bytearray(encode_choices(DECKS))
+    data[9] ^= 0x01
+    with pytest.raises(ChoiceCodecError):
+        decode(bytes(data))
+    with pytest.raises(ChoiceCodecError):
+        decode(encode_choices(DECKS)[:-1])
+    with pytest.raises(ChoiceCodecError):
+        decode(decode_text("!!!"))
+
+
+def test_invalid_input_is_rejected():
+    with pytest.raises(ValueError):
+        encode_choices("ABE")
+    with pytest.raises(ValueError):
+        encode_choices("AB", timestamps_ns=[1])
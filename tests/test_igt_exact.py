@@ -0,0 +1,93 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from igt_exact import exact_distribution
+from igt_simulation import DECKS, random_policy, simulate_batch
+from igt_utils import DeckManager
+
+N_AGENTS = 20000
+
+
+def _net_score(choice):
+    """(N, T) 선택 코드 → (N,) 순점수 (C+D)-(A+B)"""
+    return np.where(choice >= 2, 1, -1).sum(axis=1)
+
+
+def _count_policy(counts, balance):
+    """잔액이 시작 잔액보다 낮으면 C/D, 아니면 A/B 선호 + 많이 고른 덱 회피"""
+    counts = np.asarray(counts, dtype=float)
+    base = np.where((balance < 2000)[:, np.newaxis], [1.0, 1.0, 3.0, 3.0], [3.0, 3.0, 1.0, 1.0])
+    weights = base / (1.0 + counts)
+    return weights / weights.sum(axis=1, keepdims=True)
+
+
+def _simulated_count_policy(t, state):
+    probs = _count_policy(state.deck_counts, state.balance)
+    draws = state.rng.random(probs.shape[0])
+    return (draws[:, np.newaxis] > np.cumsum(probs, axis=1)[:, :-1]).sum(axis=1).astype(np.int8)
+
+
+def _assert_matches_monte_carlo(distribution, simulated):
+    for kind, samples in (
+        ("net_score", _net_score(simulated["choice"])),
+        ("balance", simulated["balance"][:, -1]),
+    ):
+        std = distribution.std(kind)
+        # 표본 평균 / 표준편차 오차: 5 표준오차 이내
+        assert abs(samples.mean() - distribution.mean(kind)) < 5 * std / np.sqrt(N_AGENTS)
+        assert abs(samples.std() - std) < 5 * std / np.sqrt(2 * N_AGENTS)
+
+    # 순점수 분포: 값별 확률 차이 (전체 변동 거리)
+    values, probs = distribution.net_score_values, distribution.net_score_probs
+    observed = np.array([(_net_score(simulated["choice"]) == v).mean() for v in values])
+    assert 0.5 * np.abs(observed - probs).sum() < 0.03
+
+
+def test_probabilities_sum_to_one():
+    distribution = exact_distribution((0.1, 0.2, 0.3, 0.4), n_trials=50)
+    assert distribution.balance_probs.sum() == pytest.approx(1.0)
+    assert distribution.net_score_probs.sum() == pytest.approx(1.0)
+
+
+def test_fixed_policy_matches_enumeration():
+    n_trials, policy = 5, np.array([0.1, 0.2, 0.3, 0.4])
+    expected = {}
+    for sequence in itertools.product(range(len(DECKS)), repeat=n_trials):
+        balance = simulate_batch(choices=np.array([sequence]))["balance"][0, -1]
+        expected[balance] = expected.get(balance, 0.0) + policy[list(sequence)].prod()
+
+    distribution = exact_distribution(policy, n_trials=n_trials)
+    probs = dict(zip(distribution.balance_values.tolist(), distribution.balance_probs))
+    assert set(probs) == set(expected)
+    for balance, p in expected.items():
+        assert probs[balance] == pytest.approx(p)
+
+
+@pytest.mark.parametrize("schedule", ["bechara1994", "reversed"])
+def test_fixed_policy_matches_monte_carlo(schedule):
+    policy = (0.1, 0.2, 0.3, 0.4)
+    deck_manager = DeckManager(schedule)
+    distribution = exact_distribution(policy, n_trials=60, deck_manager=deck_manager)
+    simulated = simulate_batch(
+        policy=random_policy(policy), n_agents=N_AGENTS, n_trials=60,
+        deck_manager=deck_manager, seed=1
+    )
+    _assert_matches_monte_carlo(distribution, simulated)
+
+
+def test_count_policy_matches_monte_carlo():
+    distribution = exact_distribution(_count_policy, n_trials=40)
+    simulated = simulate_batch(
+        policy=_simulated_count_policy, n_agents=N_AGENTS, n_trials=40, seed=2
+    )
+    _assert_matches_monte_carlo(distribution, simulated)
+
+
+def test_constant_count_policy_equals_fixed_policy():
+    policy = np.array([0.1, 0.2, 0.3, 0.4])
+    fixed = exact_distribution(policy, n_trials=30)
+    dynamic = exact_distribution(lambda counts, balance: np.tile(policy, (counts.shape[0], 1)), n_trials=30)
+    np.testing.assert_allclose(dynamic.balance_probs, fixed.balance_probs, atol=1e-12)
+    np.testing.assert_allclose(dynamic.net_score_probs, fixed.net_score_probs, atol=1e-12)
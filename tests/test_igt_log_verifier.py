@@ -0,0 +1,102 @@
+import csv
+import random
+
+import pytest
+
+from igt_log_verifier import DEFAULT_HEADER, load_csv, session_schedules_from_events, verify_rows
+from igt_schedules import ScheduleError, get_schedule, replay_schedule, shuffle_schedule
+from igt_utils import DeckManager, TrialResult
+
+
+def _trial_rows(session_id, decks, schedule=None, initial_balance=2000):
+    """DeckManager로 진행한 시행 행 (DEFAULT_HEADER 형식)"""
+    manager = DeckManager(schedule)
+    balance = initial_balance
+    rows = []
+    for trial, deck in enumerate(decks, start=1):
+        reward, penalty, net = manager.draw_card(deck)
+        balance += net
+        rows.append(["", session_id, "P1", trial, deck, reward, penalty, net, balance])
+    return rows
+
+
+DECKS = "AABBCCDDAB" * 6
+
+
+def test_verify_rows_default_schedule():
+    report = verify_rows(_trial_rows("S1", DECKS), expected_trials=len(DECKS))
+    assert report["ok"], report
+
+
+def test_verify_rows_uses_given_deck_manager():
+    rows = _trial_rows("S1", DECKS, "reversed")
+    assert not verify_rows(rows)["ok"]
+    assert verify_rows(rows, deck_manager=DeckManager("reversed"))["ok"]
+
+
+def test_verify_rows_per_session_schedules():
+    shuffled = shuffle_schedule(get_schedule(), random.Random(11))
+    rows = _trial_rows("S1", DECKS) + _trial_rows("S2", DECKS, shuffled) + _trial_rows("S3", DECKS, "reversed")
+    report = verify_rows(rows, session_schedules={"S2": shuffled, "S3": get_schedule("reversed")})
+    assert report["ok"], report["mismatches"][:5]
+
+    report = verify_rows(rows, session_schedules={"S3": get_schedule("reversed")})
+    assert {item["session_id"] for item in report["mismatches"]} == {"S2"}
+
+
+def test_session_schedules_from_events_replays_shuffled_schedule():
+    events = [
+        ["2026-01-01 00:00:00", "P1", "SessionStart",
+         "Session started - Initial balance: $2000, Seed: 11, Schedule: bechara1994+shuffled, Session: S2"],
+        ["2026-01-01 00:00:00", "P2", "SessionStart",
+         "Session started - Initial balance: $2000, Seed: 5, Schedule: reversed, Session: S3"],
+        ["2026-01-01 00:00:00", "P3", "SessionStart", "Session started - Initial balance: $2000, Seed: 7"],
+        ["2026-01-01 00:05:00", "P1", "SessionEnd", "Session ended"],
+    ]
+    schedules = session_schedules_from_events(events)
+    assert set(schedules) == {"S2", "S3"}
+    assert schedules["S2"] == shuffle_schedule(get_schedule(), random.Random(11))
+    assert schedules["S3"] == get_schedule("reversed")
+
+    rows = _trial_rows("S2", DECKS, schedules["S2"])
+    assert verify_rows(rows, session_schedules=schedules)["ok"]
+
+
+def test_replay_schedule():
+    assert replay_schedule() == get_schedule()
+    assert replay_schedule("reversed", seed=3) == get_schedule("reversed")
+    with pytest.raises(ScheduleError):
+        replay_schedule("bechara1994+shuffled")
+
+
+def _write_csv(path, header, rows):
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        writer.writerows(rows)
+    return str(path)
+
+
+def test_load_csv_merges_files_with_aliased_columns(tmp_path):
+    # TRIAL_HEADER (= DEFAULT_HEADER) 형식 + TrialResult.to_dict() 형식 (컬럼 이름 / 순서 다름)
+    first = _write_csv(tmp_path / "trials.csv", DEFAULT_HEADER, _trial_rows("S1", DECKS))
+    records = []
+    for row in _trial_rows("S2", DECKS):
+        trial = TrialResult(row[3], row[4], row[5], row[6], row[7], row[8], timestamp_ns=None)
+        records.append({"session_id": "S2", **trial.to_dict()})
+    second = _write_csv(
+        tmp_path / "export.csv", list(records[0]), [list(record.values()) for record in records]
+    )
+
+    data = load_csv([first, second])
+    assert data["header"] == DEFAULT_HEADER
+    assert len(data["rows"]) == 2 * len(DECKS)
+    report = verify_rows(data["rows"], header=data["header"], expected_trials=len(DECKS))
+    assert report["sessions"] == 2
+    assert report["ok"], report
+
+
+def test_load_csv_reports_missing_column(tmp_path):
+    path = _write_csv(tmp_path / "bad.csv", ["session_id", "trial", "deck", "balance"], [["S1", 1, "A", 2100]])
+    with pytest.raises(ValueError, match="bad.csv: Missing column for reward"):
+        load_csv([path])
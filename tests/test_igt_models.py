@@ -0,0 +1,98 @@
+import numpy as np
+import pytest
+
+from igt_models import MODELS, ChoiceData, fit_mle, log_likelihood, log_likelihood_grid, simulate
+from igt_simulation import random_policy, simulate_batch
+
+
+@pytest.fixture(scope="module")
+def data():
+    result = simulate_batch(policy=random_policy(), n_agents=4, n_trials=60, seed=1)
+    return ChoiceData.from_arrays(result["choice"], result["reward"], result["penalty"])
+
+
+def _softmax_log_prob(values, chosen):
+    values = np.asarray(values, dtype=float)
+    shifted = values - values.max()
+    return shifted[chosen] - np.log(np.exp(shifted).sum())
+
+
+def _reference_ev(a, c, w, choices, wins, losses):
+    """EV 모델 시행 단위 기준 구현"""
+    ev = np.zeros(4)
+    total = 0.0
+    for t, deck in enumerate(choices):
+        theta = ((t + 1) / 10.0) ** c
+        total += _softmax_log_prob(theta * ev, deck)
+        u = (1 - w) * wins[t] - w * losses[t]
+        ev[deck] += a * (u - ev[deck])
+    return total
+
+
+def _reference_pvl(A, alpha, cons, lam, choices, wins, losses):
+    """PVL-Delta 모델 시행 단위 기준 구현"""
+    ev = np.zeros(4)
+    theta = 3.0 ** cons - 1
+    total = 0.0
+    for t, deck in enumerate(choices):
+        total += _softmax_log_prob(theta * ev, deck)
+        x = wins[t] - losses[t]
+        u = abs(x) ** alpha if x >= 0 else -lam * abs(x) ** alpha
+        ev[deck] += A * (u - ev[deck])
+    return total
+
+
+def test_ev_likelihood_matches_reference(data):
+    params = {"a": np.array([0.1, 0.3, 0.6, 0.9]), "c": np.array([-1.0, 0.0, 0.5, 2.0]),
+              "w": np.array([0.2, 0.5, 0.4, 0.8])}
+    ll = log_likelihood("ev", params, data)
+    for i in range(data.n_participants):
+        expected = _reference_ev(params["a"][i], params["c"][i], params["w"][i],
+                                 data.choices[i], data.wins[i], data.losses[i])
+        assert ll[i] == pytest.approx(expected)
+
+
+def test_pvl_delta_likelihood_matches_reference(data):
+    params = {"A": np.array([0.05, 0.2, 0.5, 0.9]), "alpha": np.array([0.3, 0.5, 1.0, 1.5]),
+              "cons": np.array([0.5, 1.0, 2.0, 3.0]), "lambda": np.array([0.5, 1.0, 2.0, 5.0])}
+    ll = log_likelihood("pvl_delta", params, data)
+    for i in range(data.n_participants):
+        expected = _reference_pvl(params["A"][i], params["alpha"][i], params["cons"][i], params["lambda"][i],
+                                  data.choices[i], data.wins[i], data.losses[i])
+        assert ll[i] == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("name", sorted(MODELS))
+def test_first_trial_is_uniform_and_per_trial_sums_to_total(name, data):
+    model = MODELS[name]
+    params = model.sample_params(data.n_participants, np.random.default_rng(2))
+    per_trial = log_likelihood(name, params, data, per_trial=True)
+    np.testing.assert_allclose(per_trial[:, 0], np.log(0.25))
+    np.testing.assert_allclose(per_trial.sum(axis=-1), log_likelihood(name, params, data))
+    assert (per_trial <= 0).all()
+
+
+@pytest.mark.parametrize("name", sorted(MODELS))
+def test_masked_trials_do_not_contribute(name, data):
+    model = MODELS[name]
+    params = model.sample_params(data.n_participants, np.random.default_rng(4))
+    mask = data.mask.copy()
+    mask[:, 40:] = False
+    truncated = ChoiceData(data.choices[:, :40], data.wins[:, :40], data.losses[:, :40])
+    masked = ChoiceData(data.choices, data.wins, data.losses, mask)
+    np.testing.assert_allclose(log_likelihood(name, params, masked), log_likelihood(name, params, truncated))
+
+
+def test_grid_matches_pointwise_likelihood(data):
+    grid = {"a": [0.1, 0.5], "c": [-1.0, 1.0], "w": [0.3, 0.7]}
+    table = log_likelihood_grid("ev", grid, data)
+    assert table.shape == (2, 2, 2, data.n_participants)
+    point = log_likelihood("ev", {"a": 0.5, "c": -1.0, "w": 0.7}, data)
+    np.testing.assert_allclose(table[1, 0, 1], point)
+
+
+def test_mle_is_at_least_as_good_as_generating_params():
+    true = {"a": np.full(3, 0.3), "c": np.full(3, 1.0), "w": np.full(3, 0.4)}
+    data = simulate("ev", true, n_trials=100, seed=9)
+    fit = fit_mle("ev", data, n_candidates=100, n_starts=2, max_iter=100, seed=0)
+    assert (fit["log_likelihood"] >= log_likelihood("ev", true, data) - 1e-6).all()
@@ -0,0 +1,48 @@
+import json
+import os
+
+import pytest
+
+from igt_recovery import MANIFEST_FILE, CheckpointMismatchError, run_recovery
+from igt_utils import DeckManager
+
+FAST = {"n_candidates": 10, "n_starts": 1, "max_iter": 3}
+
+
+def test_resume_reuses_chunks_with_same_settings(tmp_path):
+    first = run_recovery("ev", n_agents=6, n_trials=20, chunk_size=3, workers=1,
+                         checkpoint_dir=str(tmp_path), **FAST)
+    assert first["resumed_chunks"] == 0
+    with open(tmp_path / MANIFEST_FILE, encoding="utf-8") as f:
+        assert json.load(f)["schedule"] == "bechara1994"
+
+    second = run_recovery("ev", n_agents=6, n_trials=20, chunk_size=3, workers=1,
+                          checkpoint_dir=str(tmp_path), **FAST)
+    assert second["resumed_chunks"] == 2
+    assert (second["log_likelihood"] == first["log_likelihood"]).all()
+
+
+@pytest.mark.parametrize("change", [
+    {"seed": 1},
+    {"n_trials": 30},
+    {"deck_manager": DeckManager("reversed")},
+    {"max_iter": 4},
+])
+def test_resume_refuses_different_settings(tmp_path, change):
+    settings = dict(n_agents=6, n_trials=20, chunk_size=3, workers=1, checkpoint_dir=str(tmp_path), **FAST)
+    run_recovery("ev", **settings)
+
+    settings.update(change)
+    with pytest.raises(CheckpointMismatchError):
+        run_recovery("ev", **settings)
+
+    result = run_recovery("ev", overwrite_checkpoint=True, **settings)
+    assert result["resumed_chunks"] == 0
+
+
+def test_chunks_without_manifest_are_not_resumed(tmp_path):
+    run_recovery("ev", n_agents=3, n_trials=20, chunk_size=3, workers=1, checkpoint_dir=str(tmp_path), **FAST)
+    os.remove(tmp_path / MANIFEST_FILE)
+    with pytest.raises(CheckpointMismatchError):
+        run_recovery("ev", n_agents=3, n_trials=20, chunk_size=3, workers=1,
+                     checkpoint_dir=str(tmp_path), **FAST)
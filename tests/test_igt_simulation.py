@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+
+from igt_simulation import DECKS, OutcomeTables, encode_choices, random_policy, simulate_batch
+from igt_utils import DeckManager
+
+
+def _deck_manager_run(choices, schedule=None, initial_balance=2000):
+    """DeckManager.draw_card로 시행을 하나씩 진행 (기준 구현)"""
+    manager = DeckManager(schedule)
+    balance = initial_balance
+    rewards, penalties, balances = [], [], []
+    for deck in choices:
+        reward, penalty, net = manager.draw_card(deck)
+        balance += net
+        rewards.append(reward)
+        penalties.append(penalty)
+        balances.append(balance)
+    return rewards, penalties, balances, manager
+
+
+@pytest.mark.parametrize("schedule", ["bechara1994", "bechara1994_shuffled", "reversed", "bechara1994_long"])
+def test_simulate_batch_matches_deck_manager(schedule):
+    rng = np.random.default_rng(7)
+    choices = rng.integers(0, 4, size=(5, 150))
+    result = simulate_batch(choices=choices, deck_manager=DeckManager(schedule))
+
+    for i, row in enumerate(choices):
+        rewards, penalties, balances, _ = _deck_manager_run([DECKS[c] for c in row], schedule)
+        assert result["reward"][i].tolist() == rewards
+        assert result["penalty"][i].tolist() == penalties
+        assert result["balance"][i].tolist() == balances
+
+
+def test_policy_run_matches_choice_matrix_run():
+    by_policy = simulate_batch(policy=random_policy((0.1, 0.2, 0.3, 0.4)), n_agents=50, n_trials=120, seed=3)
+    by_choices = simulate_batch(choices=by_policy["choice"])
+    for key in ("reward", "penalty", "net", "balance"):
+        np.testing.assert_array_equal(by_policy[key], by_choices[key])
+
+
+def test_outcome_tables_reconstruct_matches_simulate_batch():
+    rng = np.random.default_rng(11)
+    choices = rng.integers(0, 4, size=(20, 200))
+    tables = OutcomeTables()
+    expected = simulate_batch(choices=choices)
+    reconstructed = tables.reconstruct(choices)
+    for key in ("reward", "penalty", "net", "balance"):
+        np.testing.assert_array_equal(reconstructed[key], expected[key])
+    assert not tables.verify_balances(choices, expected["balance"]).any()
+
+
+def test_balance_from_deck_counts_matches_deck_manager():
+    rng = np.random.default_rng(5)
+    sequence = [DECKS[c] for c in rng.integers(0, 4, size=130)]
+    _, _, balances, manager = _deck_manager_run(sequence)
+    tables = OutcomeTables()
+    assert tables.balance(manager.get_deck_counts()) == balances[-1]
+    counts = np.array([[manager.get_deck_counts()[deck] for deck in DECKS]])
+    assert tables.balance(counts).tolist() == [balances[-1]]
+
+
+def test_encode_choices_accepts_names_and_integral_codes():
+    expected = [[0, 1, 2, 3]]
+    assert encode_choices([["A", "B", "C", "D"]]).tolist() == expected
+    assert encode_choices(np.array([[0, 1, 2, 3]], dtype=np.int64)).tolist() == expected
+    assert encode_choices([[0.0, 1.0, 2.0, 3.0]]).tolist() == expected
+
+
+@pytest.mark.parametrize("choices", [
+    [[256, 1, 2]],
+    [[-1, 1, 2]],
+    [[1.7, 1, 2]],
+    [[np.nan, 1, 2]],
+    [[True, False]],
+    [["A", "E"]],
+])
+def test_encode_choices_rejects_invalid_codes(choices):
+    with pytest.raises(ValueError):
+        encode_choices(choices)
@@ -0,0 +1,121 @@
+import json
+import os
+
+import pytest
+
+import log_spool
+from log_spool import LogSpool, SpoolLockedError, open_spools
+
+SHEET = [("gsheet_main", "https://example.com/main")]
+
+
+def _segments(directory):
+    return sorted(
+        name for name in os.listdir(directory)
+        if name.startswith(log_spool.SEGMENT_PREFIX) and name.endswith(log_spool.SEGMENT_SUFFIX)
+    )
+
+
+def test_pending_records_survive_restart(tmp_path):
+    spool = LogSpool(str(tmp_path))
+    first = spool.append(SHEET, [["t1", 1]], header=["ts", "n"])
+    second = spool.append(SHEET, [["t2", 2]])
+    spool.close()
+
+    recovered = LogSpool(str(tmp_path))
+    pending = recovered.pending()
+    assert [record["seq"] for record in pending] == [first, second]
+    assert pending[0]["header"] == ["ts", "n"]
+    assert pending[1]["rows"] == [["t2", 2]]
+    recovered.close()
+
+
+def test_checkpoint_skips_acked_records(tmp_path):
+    spool = LogSpool(str(tmp_path))
+    first = spool.append(SHEET, [["t1"]])
+    second = spool.append(SHEET, [["t2"]])
+    spool.ack(first)
+    spool.close()
+
+    with open(tmp_path / log_spool.CHECKPOINT_FILE, encoding="utf-8") as f:
+        assert json.load(f)["acked_seq"] == first
+
+    recovered = LogSpool(str(tmp_path))
+    assert [record["seq"] for record in recovered.pending()] == [second]
+    # 새 레코드는 복구된 마지막 seq 다음 번호
+    assert recovered.append(SHEET, [["t3"]]) == second + 1
+    recovered.close()
+
+
+def test_torn_last_line_is_truncated(tmp_path):
+    spool = LogSpool(str(tmp_path))
+    seq = spool.append(SHEET, [["complete"]])
+    spool.close()
+
+    path = tmp_path / _segments(str(tmp_path))[0]
+    intact_size = path.stat().st_size
+    with open(path, "ab") as f:
+        f.write(b'{"seq": 2, "sheet_info": [["gsheet_main", "htt')
+
+    recovered = LogSpool(str(tmp_path))
+    assert [record["seq"] for record in recovered.pending()] == [seq]
+    assert path.stat().st_size == intact_size
+    # 잘린 줄 뒤에 새 레코드가 정상적으로 이어짐
+    next_seq = recovered.append(SHEET, [["after"]])
+    recovered.close()
+
+    reopened = LogSpool(str(tmp_path))
+    assert [record["seq"] for record in reopened.pending()] == [seq, next_seq]
+    reopened.close()
+
+
+def test_fully_acked_segments_are_removed(tmp_path):
+    spool = LogSpool(str(tmp_path), segment_max_bytes=1)
+    seqs = [spool.append(SHEET, [[f"t{i}"]]) for i in range(3)]
+    assert len(_segments(str(tmp_path))) == 3
+
+    spool.ack(seqs[-1])
+    # 쓰기 중인 세그먼트만 남음
+    assert len(_segments(str(tmp_path))) == 1
+    assert spool.pending_count() == 0
+    spool.close()
+
+
+def test_pending_respects_max_rows(tmp_path):
+    spool = LogSpool(str(tmp_path))
+    spool.append(SHEET, [["a"], ["b"], ["c"]])
+    spool.append(SHEET, [["d"]])
+    # 첫 레코드는 max_rows보다 커도 항상 포함
+    assert len(spool.pending(max_rows=2)) == 1
+    assert len(spool.pending(max_rows=4)) == 2
+    spool.close()
+
+
+@pytest.mark.skipif(log_spool.fcntl is None, reason="flock not available")
+def test_directory_lock_blocks_second_spool(tmp_path):
+    spool = LogSpool(str(tmp_path))
+    with pytest.raises(SpoolLockedError):
+        LogSpool(str(tmp_path))
+    spool.close()
+    LogSpool(str(tmp_path)).close()
+
+
+@pytest.mark.skipif(log_spool.fcntl is None, reason="flock not available")
+def test_open_spools_uses_worker_directory_and_adopts_orphans(tmp_path):
+    orphan_dir = tmp_path / log_spool.WORKERS_DIR / "12345"
+    orphan = LogSpool(str(orphan_dir))
+    orphan.append(SHEET, [["orphaned"]])
+    orphan.close()
+
+    owner = LogSpool(str(tmp_path))
+    spools = open_spools(str(tmp_path))
+    try:
+        own = spools[0]
+        assert os.path.dirname(own.directory) == str(tmp_path / log_spool.WORKERS_DIR)
+        adopted = [spool for spool in spools[1:] if spool.directory == str(orphan_dir)]
+        assert len(adopted) == 1
+        assert adopted[0].pending()[0]["rows"] == [["orphaned"]]
+    finally:
+        for spool in spools:
+            spool.close()
+        owner.close()
@@ -0,0 +1,41 @@
+import json
+import time
+
+from free_recall_utils import FreeRecallSession, RecallResponse, WordStimulus
+from igt_utils import TrialResult, now_ns
+
+
+def test_trial_result_to_dict_keeps_iso_timestamp():
+    trial = TrialResult(1, "A", 100, 0, 100, 2100, timestamp_ns=1_700_000_000_123_456_000)
+    data = trial.to_dict()
+    assert list(data) == [
+        "trial_number", "deck_choice", "reward", "penalty", "net_outcome", "balance_after", "timestamp"
+    ]
+    assert data["timestamp"] == trial.timestamp
+    assert data["timestamp"].endswith(".123456")
+
+
+def test_trial_result_without_timestamp():
+    assert TrialResult(1, "A", 100, 0, 100, 2100, timestamp_ns=None).to_dict()["timestamp"] == ""
+
+
+def test_free_recall_session_serializes_slotted_records():
+    session = FreeRecallSession("FR_X", "P1", "mixed", "semantic", "2026-01-01T00:00:00")
+    session.presented_words.append(WordStimulus("기쁨", 8.24, 5.82, 2.87, "positive", 1))
+    session.recalled_words.append(RecallResponse("기쁨", 1, 2.5, True, False, 1))
+
+    data = json.loads(session.to_json())
+    assert data["presented_words"] == [{
+        "word": "기쁨", "valence": 8.24, "arousal": 5.82, "concreteness": 2.87,
+        "category": "positive", "presentation_order": 1,
+    }]
+    assert data["recalled_words"] == [{
+        "recalled_word": "기쁨", "recall_order": 1, "response_time": 2.5,
+        "is_correct": True, "is_intrusion": False, "original_position": 1,
+    }]
+
+
+def test_default_timestamp_follows_wall_clock():
+    before = time.time_ns()
+    trial = TrialResult(1, "A", 100, 0, 100, 2100)
+    assert before <= trial.timestamp_ns <= now_ns()
@@ -0,0 +1,74 @@
+import csv
+import os
+
+from session_index import INDEX_FILE, SessionIndex
+
+HEADER = ["timestamp", "session_id", "trial"]
+
+
+def _write_csv(path, rows, index=None, filename=None):
+    """행을 추가하고 (index가 있으면) 행 시작 오프셋을 인덱스에 등록"""
+    is_new = not os.path.exists(path)
+    with open(path, "a", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        if is_new:
+            writer.writerow(HEADER)
+        for row in rows:
+            f.flush()
+            offset = f.tell()
+            writer.writerow(row)
+            if index is not None:
+                index.add(row[1], filename, offset)
+
+
+def test_lookup_returns_indexed_rows(tmp_path):
+    index = SessionIndex(str(tmp_path))
+    index.mark_covered("igt_trials_20240101.csv")
+    _write_csv(tmp_path / "igt_trials_20240101.csv", [
+        ["t1", "S1", "1"], ["t2", "S2", "1"], ["t3", "S1", "2"],
+    ], index, "igt_trials_20240101.csv")
+    index.flush()
+
+    rows = index.lookup("S1", prefix="igt_trials")["igt_trials_20240101.csv"]
+    assert [row["trial"] for row in rows] == ["1", "2"]
+    index.close()
+
+
+def test_stale_offsets_are_skipped_and_index_rebuilt(tmp_path):
+    filename = "igt_trials_20240101.csv"
+    path = tmp_path / filename
+    index = SessionIndex(str(tmp_path))
+    index.mark_covered(filename)
+    _write_csv(path, [["t1", "S1", "1"], ["t2", "S1", "2"]], index, filename)
+    index.close()
+
+    # 비정상 종료 후 CSV가 다른 내용으로 다시 쓰임 → 인덱스 오프셋이 다른 세션 행을 가리킴
+    os.remove(path)
+    _write_csv(path, [["t9", "S2", "1"], ["t8", "S2", "2"], ["t3", "S1", "3"]])
+
+    reopened = SessionIndex(str(tmp_path))
+    rows = reopened.lookup("S1", prefix="igt_trials")[filename]
+    assert [(row["session_id"], row["trial"]) for row in rows] == [("S1", "3")]
+    assert [row["trial"] for row in reopened.lookup("S2")[filename]] == ["1", "2"]
+    reopened.close()
+
+    # 재생성 결과가 인덱스 파일에 남아 다음 프로세스도 같은 결과
+    assert b"X\t" + filename.encode() in (tmp_path / INDEX_FILE).read_bytes()
+    again = SessionIndex(str(tmp_path))
+    again._refresh()
+    assert len(again._entries["S1"]) == 1
+    assert len(again._entries["S2"]) == 2
+    again.close()
+
+
+def test_offsets_past_end_of_file_are_skipped(tmp_path):
+    filename = "igt_trials_20240101.csv"
+    index = SessionIndex(str(tmp_path))
+    index.mark_covered(filename)
+    _write_csv(tmp_path / filename, [["t1", "S1", "1"]], index, filename)
+    index.add("S1", filename, 10_000)  # 기록되지 못한 행의 위치
+    index.flush()
+
+    rows = index.lookup("S1")[filename]
+    assert [row["trial"] for row in rows] == ["1"]
+    index.close()
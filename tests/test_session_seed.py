@@ -0,0 +1,20 @@
+import pytest
+
+from session_seed import MASTER_SEED_ENV, derive_seed, get_master_seed
+
+
+def test_master_seed_is_read_at_call_time(monkeypatch):
+    monkeypatch.delenv(MASTER_SEED_ENV, raising=False)
+    default = derive_seed("S1", "schedule")
+    assert get_master_seed() == 0
+    assert default == derive_seed("S1", "schedule", master_seed=0)
+
+    monkeypatch.setenv(MASTER_SEED_ENV, "42")
+    assert get_master_seed() == 42
+    assert derive_seed("S1", "schedule") == derive_seed("S1", "schedule", master_seed=42) != default
+
+
+def test_malformed_master_seed_names_the_variable(monkeypatch):
+    monkeypatch.setenv(MASTER_SEED_ENV, "abc")
+    with pytest.raises(ValueError, match=MASTER_SEED_ENV):
+        derive_seed("S1")
@@ -0,0 +1,51 @@
+import json
+
+from sqlite_log_store import SQLiteLogStore, table_name
+
+COLUMNS = ["timestamp", "session_id", "value"]
+
+
+def test_bad_row_is_dead_lettered_and_later_flushes_succeed(tmp_path):
+    store = SQLiteLogStore(str(tmp_path / "logs.sqlite3"), batch_size=100)
+    store.write("events", COLUMNS, ["t1", "S1", 1])
+    store.write("events", COLUMNS, ["t2", "S1"])  # 컬럼 수 불일치
+    store.write("events", COLUMNS, ["t3", "S1", 3])
+    store.flush()  # 예외가 호출자에게 전달되지 않음
+
+    assert [row["value"] for row in store.query_session("events", "S1")] == [1, 3]
+    dead = store.dead_letters()
+    assert len(dead) == 1
+    assert dead[0]["table_name"] == "events"
+    assert json.loads(dead[0]["row"]) == ["t2", "S1"]
+
+    # 버퍼가 비워졌으므로 이후 기록은 정상 커밋
+    store.write("events", COLUMNS, ["t4", "S1", 4])
+    store.flush()
+    assert [row["value"] for row in store.query_session("events", "S1")] == [1, 3, 4]
+    store.close()
+
+
+def test_dead_letter_table_is_not_a_log_table(tmp_path):
+    path = str(tmp_path / "logs.sqlite3")
+    store = SQLiteLogStore(path)
+    store.write("events", COLUMNS, ["t1", "S1"])
+    store.close()
+
+    reopened = SQLiteLogStore(path)
+    assert reopened.tables() == ["events"]
+    assert len(reopened.dead_letters()) == 1
+    reopened.close()
+
+
+def test_task_names_are_mapped_to_identifiers(tmp_path):
+    assert table_name("free-recall_events") == "free_recall_events"
+    assert table_name("2afc") == "_2afc"
+    assert table_name("igt_trials") == "igt_trials"
+
+    store = SQLiteLogStore(str(tmp_path / "logs.sqlite3"))
+    store.write("free-recall_events", COLUMNS, ["t1", "S1", 1])
+    assert store.tables() == ["free_recall_events"]
+    assert store.query_session("free-recall_events", "S1") == [
+        {"timestamp": "t1", "session_id": "S1", "value": 1}
+    ]
+    store.close()